@@ -0,0 +1,147 @@
+import argparse
+import json
+import os
+import sys
+
+from kpireport.version import VERSION
+
+from . import runner
+
+
+def _formats(value):
+    return value.split("+")
+
+
+def run(args):
+    sweep = dict(runner.SWEEP)
+    for key in ["views", "rows", "series", "formats", "generator"]:
+        if getattr(args, key):
+            sweep[key] = getattr(args, key)
+    cases = runner.make_cases(sweep, full=args.full)
+
+    results = runner.run(cases, repeat=args.repeat)
+
+    output = args.output or os.path.join(runner.dirpath, "results", f"{VERSION}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Wrote results to {output}")
+
+    if args.compare:
+        with open(args.compare, "r") as f:
+            return _report_regressions(json.load(f), results, args.threshold)
+
+
+def mysql(args):
+    from . import mysql
+
+    mysql.run(rows=args.rows or mysql.ROWS, repeat=args.repeat)
+
+
+def prometheus(args):
+    from . import prometheus
+
+    prometheus.run(
+        series=args.series or prometheus.SERIES,
+        points=args.points,
+        repeat=args.repeat,
+    )
+
+
+def case(args):
+    print(json.dumps(runner.run_case(json.loads(args.case))))
+
+
+def compare(args):
+    with open(args.baseline, "r") as f:
+        baseline = json.load(f)
+    with open(args.current, "r") as f:
+        current = json.load(f)
+    return _report_regressions(baseline, current, args.threshold)
+
+
+def _report_regressions(baseline, current, threshold):
+    regressions = runner.compare(baseline, current, threshold=threshold)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if regressions:
+        return 1
+    print(f"No regressions against {baseline['version']} ({baseline['commit']})")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="benchmarks",
+        description="Benchmark report generation end-to-end with synthetic data",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser(
+        "run",
+        help=(
+            "Run the benchmark cases. By default, each parameter is swept "
+            "separately, with the others at their baseline value"
+        ),
+    )
+    run_parser.add_argument("--views", type=int, nargs="+")
+    run_parser.add_argument("--rows", type=int, nargs="+")
+    run_parser.add_argument("--series", type=int, nargs="+")
+    run_parser.add_argument(
+        "--formats",
+        type=_formats,
+        nargs="+",
+        help="The formats to render; join multiple formats with '+', e.g. html+md",
+    )
+    run_parser.add_argument("--generator", nargs="+")
+    run_parser.add_argument(
+        "--full", action="store_true", help="Run every combination of parameters"
+    )
+    run_parser.add_argument("--repeat", type=int, default=3)
+    run_parser.add_argument(
+        "-o",
+        "--output",
+        help="Where to write the results. Defaults to results/<version>.json",
+    )
+    run_parser.add_argument("--compare", help="Results to check for regressions")
+    run_parser.add_argument("--threshold", type=float, default=0.2)
+    run_parser.set_defaults(func=run)
+
+    mysql_parser = subparsers.add_parser(
+        "mysql",
+        help="Compare building DataFrames from MySQL results by row and by column",
+    )
+    mysql_parser.add_argument("--rows", type=int, nargs="+")
+    mysql_parser.add_argument("--repeat", type=int, default=3)
+    mysql_parser.set_defaults(func=mysql)
+
+    prometheus_parser = subparsers.add_parser(
+        "prometheus", help="Compare decoding Prometheus range query results"
+    )
+    prometheus_parser.add_argument("--series", type=int, nargs="+")
+    prometheus_parser.add_argument("--points", type=int, default=168)
+    prometheus_parser.add_argument("--repeat", type=int, default=3)
+    prometheus_parser.set_defaults(func=prometheus)
+
+    case_parser = subparsers.add_parser("case", help="Run a single case (internal)")
+    case_parser.add_argument("case")
+    case_parser.set_defaults(func=case)
+
+    compare_parser = subparsers.add_parser(
+        "compare", help="Check results for regressions against a baseline"
+    )
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="The relative increase that counts as a regression",
+    )
+    compare_parser.set_defaults(func=compare)
+
+    args = parser.parse_args()
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""Benchmark building DataFrames from MySQL result sets, without a server.
+
+Result rows are generated as the text a MySQL server sends, and are decoded
+with the PyMySQL converters as the client would decode them. They are then
+built into a DataFrame a row at a time, as :meth:`pandas.read_sql` does, or a
+column at a time, as the columnar fetch of the MySQL Datasource does.
+"""
+
+from datetime import datetime, timedelta
+from timeit import default_timer as timer
+
+import pandas as pd
+from pymysql.constants import FIELD_TYPE
+from pymysql.converters import decoders
+
+from kpireport_mysql.columnar import CONVERSIONS, to_frame
+
+ROWS = [10000, 100000, 1000000]
+
+DESCRIPTION = [
+    ("time", FIELD_TYPE.DATETIME),
+    ("count", FIELD_TYPE.LONGLONG),
+    ("amount", FIELD_TYPE.NEWDECIMAL),
+    ("country", FIELD_TYPE.VAR_STRING),
+]
+
+
+def make_result(rows) -> "List[tuple]":
+    """Generate result rows as sent by the server."""
+    start = datetime(2020, 1, 1)
+    countries = [b"DE", b"FR", b"JP", b"US"]
+    return [
+        (
+            str(start + timedelta(seconds=i)).encode(),
+            str(i % 1000).encode(),
+            f"{i % 997}.{i % 100:02d}".encode(),
+            countries[i % len(countries)],
+        )
+        for i in range(rows)
+    ]
+
+
+def decode(result, conversions) -> "List[tuple]":
+    converters = [conversions.get(type_code) for _, type_code in DESCRIPTION]
+    rows = []
+    for raw in result:
+        rows.append(
+            tuple(
+                conv(value.decode()) if conv else value.decode()
+                for conv, value in zip(converters, raw)
+            )
+        )
+    return rows
+
+
+def fetch_rows(result) -> pd.DataFrame:
+    rows = decode(result, decoders)
+    df = pd.DataFrame.from_records(
+        rows, columns=[col[0] for col in DESCRIPTION], coerce_float=True
+    )
+    return df.set_index(df.columns[0])
+
+
+def fetch_columnar(result) -> pd.DataFrame:
+    rows = decode(result, CONVERSIONS)
+    df = to_frame(rows, DESCRIPTION)
+    return df.set_index(df.columns[0])
+
+
+def run(rows=ROWS, repeat=3, log=print) -> "List[dict]":
+    """Time both fetch paths for each result size.
+
+    Each path is run ``repeat`` times; the fastest run is kept.
+
+    Returns:
+        List[dict]: the wall time of each path, in milliseconds, for each
+            result size.
+    """
+    results = []
+    for n in rows:
+        result = make_result(n)
+        timings = {}
+        for name, fetch in [("rows", fetch_rows), ("columnar", fetch_columnar)]:
+            runs = []
+            for _ in range(repeat):
+                start = timer()
+                fetch(result)
+                runs.append((timer() - start) * 1000)
+            timings[f"{name}_ms"] = round(min(runs), 2)
+        log(
+            f"rows={n}: {timings['rows_ms']:.2f}ms row-wise, "
+            f"{timings['columnar_ms']:.2f}ms columnar "
+            f"({timings['rows_ms'] / timings['columnar_ms']:.1f}x)"
+        )
+        results.append(dict(rows=n, **timings))
+    return results
@@ -0,0 +1,72 @@
+import pandas as pd
+
+from kpireport.datasource import Datasource
+from kpireport.output import OutputDriver
+from kpireport.view import View
+
+from datasources.generate_timeseries import generate_organic, generate_sinusoidal
+
+GENERATORS = dict(sinusoidal=generate_sinusoidal, organic=generate_organic)
+
+
+class SyntheticDatasource(Datasource):
+    """Generates synthetic time series over the report window, in memory.
+
+    Queries are the name of a generator ("sinusoidal" or "organic"), and can
+    request any number of series and rows per series.
+    """
+
+    def init(self):
+        pass
+
+    def query(self, generator, series=1, rows=1000) -> pd.DataFrame:
+        start_date = self.report.start_date.replace(tzinfo=None)
+        end_date = self.report.end_date.replace(tzinfo=None)
+        window = (end_date - start_date).total_seconds()
+        interval = max(1, int(window // rows))
+
+        frames = []
+        for i in range(series):
+            df = GENERATORS[generator](start_date, end_date, interval=interval)
+            frames.append(df.assign(series=f"series-{i}"))
+        return pd.concat(frames, ignore_index=True)
+
+
+class SyntheticView(View):
+    """Summarizes a synthetic time series; used when the Plot plugin is not
+    installed, so the benchmark can still exercise queries and rendering."""
+
+    def init(self, datasource=None, query=None, query_args={}, groupby=None):
+        self.datasource = datasource
+        self.query = query
+        self.query_args = query_args
+
+    def _summary(self):
+        df = self.datasources.query(self.datasource, self.query, **self.query_args)
+        return df.groupby("series")["value"].describe()
+
+    def render_html(self, env):
+        return self._summary().to_html()
+
+    def render_md(self, env):
+        return self._summary().to_string()
+
+    def render_slack(self, env):
+        return self._summary().to_string()
+
+
+class NullOutputDriver(OutputDriver):
+    """Renders the report in the given formats, and discards it."""
+
+    def init(self, formats=["html"]):
+        self.formats = formats
+
+    def can_render(self, fmt):
+        return fmt in self.formats
+
+    def render_blob_inline(self, blob, fmt=None):
+        return f"blob:{blob.id}"
+
+    def render_output(self, content, blobs):
+        for blob in blobs:
+            blob.getbuffer()
@@ -0,0 +1,91 @@
+"""Benchmark decoding Prometheus range query results, without a server.
+
+Responses are generated in memory with the given number of series, and are
+decoded by the Prometheus Datasource, and by the previous decoding, which
+built a DataFrame for each series and appended it to the result.
+"""
+
+from timeit import default_timer as timer
+
+import pandas as pd
+
+from kpireport_prometheus.datasource import PrometheusDatasource
+
+SERIES = [10, 100, 1000, 10000]
+# A week of hourly points.
+POINTS = 168
+
+
+def make_response(series, points=POINTS) -> dict:
+    """Generate a range query response, as parsed from its JSON."""
+    start = 1577836800
+    return dict(
+        status="success",
+        data=dict(
+            resultType="matrix",
+            result=[
+                dict(
+                    metric=dict(
+                        __name__="http_requests_total",
+                        instance=f"host-{i % 50}:9090",
+                        job="api",
+                        status=str(200 + (i % 5)),
+                    ),
+                    values=[
+                        [start + 3600 * p, str((i * p) % 1000 / 10)]
+                        for p in range(points)
+                    ],
+                )
+                for i in range(series)
+            ],
+        ),
+    )
+
+
+def decode_append(json) -> pd.DataFrame:
+    """The previous decoding, with a DataFrame per series."""
+    df = pd.DataFrame()
+    for metric in json["data"]["result"]:
+        mdf = pd.DataFrame(metric["values"], columns=["time", "value"])
+        mdf["time"] = pd.to_datetime(mdf["time"], unit="s")
+        mdf = mdf.assign(**metric["metric"])
+        mdf = mdf.astype({"value": "float"})
+        # DataFrame.append was removed in pandas 2.0; this is its equivalent.
+        df = pd.concat([df, mdf])
+    return df
+
+
+def run(series=SERIES, points=POINTS, repeat=3, log=print) -> "List[dict]":
+    """Time both decodings for each number of series.
+
+    Each decoding is run ``repeat`` times; the fastest run is kept.
+
+    Returns:
+        List[dict]: the wall time of each decoding, in milliseconds, and the
+            memory used by its result, in MiB, for each number of series.
+    """
+    datasource = PrometheusDatasource(None, host="localhost")
+    results = []
+    for n in series:
+        response = make_response(n, points)
+        timings = {}
+        for name, decode in [
+            ("append", decode_append),
+            ("vectorized", datasource._to_dataframe),
+        ]:
+            runs = []
+            for _ in range(repeat):
+                start = timer()
+                df = decode(response)
+                runs.append((timer() - start) * 1000)
+            timings[f"{name}_ms"] = round(min(runs), 2)
+            timings[f"{name}_mb"] = round(
+                df.memory_usage(deep=True).sum() / 1024 / 1024, 1
+            )
+        log(
+            f"series={n}: {timings['append_ms']:.2f}ms appending "
+            f"({timings['append_mb']}MiB), {timings['vectorized_ms']:.2f}ms "
+            f"vectorized ({timings['vectorized_mb']}MiB)"
+        )
+        results.append(dict(series=n, points=points, **timings))
+    return results
@@ -0,0 +1,233 @@
+from datetime import datetime
+from itertools import product
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+from timeit import default_timer as timer
+
+import stevedore
+
+from kpireport.plugin import load_extension_manager
+from kpireport.report import ReportFactory
+from kpireport.runtime import Runtime
+from kpireport.version import VERSION
+
+from .plugins import NullOutputDriver, SyntheticDatasource, SyntheticView
+
+dirpath = os.path.dirname(os.path.realpath(__file__))
+
+BASELINE = dict(
+    views=10, rows=10000, series=5, formats=["html"], generator="sinusoidal"
+)
+SWEEP = dict(
+    views=[1, 10, 40],
+    rows=[1000, 10000, 100000],
+    series=[1, 5, 20],
+    formats=[["html"], ["md"], ["slack"], ["html", "md", "slack"]],
+    generator=["sinusoidal", "organic"],
+)
+
+
+def make_cases(sweep=SWEEP, full=False) -> "List[dict]":
+    """Build the benchmark cases.
+
+    By default, each parameter is swept on its own, with all other parameters
+    kept at their baseline value. With ``full``, every combination of
+    parameter values is a case.
+    """
+    if full:
+        keys = list(sweep.keys())
+        return [dict(zip(keys, values)) for values in product(*sweep.values())]
+
+    cases = [dict(BASELINE)]
+    for key, values in sweep.items():
+        for value in values:
+            case = dict(BASELINE, **{key: value})
+            if case not in cases:
+                cases.append(case)
+    return cases
+
+
+def case_name(case) -> str:
+    return " ".join(
+        f"{k}={'+'.join(v) if isinstance(v, list) else v}" for k, v in case.items()
+    )
+
+
+def _extension_manager(namespace, plugins):
+    extensions = list(load_extension_manager(namespace).extensions)
+    extensions.extend(
+        stevedore.extension.Extension(name, None, plugin, None)
+        for name, plugin in plugins
+    )
+    return stevedore.ExtensionManager.make_test_instance(extensions=extensions)
+
+
+def make_runtime() -> Runtime:
+    """Build a runtime with the synthetic plugins registered alongside all
+    installed plugins."""
+    return Runtime(
+        extension_managers={
+            "kpireport.datasource": _extension_manager(
+                "kpireport.datasource", [("synthetic", SyntheticDatasource)]
+            ),
+            "kpireport.view": _extension_manager(
+                "kpireport.view", [("synthetic", SyntheticView)]
+            ),
+            "kpireport.output": _extension_manager(
+                "kpireport.output", [("null", NullOutputDriver)]
+            ),
+        }
+    )
+
+
+def make_config(case, view_plugin) -> dict:
+    query_args = dict(series=case["series"], rows=case["rows"])
+    views = {
+        f"view_{i}": dict(
+            plugin=view_plugin,
+            args=dict(
+                datasource="synthetic",
+                # Distinct queries, so each View fetches its own result.
+                query=case["generator"],
+                query_args=dict(query_args, rows=case["rows"] + i),
+                groupby="series",
+            ),
+        )
+        for i in range(case["views"])
+    }
+    return dict(
+        title="Benchmark",
+        start_date="2020-01-01",
+        end_date="2020-01-08",
+        datasources=dict(synthetic=dict(plugin="synthetic")),
+        views=views,
+        outputs=dict(null=dict(plugin="null", args=dict(formats=case["formats"]))),
+    )
+
+
+def run_case(case) -> dict:
+    """Run a benchmark case in this process.
+
+    Returns:
+        dict: the wall time of setting up the report and of
+            :meth:`ReportFactory.create`, and the peak RSS before and after
+            creating the report, in MiB.
+    """
+    runtime = make_runtime()
+    view_plugin = (
+        "plot" if "plot" in runtime.extension_manager("kpireport.view") else "synthetic"
+    )
+
+    rss_before = _peak_rss_mb()
+    start = timer()
+    factory = ReportFactory(make_config(case, view_plugin), runtime=runtime)
+    setup_ms = (timer() - start) * 1000
+    start = timer()
+    factory.create()
+    create_ms = (timer() - start) * 1000
+
+    return dict(
+        view_plugin=view_plugin,
+        setup_ms=round(setup_ms, 2),
+        create_ms=round(create_ms, 2),
+        rss_before_mb=round(rss_before, 1),
+        peak_rss_mb=round(_peak_rss_mb(), 1),
+    )
+
+
+def run_case_subprocess(case) -> dict:
+    """Run a benchmark case in a fresh interpreter, so that its peak RSS is
+    not affected by other cases."""
+    proc = subprocess.run(
+        [sys.executable, "-m", "benchmarks", "case", json.dumps(case)],
+        cwd=os.path.dirname(dirpath),
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Case {case_name(case)} failed:\n{proc.stderr}")
+    return json.loads(proc.stdout.splitlines()[-1])
+
+
+def run(cases, repeat=3, log=print) -> dict:
+    """Run all benchmark cases, each in a fresh interpreter.
+
+    Each case is run ``repeat`` times; the fastest run is kept.
+
+    Returns:
+        dict: the results, along with the version and environment they were
+            measured with.
+    """
+    results = []
+    for case in cases:
+        runs = [run_case_subprocess(case) for _ in range(repeat)]
+        best = min(runs, key=lambda r: r["create_ms"])
+        best.update(peak_rss_mb=max(r["peak_rss_mb"] for r in runs))
+        log(
+            f"{case_name(case)}: {best['create_ms']:.2f}ms, "
+            f"{best['peak_rss_mb']:.1f}MiB"
+        )
+        results.append(dict(case=case, **best))
+
+    return dict(
+        version=VERSION,
+        commit=_git_commit(),
+        python=platform.python_version(),
+        platform=platform.platform(),
+        timestamp=datetime.now().isoformat(),
+        repeat=repeat,
+        results=results,
+    )
+
+
+def compare(baseline, current, threshold=0.2) -> "List[str]":
+    """Compare two benchmark results.
+
+    Args:
+        baseline (dict): the results to compare against.
+        current (dict): the results to compare.
+        threshold (float): the relative increase in wall time or peak RSS that
+            counts as a regression.
+
+    Returns:
+        List[str]: a description of each regression.
+    """
+    baseline_results = {case_name(r["case"]): r for r in baseline["results"]}
+    regressions = []
+    for result in current["results"]:
+        name = case_name(result["case"])
+        if name not in baseline_results:
+            continue
+        for metric in ["create_ms", "peak_rss_mb"]:
+            before, after = baseline_results[name][metric], result[metric]
+            if before and (after - before) / before > threshold:
+                regressions.append(
+                    f"{name}: {metric} {before} -> {after} "
+                    f"(+{(after - before) / before:.0%})"
+                )
+    return regressions
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS reports bytes.
+    if sys.platform == "darwin":
+        peak /= 1024
+    return peak / 1024
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=dirpath,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
@@ -85,7 +85,7 @@ def generate_organic(
 
     # Check for which 't' values an event was chosen; we can assume unique
     # because we used replace=False in the choice function.
-    ts["value"] = np.in1d(t, np.sort(choice), assume_unique=True)
+    ts["value"] = np.isin(t, np.sort(choice), assume_unique=True)
     return ts
 
 
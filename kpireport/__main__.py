@@ -1,3 +1,5 @@
+import sys
+
 from .cmd import run
 
-run()
+sys.exit(run())
@@ -0,0 +1,86 @@
+from copy import deepcopy
+from datetime import datetime, timedelta
+import re
+
+INTERVAL_UNITS = {"d": "days", "w": "weeks"}
+INTERVAL_PATTERN = re.compile(r"^(\d+)([dw])$")
+
+
+def parse_interval(value: str) -> timedelta:
+    """Parse an interval such as ``7d`` (7 days) or ``2w`` (2 weeks).
+
+    Args:
+        value (str): the interval.
+
+    Returns:
+        timedelta: the parsed interval.
+
+    Raises:
+        ValueError: if the interval is not valid.
+    """
+    match = INTERVAL_PATTERN.match(value.strip())
+    if not match or int(match.group(1)) < 1:
+        raise ValueError(f"Not a valid interval: {value}")
+    return timedelta(**{INTERVAL_UNITS[match.group(2)]: int(match.group(1))})
+
+
+def report_windows(
+    start_date: datetime, end_date: datetime, every: timedelta, interval_days: int
+) -> "List[Tuple[datetime, datetime]]":
+    """Get the report windows to backfill.
+
+    A window starts at ``start_date`` and then every ``every`` after, and spans
+    ``interval_days``. Only windows ending on or before ``end_date`` are
+    included.
+
+    Args:
+        start_date (datetime): the start of the first window.
+        end_date (datetime): the latest end of any window.
+        every (timedelta): the time between the starts of two windows.
+        interval_days (int): the length of each window, in days.
+
+    Returns:
+        List[Tuple[datetime, datetime]]: the start and end of each window.
+    """
+    windows = []
+    interval = timedelta(days=interval_days)
+    window_start = start_date
+    while window_start + interval <= end_date:
+        windows.append((window_start, window_start + interval))
+        window_start += every
+    return windows
+
+
+def backfill(
+    config: dict, windows: "List[Tuple[datetime, datetime]]", runtime=None, jobs=1
+) -> "Dict[Tuple[datetime, datetime], Exception]":
+    """Generate a report for each of the given windows.
+
+    All reports are generated in this process and share one
+    :class:`~kpireport.runtime.Runtime`, so plugins and Datasources are only
+    set up once (see :func:`~kpireport.batch.generate_reports`.)
+
+    Args:
+        config (dict): the (parsed) configuration YAML file.
+        windows (List[Tuple[datetime, datetime]]): the report windows.
+        runtime (Runtime): the runtime to share. A new one is created if not
+            given.
+        jobs (int): the number of windows to generate concurrently.
+
+    Returns:
+        Dict[Tuple[datetime, datetime], Exception]: the error raised by each
+            window that could not be generated.
+    """
+    # Imported here, as it imports pandas; parsing intervals should not.
+    from .batch import generate_reports
+
+    names = {}
+    configs = {}
+    for window_start, window_end in windows:
+        name = f"{window_start:%Y-%m-%d} to {window_end:%Y-%m-%d}"
+        names[name] = (window_start, window_end)
+        configs[name] = deepcopy(config)
+        configs[name].update(start_date=window_start, end_date=window_end)
+
+    errors = generate_reports(configs, runtime=runtime, jobs=jobs)
+    return {names[name]: exc for name, exc in errors.items()}
@@ -0,0 +1,50 @@
+from concurrent.futures import ThreadPoolExecutor
+from timeit import default_timer as timer
+
+from .report import ReportFactory
+from .runtime import Runtime
+
+import logging
+
+LOG = logging.getLogger(__name__)
+
+
+def generate_reports(
+    configs: "Dict[str, dict]", runtime=None, jobs=1
+) -> "Dict[str, Exception]":
+    """Generate many reports in this process.
+
+    All reports share one :class:`~kpireport.runtime.Runtime`, so plugins are
+    only discovered once, and Datasources declared with the same plugin and
+    arguments in different reports are only created once and shared. An error
+    generating one report does not prevent the others from being generated.
+
+    Args:
+        configs (Dict[str, dict]): the (parsed) configuration of each report,
+            by a name identifying the report, e.g., its configuration file.
+        runtime (Runtime): the runtime to share. A new one is created if not
+            given.
+        jobs (int): the number of reports to generate concurrently.
+
+    Returns:
+        Dict[str, Exception]: the error raised by each report that could not be
+            generated, by name.
+    """
+    runtime = runtime or Runtime()
+
+    def generate(name, conf):
+        start = timer()
+        try:
+            ReportFactory(conf, runtime=runtime).create()
+        except Exception as exc:
+            LOG.error(
+                f"Failed to generate report {name}: {exc}",
+                exc_info=LOG.isEnabledFor(logging.DEBUG),
+            )
+            return exc
+        elapsed = (timer() - start) * 1000
+        LOG.info(f"Generated report {name} in {elapsed:.2f}ms")
+
+    with ThreadPoolExecutor(max_workers=max(jobs, 1)) as executor:
+        results = executor.map(lambda c: (c[0], generate(*c)), configs.items())
+        return {name: exc for name, exc in results if exc}
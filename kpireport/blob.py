@@ -0,0 +1,223 @@
+from hashlib import sha256
+import io
+from itertools import count
+import mmap
+import os
+import shutil
+import tempfile
+from threading import Lock
+
+import logging
+
+LOG = logging.getLogger(__name__)
+
+# Blobs at least this large are always kept on disk.
+DEFAULT_SPILL_SIZE = 1024 * 1024
+# The most blob content kept in memory at once.
+DEFAULT_MAX_MEMORY = 64 * 1024 * 1024
+
+
+class Blob:
+    """A file generated by a View, such as an image, to include in the report.
+
+    The content of a blob is either held in memory or, once spilled by a
+    :class:`BlobStore`, in a file on disk. Output drivers should read it via
+    :meth:`open`, :meth:`getbuffer` or :meth:`save`, or from :attr:`path`
+    if set, so that it is not copied into memory.
+
+    Attributes:
+        id (str): the blob ID, which is prefixed by the ID of its View.
+        mime_type (str): the MIME type of the content.
+        title (str): a title for the blob, e.g., for image alt text.
+        path (str): the file holding the content, if it was spilled to disk.
+        size (int): the size of the content, in bytes.
+
+    Blobs with the same content have the same :attr:`digest`, so that output
+    drivers can store or send identical blobs once.
+    """
+
+    def __init__(self, id, content, mime_type=None, title=None):
+        self.id = id
+        self.mime_type = mime_type
+        self.title = title
+        self.path = None
+        if isinstance(content, (bytes, bytearray, memoryview)):
+            content = io.BytesIO(content)
+        elif not hasattr(content, "getbuffer"):
+            content = io.BytesIO(content.read())
+        self._content = content
+        self.size = content.getbuffer().nbytes
+        self._digest = None
+
+    @property
+    def digest(self) -> str:
+        """The SHA-256 digest of the content, as a hex string."""
+        if self._digest is None:
+            self._digest = sha256(self.getbuffer()).hexdigest()
+        return self._digest
+
+    @property
+    def content(self) -> io.BytesIO:
+        """The content, as a file-like object.
+
+        Reading a spilled blob this way copies it back into memory; prefer
+        :meth:`open`, :meth:`getbuffer` or :meth:`save`.
+        """
+        if self.path:
+            with open(self.path, "rb") as f:
+                return io.BytesIO(f.read())
+        return self._content
+
+    def open(self) -> "BinaryIO":
+        """Open the content for reading.
+
+        Returns:
+            BinaryIO: a binary file-like object, which should be closed after
+                use.
+        """
+        if self.path:
+            return open(self.path, "rb")
+        return io.BytesIO(self._content.getbuffer())
+
+    def getbuffer(self) -> memoryview:
+        """Get a read-only view of the content, without copying it.
+
+        Spilled content is memory-mapped, so it is paged in from disk as it is
+        read.
+
+        Returns:
+            memoryview: the content.
+        """
+        if not self.path:
+            return self._content.getbuffer().toreadonly()
+        if not self.size:
+            return memoryview(b"")
+        with open(self.path, "rb") as f:
+            return memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def save(self, path: str):
+        """Write the content to a file.
+
+        Spilled content is hard-linked to the file, if possible, instead of
+        being copied.
+
+        Args:
+            path (str): the file to write to.
+        """
+        if self.path:
+            link_or_copy(self.path, path)
+        else:
+            with open(path, "wb") as f:
+                f.write(self._content.getbuffer())
+
+    def spill(self, path: str):
+        """Move the content from memory to a file.
+
+        Args:
+            path (str): the file to move the content to.
+        """
+        if self.path:
+            return
+        self.save(path)
+        self.path = path
+        self._content = None
+
+    def share(self, other: "Blob"):
+        """Share the storage of a blob with identical content.
+
+        Args:
+            other (Blob): the blob to share storage with.
+        """
+        self._content, self.path = other._content, other.path
+
+
+def link_or_copy(src, dst):
+    """Hard link a file to ``dst``, replacing it, or copy it if linking fails.
+
+    Args:
+        src (str): the path of the file.
+        dst (str): the path to link or copy it to.
+    """
+    try:
+        if os.path.exists(dst):
+            os.unlink(dst)
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+
+class BlobStore:
+    """Limits how much blob content is held in memory during a report run.
+
+    Blobs of at least ``spill_size`` bytes are spilled to a temporary
+    directory as soon as they are added to the store, as are any blobs that
+    would raise the total size of blobs held in memory above ``max_memory``.
+    The directory is removed when the store is closed.
+
+    Blobs are deduplicated by content: a blob with the same content as one
+    already in the store shares its storage, and does not count towards the
+    memory limit again.
+
+    Args:
+        max_memory (int): the most blob content to hold in memory, in bytes.
+        spill_size (int): the size, in bytes, from which blobs are always
+            spilled to disk.
+    """
+
+    def __init__(self, max_memory=DEFAULT_MAX_MEMORY, spill_size=DEFAULT_SPILL_SIZE):
+        self.max_memory = max_memory
+        self.spill_size = spill_size
+        self.memory = 0
+        self._blobs = set()
+        self._digests = {}
+        self._names = count()
+        self._tmp_dir = None
+        self._closed = False
+        self._lock = Lock()
+
+    def add(self, blob: Blob):
+        """Add a blob to the store, spilling it to disk if necessary.
+
+        Adding a blob already in the store, or once the store is closed, has
+        no effect.
+
+        Args:
+            blob (Blob): the blob.
+        """
+        # Hash outside the lock, as it reads the whole content.
+        digest = blob.digest
+        with self._lock:
+            if self._closed or blob in self._blobs:
+                return
+            self._blobs.add(blob)
+            if digest in self._digests:
+                LOG.debug(f"Blob {blob.id} is identical to {self._digests[digest].id}")
+                blob.share(self._digests[digest])
+                return
+            self._digests[digest] = blob
+            if blob.path:
+                return
+            if (
+                blob.size < self.spill_size
+                and self.memory + blob.size <= self.max_memory
+            ):
+                self.memory += blob.size
+                return
+            if not self._tmp_dir:
+                self._tmp_dir = tempfile.mkdtemp(prefix="kpireport-blobs-")
+            path = os.path.join(self._tmp_dir, str(next(self._names)))
+            # Spill while holding the lock, so that identical blobs added
+            # meanwhile share the spilled file.
+            LOG.debug(f"Spilling blob {blob.id} ({blob.size} bytes) to {path}")
+            blob.spill(path)
+
+    def close(self):
+        """Remove all spilled blobs."""
+        with self._lock:
+            self._closed = True
+            tmp_dir, self._tmp_dir = self._tmp_dir, None
+            self._blobs.clear()
+            self._digests.clear()
+            self.memory = 0
+        if tmp_dir:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
@@ -0,0 +1,352 @@
+import asyncio
+from concurrent.futures import Future
+from datetime import datetime
+from hashlib import sha256
+import importlib.util
+import json
+import os
+import pickle
+import tempfile
+from threading import Lock
+import time
+
+import logging
+
+LOG = logging.getLogger(__name__)
+
+
+def make_key(*parts) -> tuple:
+    """Build a hashable cache key from arbitrary query arguments.
+
+    Dictionaries, lists and sets (which are commonly passed as query arguments
+    from the report configuration) are converted to hashable equivalents;
+    any other unhashable value is keyed by its ``repr``.
+
+    Returns:
+        tuple: the cache key.
+    """
+
+    def freeze(value):
+        if isinstance(value, dict):
+            return tuple(sorted((k, freeze(v)) for k, v in value.items()))
+        elif isinstance(value, (list, tuple)):
+            return tuple(freeze(v) for v in value)
+        elif isinstance(value, (set, frozenset)):
+            return frozenset(freeze(v) for v in value)
+        try:
+            hash(value)
+            return value
+        except TypeError:
+            return repr(value)
+
+    return freeze(parts)
+
+
+class QueryCache:
+    """An in-memory cache of query results.
+
+    The cache is single-flight: if a result is requested while another thread
+    is already fetching it, the request waits for that fetch to complete
+    instead of fetching the result again. Failed fetches are not cached, but
+    any requests waiting on the fetch will receive its error.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._futures = {}
+
+    def _claim(self, key) -> "Tuple[Future, bool]":
+        with self._lock:
+            future = self._futures.get(key)
+            if future is not None:
+                LOG.debug(f"Using cached result for {key}")
+                return future, False
+            future = self._futures[key] = Future()
+            return future, True
+
+    def _fail(self, key, future, exc):
+        with self._lock:
+            del self._futures[key]
+        future.set_exception(exc)
+
+    def get(self, key, fetch: "Callable[[], Any]") -> "Any":
+        """Get a result from the cache, fetching it if it is not cached.
+
+        Args:
+            key (Hashable): the cache key, see :func:`make_key`.
+            fetch (Callable): a function that fetches the result.
+
+        Returns:
+            the cached or fetched result.
+        """
+        future, claimed = self._claim(key)
+        if not claimed:
+            return future.result()
+
+        try:
+            result = fetch()
+        except BaseException as exc:
+            self._fail(key, future, exc)
+            raise
+
+        future.set_result(result)
+        return result
+
+    async def aget(self, key, fetch: "Callable[[], Awaitable]") -> "Any":
+        """Get a result from the cache, fetching it asynchronously if it is not
+        cached. Results are shared with :meth:`get`.
+
+        Args:
+            key (Hashable): the cache key, see :func:`make_key`.
+            fetch (Callable): a coroutine function that fetches the result.
+
+        Returns:
+            the cached or fetched result.
+        """
+        future, claimed = self._claim(key)
+        if not claimed:
+            return await asyncio.wrap_future(future)
+
+        try:
+            result = await fetch()
+        except BaseException as exc:
+            self._fail(key, future, exc)
+            raise
+
+        future.set_result(result)
+        return result
+
+    def clear(self):
+        """Remove all results from the cache."""
+        with self._lock:
+            self._futures.clear()
+
+
+class DiskCache:
+    """A persistent cache of query results, stored in a local directory.
+
+    Results are stored in the Parquet format if :mod:`pyarrow` is installed
+    and the result can be represented in Parquet; otherwise they are pickled.
+
+    Args:
+        cache_dir (str): the directory to store results in. It is created if it
+            does not exist.
+    """
+
+    formats = ["parquet", "pkl"]
+
+    def __init__(self, cache_dir):
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.parquet = importlib.util.find_spec("pyarrow") is not None
+
+    def _path(self, namespace, key, fmt):
+        digest = sha256(repr(key).encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, namespace, f"{digest}.{fmt}")
+
+    def get(self, namespace, key, ttl=None, window_end=None) -> "Optional[Any]":
+        """Get a stored result, if it exists and has not expired.
+
+        A result expires ``ttl`` seconds after it was stored, unless it was
+        stored after the end of its report window; such results can no longer
+        change, and so never expire. Results never expire if no ``ttl`` is
+        given.
+
+        Args:
+            namespace (str): the namespace of the key, e.g., the Datasource ID.
+            key (Hashable): the cache key, see :func:`make_key`.
+            ttl (int): how long a result is valid for, in seconds.
+            window_end (datetime): the end of the report window of the result.
+
+        Returns:
+            the stored result, or ``None`` if there is no valid result.
+        """
+        for fmt in self.formats:
+            path = self._path(namespace, key, fmt)
+            try:
+                stored_at = os.path.getmtime(path)
+            except OSError:
+                continue
+
+            closed = window_end and window_end.timestamp() <= stored_at
+            fresh = time.time() - stored_at < (ttl or 0)
+            if ttl is not None and not (closed or fresh):
+                LOG.debug(f"Cached result for {key} has expired")
+                return None
+
+            try:
+                return self._read(path, fmt)
+            except Exception:
+                LOG.warning(f"Failed to read cached result {path}", exc_info=True)
+                return None
+
+        return None
+
+    def put(self, namespace, key, result):
+        """Store a result.
+
+        Args:
+            namespace (str): the namespace of the key, e.g., the Datasource ID.
+            key (Hashable): the cache key, see :func:`make_key`.
+            result (pandas.DataFrame): the result to store.
+        """
+        formats = self.formats if self.parquet else self.formats[1:]
+        for fmt in formats:
+            path = self._path(namespace, key, fmt)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write to a temporary file first so concurrent readers never see
+            # a partially written result.
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+            os.close(fd)
+            try:
+                self._write(tmp_path, fmt, result)
+                os.replace(tmp_path, path)
+                break
+            except Exception as exc:
+                os.unlink(tmp_path)
+                LOG.debug(f"Could not store result for {key} as {fmt}: {exc}")
+        else:
+            return
+
+        # Remove any previous result stored in another format.
+        for other_fmt in self.formats:
+            if other_fmt != fmt:
+                try:
+                    os.unlink(self._path(namespace, key, other_fmt))
+                except OSError:
+                    pass
+
+    def delete(self, namespace, key):
+        """Remove a stored result, if any.
+
+        Args:
+            namespace (str): the namespace of the key, e.g., the Datasource ID.
+            key (Hashable): the cache key, see :func:`make_key`.
+        """
+        for fmt in self.formats:
+            try:
+                os.unlink(self._path(namespace, key, fmt))
+            except OSError:
+                pass
+
+    def get_metadata(self, namespace, key) -> "Optional[dict]":
+        """Get the metadata stored for a key, see :meth:`put_metadata`.
+
+        Args:
+            namespace (str): the namespace of the key, e.g., the Datasource ID.
+            key (Hashable): the cache key, see :func:`make_key`.
+
+        Returns:
+            Optional[dict]: the metadata, or ``None`` if there is none.
+        """
+        try:
+            with open(self._path(namespace, key, "json"), "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put_metadata(self, namespace, key, metadata: dict):
+        """Store metadata for a key, as JSON, apart from any stored result.
+
+        This allows small details about a result to be read without reading
+        the result itself.
+
+        Args:
+            namespace (str): the namespace of the key, e.g., the Datasource ID.
+            key (Hashable): the cache key, see :func:`make_key`.
+            metadata (dict): the metadata; it must be serializable to JSON.
+        """
+        path = self._path(namespace, key, "json")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, "w") as f:
+            json.dump(metadata, f)
+        os.replace(tmp_path, path)
+
+    def _read(self, path, fmt):
+        if fmt == "parquet":
+            import pandas as pd
+
+            return pd.read_parquet(path)
+        with open(path, "rb") as f:
+            return pickle.load(f)
+
+    def _write(self, path, fmt, result):
+        if fmt == "parquet":
+            result.to_parquet(path)
+        else:
+            with open(path, "wb") as f:
+                pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+class IncrementalStore:
+    """Stores query results along with the time window they cover.
+
+    This is used to fetch query results incrementally: only the part of a
+    report window not covered by the stored result has to be fetched.
+
+    Args:
+        disk_cache (DiskCache): the cache to store results in.
+    """
+
+    def __init__(self, disk_cache: DiskCache):
+        self.disk_cache = disk_cache
+
+    def _window_key(self, key, start_date, end_date):
+        return make_key(key, start_date.isoformat(), end_date.isoformat())
+
+    def _window(self, namespace, key) -> "Optional[Tuple[datetime, datetime]]":
+        window = self.disk_cache.get_metadata(namespace, key)
+        if not window:
+            return None
+        return (
+            datetime.fromisoformat(window["start_date"]),
+            datetime.fromisoformat(window["end_date"]),
+        )
+
+    def get(self, namespace, key) -> "Optional[Tuple[Any, datetime, datetime]]":
+        """Get a stored result and the window it covers.
+
+        Args:
+            namespace (str): the namespace of the key, e.g., the Datasource ID.
+            key (Hashable): the cache key, see :func:`make_key`.
+
+        Returns:
+            Optional[Tuple[pandas.DataFrame, datetime, datetime]]: the stored
+                result and the start and end of its window, if any.
+        """
+        window = self._window(namespace, key)
+        if not window:
+            return None
+
+        start_date, end_date = window
+        result = self.disk_cache.get(
+            namespace, self._window_key(key, start_date, end_date)
+        )
+        if result is None:
+            return None
+
+        return result, start_date, end_date
+
+    def put(self, namespace, key, result, start_date, end_date):
+        """Store a result and the window it covers.
+
+        Args:
+            namespace (str): the namespace of the key, e.g., the Datasource ID.
+            key (Hashable): the cache key, see :func:`make_key`.
+            result (pandas.DataFrame): the result to store.
+            start_date (datetime): the start of the window covered by the result.
+            end_date (datetime): the end of the window covered by the result.
+        """
+        # Only the window of the previous result is needed, to remove it.
+        previous = self._window(namespace, key)
+
+        self.disk_cache.put(
+            namespace, self._window_key(key, start_date, end_date), result
+        )
+        # The window is written last, so the stored window always refers to a
+        # complete result.
+        window = dict(start_date=start_date.isoformat(), end_date=end_date.isoformat())
+        self.disk_cache.put_metadata(namespace, key, window)
+
+        if previous and previous != (start_date, end_date):
+            self.disk_cache.delete(namespace, self._window_key(key, *previous))
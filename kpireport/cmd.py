@@ -1,15 +1,20 @@
 import argparse
-from datetime import datetime
+from datetime import datetime, timedelta
 from itertools import chain
 from glob import glob
+import io
+import json
 import logging
 import os
+import signal
 import sys
 
 from timeit import default_timer as timer
 
+# Slow imports (pandas, plugins, profilers) are deferred until the arguments are
+# parsed, so that e.g., `kpireport --help` returns quickly.
+from .backfill import backfill, parse_interval, report_windows
 from .config import load, DEFAULT_CONF_DIR
-from .report import ReportFactory
 
 
 def simple_date(date_str):
@@ -19,12 +24,14 @@ def simple_date(date_str):
         raise argparse.ArgumentTypeError(f"Not a valid date: {date_str}")
 
 
-def run(argv=None):
-    if not argv:
-        argv = sys.argv
-    parser = argparse.ArgumentParser(
-        prog="kpireport", description="Something", allow_abbrev=False
-    )
+def interval(interval_str):
+    try:
+        return parse_interval(interval_str)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(str(exc))
+
+
+def add_common_arguments(parser):
     parser.add_argument(
         "-c",
         "--config-file",
@@ -33,14 +40,21 @@ def run(argv=None):
         action="append",
         default=[],
     )
-    parser.add_argument("-s", "--start-date", type=simple_date)
-    parser.add_argument("-e", "--end-date", type=simple_date)
     parser.add_argument("--theme-dir", default=f"{DEFAULT_CONF_DIR}/theme")
     parser.add_argument("--license-file", type=argparse.FileType("r"))
+    parser.add_argument(
+        "--cache-dir", help="Directory to persist Datasource query results in"
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        help="Number of Views to render concurrently (default: 1)",
+    )
     parser.add_argument("-v", "--verbose", dest="verbosity", action="count", default=0)
 
-    args = parser.parse_args(argv[1:])
 
+def configure_logging(args):
     log_level = logging.INFO
     if args.verbosity >= 2:
         log_level = logging.DEBUG
@@ -51,6 +65,8 @@ def run(argv=None):
         logging.getLogger("matplotlib").setLevel(logging.INFO)
     logging.basicConfig(level=log_level)
 
+
+def find_config_files(args) -> list:
     config_files = list(chain(*args.config_file))
     if not config_files:
         for search_dir in [".", DEFAULT_CONF_DIR]:
@@ -65,16 +81,10 @@ def run(argv=None):
                     "option when using a non-standard configuration location."
                 )
             )
+    return config_files
 
-    conf = load(*config_files)
-
-    if args.start_date:
-        conf.update(start_date=args.start_date)
-    if args.end_date:
-        conf.update(end_date=args.end_date)
-    if args.theme_dir:
-        conf.get("theme").update(theme_dir=args.theme_dir)
 
+def read_license_key(args) -> "Optional[str]":
     license_file = args.license_file
     if not license_file:
         matches = list(
@@ -87,11 +97,311 @@ def run(argv=None):
     if license_file:
         with license_file:
             license_content = license_file.read()
-            conf.update(license_key="".join(license_content.split("\n")[1:-1]))
+            return "".join(license_content.split("\n")[1:-1])
+
+
+def apply_arguments(conf, args, license_key=None) -> dict:
+    if args.cache_dir:
+        conf.update(cache_dir=args.cache_dir)
+    if args.jobs:
+        conf.update(workers=args.jobs)
+    if args.theme_dir:
+        conf.get("theme").update(theme_dir=args.theme_dir)
+    if license_key:
+        conf.update(license_key=license_key)
+
+    return conf
+
+
+def load_config(args) -> dict:
+    conf = load(*find_config_files(args))
+    return apply_arguments(conf, args, read_license_key(args))
+
+
+def run_report(argv):
+    parser = argparse.ArgumentParser(
+        prog="kpireport", description="Something", allow_abbrev=False
+    )
+    add_common_arguments(parser)
+    parser.add_argument("-s", "--start-date", type=simple_date)
+    parser.add_argument("-e", "--end-date", type=simple_date)
+    parser.add_argument(
+        "--manifest", help="File to write a JSON summary of the report run to"
+    )
+    parser.add_argument(
+        "--timings",
+        action="store_true",
+        help="Print the duration of each phase of the report run",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="DIR",
+        help=(
+            "Profile each query, View render and output driver delivery, and "
+            "save the profiles to this directory"
+        ),
+    )
+    parser.add_argument(
+        "--profile-memory",
+        action="store_true",
+        help="Also track the peak memory of each View render (requires --profile)",
+    )
+
+    args = parser.parse_args(argv[1:])
+    configure_logging(args)
+    conf = load_config(args)
+
+    from .report import ReportFactory
+
+    if args.start_date:
+        conf.update(start_date=args.start_date)
+    if args.end_date:
+        conf.update(end_date=args.end_date)
 
     start = timer()
 
-    ReportFactory(conf).create()
+    profiler = None
+    if args.profile:
+        from .profiling import Profiler
+
+        profiler = Profiler(args.profile, memory=args.profile_memory)
+    elif args.profile_memory:
+        parser.error("--profile-memory requires --profile")
+
+    factory = ReportFactory(conf, profiler=profiler)
+    try:
+        factory.create()
+    finally:
+        if profiler:
+            paths = profiler.save()
+            print(f"Saved {len(paths)} profiles to {args.profile}.", file=sys.stderr)
+        if args.manifest:
+            with open(args.manifest, "w") as f:
+                json.dump(factory.manifest(), f, indent=2)
+        if args.timings:
+            print(factory.timings.format_table(), file=sys.stderr)
 
     end = timer()
     print(f"Generated report in {(end - start) * 1000:.2f}ms.")
+
+
+def run_backfill(argv):
+    parser = argparse.ArgumentParser(
+        prog="kpireport backfill",
+        description="Generate a report for each window in a range of dates",
+        allow_abbrev=False,
+    )
+    add_common_arguments(parser)
+    parser.add_argument(
+        "--from",
+        dest="from_date",
+        type=simple_date,
+        required=True,
+        help="Start of the first report window",
+    )
+    parser.add_argument(
+        "--to",
+        dest="to_date",
+        type=simple_date,
+        help="Latest end of any report window (default: today)",
+    )
+    parser.add_argument(
+        "--every",
+        type=interval,
+        help=(
+            "Time between the starts of two report windows, e.g., 1d or 2w "
+            "(default: the report interval_days)"
+        ),
+    )
+    parser.add_argument(
+        "-p",
+        "--parallel",
+        type=int,
+        default=1,
+        help="Number of report windows to generate concurrently (default: 1)",
+    )
+
+    args = parser.parse_args(argv[1:])
+    configure_logging(args)
+    conf = load_config(args)
+
+    interval_days = conf.get("interval_days", 7)
+    to_date = args.to_date or datetime.combine(datetime.now(), datetime.min.time())
+    every = args.every or timedelta(days=interval_days)
+    windows = report_windows(args.from_date, to_date, every, interval_days)
+
+    start = timer()
+
+    errors = backfill(conf, windows, jobs=args.parallel)
+
+    end = timer()
+    print(
+        f"Generated {len(windows) - len(errors)} of {len(windows)} reports "
+        f"in {(end - start) * 1000:.2f}ms."
+    )
+
+    if errors:
+        for window_start, window_end in errors:
+            print(
+                f"Failed to generate report from {window_start:%Y-%m-%d} "
+                f"to {window_end:%Y-%m-%d}",
+                file=sys.stderr,
+            )
+        return 1
+
+
+def run_batch(argv):
+    parser = argparse.ArgumentParser(
+        prog="kpireport batch",
+        description="Generate a separate report for each configuration file",
+        allow_abbrev=False,
+    )
+    add_common_arguments(parser)
+    parser.add_argument(
+        "report_files",
+        metavar="report-file",
+        nargs="+",
+        help=(
+            "Configuration file of a report; each file is a separate report. "
+            "Any --config-file is merged into each report's configuration"
+        ),
+    )
+    parser.add_argument(
+        "-p",
+        "--parallel",
+        type=int,
+        default=1,
+        help="Number of reports to generate concurrently (default: 1)",
+    )
+
+    args = parser.parse_args(argv[1:])
+    configure_logging(args)
+
+    from .batch import generate_reports
+
+    base_configs = []
+    for config_file in chain(*args.config_file):
+        with config_file:
+            base_configs.append(config_file.read())
+    license_key = read_license_key(args)
+
+    configs = {}
+    errors = {}
+    for report_file in args.report_files:
+        try:
+            conf = load(
+                *[io.StringIO(base) for base in base_configs], open(report_file, "r")
+            )
+            configs[report_file] = apply_arguments(conf, args, license_key)
+        except Exception as exc:
+            logging.error(f"Failed to load report {report_file}: {exc}")
+            errors[report_file] = exc
+
+    start = timer()
+
+    errors.update(generate_reports(configs, jobs=args.parallel))
+
+    end = timer()
+    num_reports = len(args.report_files)
+    print(
+        f"Generated {num_reports - len(errors)} of {num_reports} reports "
+        f"in {(end - start) * 1000:.2f}ms."
+    )
+
+    if errors:
+        for report_file in errors:
+            print(f"Failed to generate report {report_file}", file=sys.stderr)
+        return 1
+
+
+def run_serve(argv):
+    parser = argparse.ArgumentParser(
+        prog="kpireport serve",
+        description="Generate reports on cron-style schedules",
+        allow_abbrev=False,
+    )
+    add_common_arguments(parser)
+    parser.add_argument(
+        "report_files",
+        metavar="report-file",
+        nargs="+",
+        help=(
+            "Configuration file of a report; each file is a separate report. "
+            "Any --config-file is merged into each report's configuration"
+        ),
+    )
+    parser.add_argument(
+        "--schedule",
+        help=(
+            "Cron expression to generate reports on, e.g., '0 8 * * 1'; reports "
+            "can override this with the 'schedule' option"
+        ),
+    )
+    parser.add_argument(
+        "--status-file", help="File to write the status of each report to"
+    )
+    parser.add_argument(
+        "--status-port",
+        type=int,
+        help="Port to serve the status of each report on, as JSON over HTTP",
+    )
+    parser.add_argument(
+        "--status-host",
+        default="127.0.0.1",
+        help=(
+            "Address to serve the status on (default: 127.0.0.1); set to 0.0.0.0 "
+            "to serve it on all addresses"
+        ),
+    )
+    parser.add_argument(
+        "-p",
+        "--parallel",
+        type=int,
+        default=1,
+        help="Number of reports to generate concurrently (default: 1)",
+    )
+
+    args = parser.parse_args(argv[1:])
+    configure_logging(args)
+
+    from .serve import Scheduler
+
+    base_files = []
+    for config_file in chain(*args.config_file):
+        config_file.close()
+        base_files.append(config_file.name)
+    license_key = read_license_key(args)
+
+    def load_report_config(report_file):
+        config_files = [open(path, "r") for path in base_files + [report_file]]
+        return apply_arguments(load(*config_files), args, license_key)
+
+    scheduler = Scheduler(
+        args.report_files,
+        load_report_config,
+        watch_files=base_files,
+        default_schedule=args.schedule,
+        jobs=args.parallel,
+        status_file=args.status_file,
+    )
+    if args.status_port:
+        scheduler.serve_status(args.status_port, host=args.status_host)
+
+    signal.signal(signal.SIGTERM, lambda signum, frame: scheduler.stop())
+    try:
+        scheduler.run_forever()
+    except KeyboardInterrupt:
+        scheduler.stop()
+
+
+COMMANDS = {"backfill": run_backfill, "batch": run_batch, "serve": run_serve}
+
+
+def run(argv=None):
+    if not argv:
+        argv = sys.argv
+
+    if len(argv) > 1 and argv[1] in COMMANDS:
+        return COMMANDS[argv[1]](argv[1:])
+
+    return run_report(argv)
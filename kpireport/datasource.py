@@ -1,6 +1,14 @@
 from abc import ABC, abstractmethod
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextlib import asynccontextmanager, nullcontext
+import copy
+import inspect
+from threading import BoundedSemaphore, Lock
+from weakref import WeakKeyDictionary
 import pandas as pd
 
+from kpireport.cache import DiskCache, IncrementalStore, QueryCache, make_key
 from kpireport.plugin import PluginManager
 
 import logging
@@ -26,9 +34,51 @@ class Datasource(ABC):
     :type id: str
     :param **kwargs: Additional datasource parameters, declared as ``args``
                      in the report configuration.
+
+    .. attribute:: max_concurrency
+
+       The maximum number of queries that can run against the Datasource at
+       the same time when Views are rendered concurrently. Datasources sharing
+       a single connection that is not thread-safe should set this to 1.
+       This can be overridden with the ``concurrency`` option in the report
+       configuration. Defaults to ``None`` (no limit.)
+
+    .. attribute:: supports_incremental
+
+       Whether the Datasource can fetch query results incrementally, i.e.,
+       over arbitrary time windows; such Datasources must implement
+       :meth:`query_window` and :meth:`time_index`. Defaults to ``False``.
+
+    .. attribute:: supported_hints
+
+       The query hints the Datasource can apply. Views can pass hints about
+       what they need from a query result, so that Datasources can avoid
+       fetching data that would be discarded. Hints are only advisory: Views
+       must produce the same output whether or not the Datasource applied
+       them. The hints are:
+
+       * ``limit`` (int): only the first rows of the result are used.
+       * ``time_bucket`` (int): the result is only used at a resolution of
+         this many seconds, e.g., because it is plotted.
+
+       Supported hints are passed to :meth:`query` (and :meth:`aquery` or
+       :meth:`query_window`) as a ``hints`` keyword argument, if any were
+       given; unsupported hints are dropped. Defaults to no hints.
+
+    .. method:: aquery(*args, **kwargs)
+       :async:
+
+       An optional coroutine version of :meth:`query`, taking the same
+       arguments. If implemented, it is used when the Datasource is queried
+       asynchronously, e.g., via :meth:`DatasourceManager.query_many`, so that
+       many queries can run concurrently on one event loop. Datasources that do
+       not implement it are queried via :meth:`query` on a worker thread.
     """
 
     id = None
+    max_concurrency = None
+    supports_incremental = False
+    supported_hints = frozenset()
 
     def __init__(self, report, **kwargs):
         self.report = report
@@ -59,16 +109,474 @@ class Datasource(ABC):
         """
         pass
 
+    def query_window(self, start_date, end_date, *args, **kwargs) -> pd.DataFrame:
+        """
+        Query the datasource over an explicit time window, instead of the
+        report window. Only required if :attr:`supports_incremental` is set.
+
+        :param datetime start_date: The start of the time window.
+        :param datetime end_date: The end of the time window.
+        :param *args: The query arguments, as passed to :meth:`query`.
+        :param **kwargs: The query keyword arguments, as passed to :meth:`query`.
+        :return: The query result.
+        :rtype: pandas.DataFrame
+        """
+        raise NotImplementedError(f"'{self.id}' does not support time windows")
+
+    def time_index(self, df: pd.DataFrame) -> pd.DatetimeIndex:
+        """
+        Get the time of each row in a query result. Only required if
+        :attr:`supports_incremental` is set.
+
+        :param pandas.DataFrame df: A query result.
+        :return: The time of each row. Times without a timezone are
+                 interpreted as local times in the report timezone.
+        :rtype: pandas.DatetimeIndex
+        """
+        raise NotImplementedError(f"'{self.id}' does not support time windows")
+
+    def bind(self, report, id=None) -> "Datasource":
+        """
+        Get a copy of the datasource for another report. The copy shares all
+        state, e.g., open connections, with this datasource.
+
+        :param report: the Report object to bind to.
+        :type report: :class:`kpireport.report.Report`
+        :param str id: the Datasource ID declared in that report's configuration.
+        :return: the bound copy.
+        :rtype: Datasource
+        """
+        bound = copy.copy(self)
+        bound.report = report
+        if id:
+            bound.id = id
+        return bound
+
+
+class DatasourcePool:
+    """Shares Datasources between reports generated in the same process.
+
+    Datasources with the same plugin and arguments are only created once;
+    each report gets its own copy of the shared Datasource, bound to that
+    report (see :meth:`Datasource.bind`.) Concurrency limits also apply across
+    all reports sharing a Datasource.
+    """
+
+    def __init__(self):
+        self._instances = QueryCache()
+        self._limits = {}
+        self._concurrency = {}
+        self._lock = Lock()
+
+    def get(self, report, plugin, plugin_class, plugin_kwargs) -> "Tuple":
+        """Get a Datasource bound to a report, creating it if necessary.
+
+        Args:
+            report (Report): the report to bind the Datasource to.
+            plugin (str): the name of the Datasource plugin.
+            plugin_class (type): the Datasource plugin class.
+            plugin_kwargs (dict): the Datasource arguments, including its ID.
+
+        Returns:
+            Tuple[Datasource, tuple]: the bound Datasource and its pool key.
+        """
+        kwargs = dict(plugin_kwargs)
+        id = kwargs.pop("id", None)
+        key = make_key(plugin, kwargs)
+        instance = self._instances.get(
+            key, lambda: plugin_class(report, id=id, **kwargs)
+        )
+        return instance.bind(report, id=id), key
+
+    def limit(self, key, concurrency) -> "Tuple[BoundedSemaphore, int]":
+        """Get the semaphore limiting concurrent queries to a shared Datasource.
+
+        Args:
+            key (tuple): the pool key of the Datasource.
+            concurrency (int): the limit, if it is not set yet.
+
+        Returns:
+            Tuple[BoundedSemaphore, int]: the semaphore and its limit.
+        """
+        with self._lock:
+            if key not in self._limits:
+                self._limits[key] = BoundedSemaphore(concurrency)
+                self._concurrency[key] = concurrency
+            return self._limits[key], self._concurrency[key]
+
+
+def _copy_on_write() -> bool:
+    major = int(pd.__version__.split(".")[0])
+    if major >= 3:
+        return True
+    try:
+        return pd.get_option("mode.copy_on_write") is True
+    except KeyError:
+        return False
+
+
+def _apply_hints(instance, kwargs, exclude=()) -> dict:
+    """Only pass on the hints a Datasource supports, if any."""
+    if "hints" not in kwargs:
+        return kwargs
+    kwargs = dict(kwargs)
+    supported = getattr(instance, "supported_hints", ())
+    hints = {
+        hint: value
+        for hint, value in kwargs.pop("hints").items()
+        if hint in supported and hint not in exclude and value is not None
+    }
+    if hints:
+        kwargs["hints"] = hints
+    return kwargs
+
+
+def _describe(args, max_length=80) -> str:
+    description = " ".join(" ".join(str(arg).split()) for arg in args)
+    if len(description) > max_length:
+        description = description[: max_length - 3] + "..."
+    return description
+
+
+def _describe_result(result) -> dict:
+    memory = result.memory_usage(deep=True)
+    if isinstance(memory, pd.Series):
+        memory = memory.sum()
+    return dict(rows=len(result), bytes=int(memory))
+
 
 class DatasourceManager(PluginManager):
+    """Manages all Datasources declared in the report configuration.
+
+    Query results are cached for the lifetime of the manager (i.e., for the
+    report run), so that multiple Views issuing the same query only fetch the
+    result once. Each caller receives its own copy of the result, so Views are
+    free to modify the DataFrames they get back.
+
+    If a ``cache_dir`` is given, results of Datasources declaring a
+    ``cache_ttl`` are additionally persisted there, and are re-used by later
+    report runs over the same report window until they expire. Results for
+    report windows that had already ended when they were stored never expire.
+
+    Datasources supporting it can instead be configured to fetch results
+    ``incremental``-ly: the stored result is merged with the part of the
+    report window it does not cover yet, which is the only part fetched from
+    the Datasource. Stored results older than the report window are discarded.
+
+    If a :class:`DatasourcePool` is given, Datasources are taken from the pool
+    instead of being created for this report alone.
+
+    Each Datasource is only created (and e.g., connects to its database) when
+    it is first queried, so that Datasources no View queries cost nothing.
+    Use :meth:`prewarm` to instead create Datasources up front, concurrently.
+    """
 
     namespace = "kpireport.datasource"
     type_noun = "datasource"
     exc_class = DatasourceError
+    lazy = True
+
+    def __init__(
+        self,
+        report,
+        config,
+        extension_manager=None,
+        cache_dir=None,
+        pool=None,
+        timings=None,
+        profiler=None,
+    ):
+        self._pool = pool
+        self._pool_keys = {}
+        self._limits = {}
+        self._concurrency = {}
+        # Queries on an event loop first wait on a semaphore of that loop, so
+        # that they don't tie up its worker threads waiting on the limit.
+        self._alimits = WeakKeyDictionary()
+        super(DatasourceManager, self).__init__(
+            report, config, extension_manager, timings=timings, profiler=profiler
+        )
+
+        self._cache = QueryCache()
+        self._disk_cache = DiskCache(cache_dir) if cache_dir else None
+        self._incremental_store = (
+            IncrementalStore(self._disk_cache) if self._disk_cache else None
+        )
+        # With copy-on-write, shallow copies are enough to isolate callers.
+        self._deep_copy = not _copy_on_write()
+
+    def create_instance(self, id, config):
+        instance = super(DatasourceManager, self).create_instance(id, config)
+        # Set up the limit before the instance is available to any query.
+        concurrency = config.get(
+            "concurrency", getattr(instance, "max_concurrency", None)
+        )
+        if isinstance(concurrency, int) and concurrency > 0:
+            if id in self._pool_keys:
+                self._limits[id], concurrency = self._pool.limit(
+                    self._pool_keys[id], concurrency
+                )
+            else:
+                self._limits[id] = BoundedSemaphore(concurrency)
+            self._concurrency[id] = concurrency
+        return instance
+
+    def plugin_factory(self, config, plugin_class, plugin_kwargs):
+        if not self._pool:
+            return super(DatasourceManager, self).plugin_factory(
+                config, plugin_class, plugin_kwargs
+            )
+
+        instance, key = self._pool.get(
+            self.report, config.get("plugin"), plugin_class, plugin_kwargs
+        )
+        self._pool_keys[plugin_kwargs["id"]] = key
+        return instance
+
+    def prewarm(self, ids: "List[str]" = None, timeout: float = None):
+        """Create Datasources before they are first queried, concurrently.
+
+        Datasources that fail to be created are logged; the error is raised
+        when they are queried.
+
+        Args:
+            ids (List[str]): the IDs of the Datasources to create. Defaults to
+                all Datasources.
+            timeout (float): the most time to wait for the Datasources to be
+                created, in seconds. Any still being created afterwards are
+                left to finish in the background; queries against them wait
+                for them.
+        """
+        ids = [id for id in (ids or self._config.keys()) if id in self._config]
+        if not ids:
+            return
+        executor = ThreadPoolExecutor(max_workers=len(ids))
+        try:
+            futures = [executor.submit(self._ensure_instance, id) for id in ids]
+            _, pending = wait(futures, timeout=timeout)
+            if pending:
+                LOG.warning(f"Timed out creating {len(pending)} datasource(s)")
+        finally:
+            executor.shutdown(wait=False)
+
+    def query(self, name, *args, hints=None, **kwargs) -> pd.DataFrame:
+        """Query a Datasource.
+
+        Results are cached, so that the same query is only executed once per
+        report. Hints the Datasource does not support are not part of the
+        cache key, so such queries share their result with unhinted ones.
+
+        Args:
+            name (str): the Datasource ID.
+            *args: the query arguments.
+            hints (dict): hints about what the caller needs from the result,
+                which the Datasource may apply if it supports them; see
+                :attr:`Datasource.supported_hints`.
+            **kwargs: the query keyword arguments.
+
+        Returns:
+            pandas.DataFrame: the query result.
+        """
+        if hints:
+            kwargs = _apply_hints(self.get_instance(name), dict(kwargs, hints=hints))
+        key = make_key(name, args, kwargs)
+        result = self._cache.get(key, lambda: self._timed_fetch(name, args, kwargs))
+        return result.copy(deep=self._deep_copy)
+
+    async def aquery(self, name, *args, hints=None, **kwargs) -> pd.DataFrame:
+        """Query a Datasource asynchronously.
+
+        Datasources implementing :meth:`Datasource.aquery` are queried on the
+        running event loop; all others are queried on a worker thread. Results
+        are cached along with those of :meth:`query`.
+
+        Args:
+            name (str): the Datasource ID.
+            *args: the query arguments.
+            hints (dict): hints about what the caller needs from the result;
+                see :meth:`query`.
+            **kwargs: the query keyword arguments.
+
+        Returns:
+            pandas.DataFrame: the query result.
+        """
+        if hints:
+            # Creating the Datasource may block, e.g., to connect to a database.
+            instance = await asyncio.get_running_loop().run_in_executor(
+                None, self.get_instance, name
+            )
+            kwargs = _apply_hints(instance, dict(kwargs, hints=hints))
+        key = make_key(name, args, kwargs)
+        result = await self._cache.aget(
+            key, lambda: self._timed_afetch(name, args, kwargs)
+        )
+        return result.copy(deep=self._deep_copy)
+
+    def query_many(self, queries: "List[tuple]") -> "List[pd.DataFrame]":
+        """Run many queries concurrently on an event loop.
+
+        This must not be called from a running event loop; use :meth:`aquery`
+        there instead.
+
+        Args:
+            queries (List[tuple]): each query, as a tuple of the Datasource ID,
+                the query arguments, and optionally the query keyword arguments,
+                e.g., ``("jenkins", ("get_job_info", "my-job"))``.
+
+        Returns:
+            List[pandas.DataFrame]: the result of each query, in order.
+
+        Raises:
+            Exception: the error raised by the first query that failed, if any.
+        """
+
+        async def gather():
+            aqueries = []
+            for name, args, *rest in queries:
+                kwargs = rest[0] if rest else {}
+                aqueries.append(self.aquery(name, *args, **kwargs))
+            return await asyncio.gather(*aqueries)
+
+        return asyncio.run(gather())
+
+    def _timed_fetch(self, name, args, kwargs) -> pd.DataFrame:
+        with self.timings.measure("query", name, query=_describe(args)) as entry:
+            result = self._fetch(name, args, kwargs)
+            entry.update(_describe_result(result))
+        return result
+
+    async def _timed_afetch(self, name, args, kwargs) -> pd.DataFrame:
+        with self.timings.measure("query", name, query=_describe(args)) as entry:
+            result = await self._afetch(name, args, kwargs)
+            entry.update(_describe_result(result))
+        return result
+
+    def _fetch(self, name, args, kwargs) -> pd.DataFrame:
+        instance = self.get_instance(name)
+        conf = self._config.get(name, {})
+        if conf.get("incremental"):
+            if not getattr(instance, "supports_incremental", False):
+                LOG.warning(f"Datasource {name} does not support incremental fetching")
+            elif not self._incremental_store:
+                LOG.warning(f"Incremental fetching for {name} requires a 'cache_dir'")
+            else:
+                return self._fetch_incremental(name, instance, conf, args, kwargs)
+
+        ttl = conf.get("cache_ttl")
+        if not (self._disk_cache and ttl is not None):
+            return self._query(name, *args, **kwargs)
+
+        key = make_key(
+            conf.get("plugin"),
+            conf.get("args"),
+            self.report.start_date.isoformat(),
+            self.report.end_date.isoformat(),
+            args,
+            kwargs,
+        )
+        result = self._disk_cache.get(
+            name, key, ttl=ttl, window_end=self.report.end_date
+        )
+        if result is None:
+            result = self._query(name, *args, **kwargs)
+            self._disk_cache.put(name, key, result)
+        return result
+
+    async def _afetch(self, name, args, kwargs) -> pd.DataFrame:
+        loop = asyncio.get_running_loop()
+        # Creating the Datasource may block, e.g., to connect to a database.
+        instance = await loop.run_in_executor(None, self.get_instance, name)
+        aquery = getattr(instance, "aquery", None)
+        conf = self._config.get(name, {})
+        persisted = conf.get("incremental") or (
+            self._disk_cache and conf.get("cache_ttl") is not None
+        )
+
+        if persisted or not inspect.iscoroutinefunction(aquery):
+            return await loop.run_in_executor(
+                None, lambda: self._fetch(name, args, kwargs)
+            )
+
+        async with self._alimit(name):
+            result = await aquery(*args, **_apply_hints(instance, kwargs))
+
+        return self._check_result(name, result)
+
+    @asynccontextmanager
+    async def _alimit(self, name):
+        limit = self._limits.get(name)
+        if not limit:
+            yield
+            return
+        loop = asyncio.get_running_loop()
+        alimits = self._alimits.setdefault(loop, {})
+        if name not in alimits:
+            alimits[name] = asyncio.Semaphore(self._concurrency[name])
+        async with alimits[name]:
+            # Only wait on a thread if the Datasource is at its limit, so as
+            # not to block the event loop. Queries of other threads hold the
+            # rest of the limit, and release it without help from this loop.
+            if not limit.acquire(blocking=False):
+                await loop.run_in_executor(None, limit.acquire)
+            try:
+                yield
+            finally:
+                limit.release()
+
+    def _fetch_incremental(self, name, instance, conf, args, kwargs) -> pd.DataFrame:
+        start_date, end_date = self.report.start_date, self.report.end_date
+        timezone = self.report.timezone
+
+        def query_window(start, end):
+            LOG.debug(f"Fetching {name} from {start} to {end}")
+            with self._limits.get(name, nullcontext()), self.profile(name):
+                # Only the first rows of the whole window are wanted, not of
+                # each part fetched.
+                return instance.query_window(
+                    start, end, *args, **_apply_hints(instance, kwargs, ["limit"])
+                )
+
+        def times(df):
+            index = instance.time_index(df)
+            if index.tz is None:
+                index = index.tz_localize(timezone, ambiguous="NaT", nonexistent="NaT")
+            return index
+
+        key = make_key(conf.get("plugin"), conf.get("args"), args, kwargs)
+        stored = self._incremental_store.get(name, key)
+
+        if not stored or start_date > stored[2] or end_date < stored[1]:
+            df = query_window(start_date, end_date)
+            window = (start_date, end_date)
+        else:
+            stored_df, stored_start, stored_end = stored
+            parts = []
+            if start_date < stored_start:
+                head = query_window(start_date, stored_start)
+                parts.append(head[times(head) < stored_start])
+            if end_date > stored_end:
+                tail = query_window(stored_end, end_date)
+                stored_df = stored_df[times(stored_df) < stored_end]
+                parts.extend([stored_df, tail[times(tail) >= stored_end]])
+            else:
+                parts.append(stored_df)
+            df = pd.concat(parts)
+            window = (min(start_date, stored_start), max(end_date, stored_end))
+
+        # Discard any history from before the current report window.
+        df = df[times(df) >= start_date]
+        self._incremental_store.put(name, key, df, start_date, window[1])
+
+        return df[times(df) <= end_date]
+
+    def _query(self, name, *args, **kwargs) -> pd.DataFrame:
+        kwargs = _apply_hints(self.get_instance(name), kwargs)
+        with self._limits.get(name, nullcontext()), self.profile(name):
+            result = self.call_instance(name, "query", *args, **kwargs)
 
-    def query(self, name, *args, **kwargs) -> pd.DataFrame:
-        result = self.call_instance(name, "query", *args, **kwargs)
+        return self._check_result(name, result)
 
+    def _check_result(self, name, result) -> pd.DataFrame:
         if not isinstance(result, pd.core.base.PandasObject):
             raise self.exc_class(
                 f"Datasource {name} returned unexpected query result type"
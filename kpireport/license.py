@@ -1,11 +1,13 @@
 from abc import ABC, abstractmethod
 from datetime import datetime
+from functools import lru_cache
+import os
 
-from authlib.jose import jwt
-from authlib.jose.errors import BadSignatureError, ExpiredTokenError, JoseError
 from jinja2 import Markup
 
-from . import license_keys
+import logging
+
+LOG = logging.getLogger(__name__)
 
 URL_PRICING = "https://kpireporter.com/pricing/"
 URL_DOCS = "https://kpi-reporter.readthedocs.io/en/latest/"
@@ -109,6 +111,21 @@ class UnlicensedState(LicenseState):
         )
 
 
+@lru_cache(maxsize=None)
+def license_keys() -> "List[bytes]":
+    """The public keys license keys are verified with."""
+    key_dir = os.path.join(os.path.dirname(__file__), "license_keys")
+    try:
+        keys = []
+        for name in sorted(os.listdir(key_dir)):
+            with open(os.path.join(key_dir, name), "rb") as f:
+                keys.append(f.read())
+        return keys
+    except Exception:
+        LOG.error("Failed to read license keys, cannot verify user license.")
+        return []
+
+
 class License:
     claims = None
     rendered = False
@@ -117,7 +134,11 @@ class License:
         self.state = UnlicensedState()
 
         if license_jwt:
-            for key in license_keys:
+            # authlib is slow to import, and only needed to verify a license.
+            from authlib.jose import jwt
+            from authlib.jose.errors import ExpiredTokenError, JoseError
+
+            for key in license_keys():
                 try:
                     self.claims = jwt.decode(license_jwt, key)
                     self.claims.validate()
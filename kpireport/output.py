@@ -75,6 +75,10 @@ class OutputDriver(ABC):
         Args:
             content (:class:`~kpireport.report.Content`): the report contents.
             blobs (List[Blob]): the blobs generated as part of the report.
+                Large blobs may be stored on disk; read their content with
+                :meth:`~kpireport.blob.Blob.save`,
+                :meth:`~kpireport.blob.Blob.open` or
+                :meth:`~kpireport.blob.Blob.getbuffer` rather than copying it.
         """
         pass
 
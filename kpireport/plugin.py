@@ -1,64 +1,193 @@
 from collections import defaultdict
+from contextlib import nullcontext
+from importlib import metadata
 import logging
+from threading import Lock
 from typing import DefaultDict
 import stevedore
 
+from kpireport.timing import Timings
+
+LOG = logging.getLogger(__name__)
+
+
+class LazyExtensionManager:
+    """Discovers the installed plugins under a namespace, but only imports
+    each plugin when it is first used.
+
+    Importing every installed plugin can take seconds, as plugins import large
+    libraries (e.g., matplotlib or cloud provider SDKs) that a report may never
+    use. Only the entry point metadata is read up front; a plugin is imported
+    the first time it is looked up. A plugin that fails to import is logged
+    and treated as not installed.
+
+    This supports the parts of the :class:`stevedore.ExtensionManager`
+    interface used by :class:`PluginManager`.
+
+    Args:
+        namespace (str): the entry point namespace, e.g., ``kpireport.view``.
+        entry_points (List[importlib.metadata.EntryPoint]): the entry points to
+            load plugins from. Defaults to all installed entry points under the
+            namespace.
+    """
+
+    def __init__(self, namespace: str, entry_points=None):
+        self.namespace = namespace
+        if entry_points is None:
+            entry_points = _entry_points(namespace)
+        self._entry_points = {}
+        for ep in entry_points:
+            # The first distribution providing a plugin name wins.
+            self._entry_points.setdefault(ep.name, ep)
+        self._extensions = {}
+        self._lock = Lock()
+
+    def names(self) -> "List[str]":
+        """The names of all installed plugins, whether loaded or not."""
+        return list(self._entry_points.keys())
+
+    @property
+    def extensions(self) -> "List[stevedore.extension.Extension]":
+        """All plugins that can be loaded. This imports every plugin."""
+        return [self._load(name) for name in self.names() if name in self]
+
+    def __contains__(self, name):
+        return self._load(name) is not None
+
+    def __getitem__(self, name):
+        extension = self._load(name)
+        if extension is None:
+            raise KeyError(name)
+        return extension
+
+    def _load(self, name):
+        with self._lock:
+            if name not in self._extensions:
+                self._extensions[name] = self._import(name)
+            return self._extensions[name]
+
+    def _import(self, name):
+        ep = self._entry_points.get(name)
+        if not ep:
+            return None
+        try:
+            plugin = ep.load()
+        except Exception as exc:
+            msg = exc
+            if ep.extras:
+                msg = (
+                    f"Ensure the [{','.join(ep.extras)}] "
+                    "extras are installed if using this plugin."
+                )
+            LOG.warning(f"Could not load plugin '{name}': {msg}")
+            return None
+        LOG.debug(f"Loaded {self.namespace} plugin {name}")
+        return stevedore.extension.Extension(name, ep, plugin, None)
+
+
+def _entry_points(namespace):
+    entry_points = metadata.entry_points()
+    if hasattr(entry_points, "select"):
+        return entry_points.select(group=namespace)
+    # Python < 3.10
+    return entry_points.get(namespace, [])
+
+
+def load_extension_manager(namespace: str) -> LazyExtensionManager:
+    """Discover all installed plugins under a given namespace.
+
+    Plugins are only imported when first used; see
+    :class:`LazyExtensionManager`.
+
+    Args:
+        namespace (str): the entry point namespace, e.g., ``kpireport.view``.
+
+    Returns:
+        LazyExtensionManager: the extension manager.
+    """
+    mgr = LazyExtensionManager(namespace)
+    LOG.info(f"Discovered {namespace} plugins: {mgr.names()}")
+    return mgr
+
 
 class PluginManager:
 
     namespace = None
     exc_class = Exception
     type_noun = "plugin"
+    #: Whether each instance is only created when it is first requested via
+    #: :meth:`get_instance`, instead of when the manager is created.
+    lazy = False
 
-    def __init__(self, report, config, extension_manager=None):
+    def __init__(
+        self, report, config, extension_manager=None, timings=None, profiler=None
+    ):
         self.log = logging.getLogger(__name__)
         self.report = report
+        self.timings = timings or Timings()
+        self.profiler = profiler
 
         if not self.namespace:
             self.namespace = f"kpireport.{self.type_noun}"
 
-        # Allowing overriding the extension manager is useful for testing
+        # Allowing overriding the extension manager is useful for testing, and
+        # for sharing plugins between multiple reports.
         if extension_manager:
             self._mgr = extension_manager
         else:
+            self._mgr = load_extension_manager(self.namespace)
 
-            def on_load_failure(manager, entrypoint, exception):
-                msg = exception
-                if entrypoint.extras:
-                    msg = (
-                        f"Ensure the [{','.join(entrypoint.extras)}] "
-                        "extras are installed if using this plugin."
-                    )
-                self.log.warn(f"Could not load plugin '{entrypoint.name}': {msg}")
-
-            self._mgr = stevedore.ExtensionManager(
-                namespace=self.namespace,
-                invoke_on_load=False,
-                on_load_failure_callback=on_load_failure,
-                verify_requirements=True,
-            )
-            loaded_names = [e.name for e in self._mgr.extensions]
-            self.log.info(f"Loaded {self.type_noun} plugins: {loaded_names}")
-
+        self._config = config
         self._instances = {}
         self._errors = defaultdict(list)
-        for id, conf in config.items():
-            try:
-                self._instances[id] = self.create_instance(id, conf)
-                self.log.info(f"Initialized {self.type_noun} {id}")
-            except Exception as exc:
-                self.log.error(
-                    f"Failed to load {self.type_noun} {id}",
-                    exc_info=self.log.isEnabledFor(logging.DEBUG),
-                )
-                self._errors[id].append(exc)
+        self._lock = Lock()
+        self._init_locks = defaultdict(Lock)
+        if not self.lazy:
+            for id in config.keys():
+                self._init_instance(id)
+
+    def _init_instance(self, id: str):
+        conf = self._config[id]
+        try:
+            with self.timings.measure(
+                "init", id, type=self.type_noun, plugin=conf.get("plugin")
+            ):
+                instance = self.create_instance(id, conf)
+            self.log.info(f"Initialized {self.type_noun} {id}")
+        except Exception as exc:
+            self.log.error(
+                f"Failed to load {self.type_noun} {id}",
+                exc_info=self.log.isEnabledFor(logging.DEBUG),
+            )
+            self._errors[id].append(exc)
+            return
+        with self._lock:
+            self._instances[id] = instance
+
+    def _ensure_instance(self, id: str):
+        with self._lock:
+            if id in self._instances or id not in self._config:
+                return
+            init_lock = self._init_locks[id]
+        # Only one thread creates each instance; others wait for it.
+        with init_lock:
+            if id not in self._instances and not self._errors[id]:
+                self._init_instance(id)
 
     @property
     def instances(self):
-        return self._instances.items()
+        with self._lock:
+            return list(self._instances.items())
 
     def get_instance(self, id: str) -> any:
+        if self.lazy:
+            self._ensure_instance(id)
+
         if id not in self._instances:
+            if self._errors[id]:
+                raise self.exc_class(
+                    f"Failed to load {self.type_noun} {id}"
+                ) from self._errors[id][0]
             raise self.exc_class(
                 (f"Could not find {self.type_noun} {id}; is it loaded?")
             )
@@ -101,5 +230,14 @@ class PluginManager:
     def plugin_factory(self, config, plugin_class, plugin_kwargs):
         return plugin_class(self.report, **plugin_kwargs)
 
+    def profile(self, id: str, *parts, **kwargs):
+        """Profile a call to a plugin instance, if profiling is enabled.
+
+        See :meth:`kpireport.profiling.Profiler.profile`.
+        """
+        if not self.profiler:
+            return nullcontext()
+        return self.profiler.profile(self.type_noun, id, *parts, **kwargs)
+
     def errors(self, id: str) -> "List[Exception]":
         return self._errors[id]
@@ -0,0 +1,157 @@
+from collections import defaultdict
+from contextlib import contextmanager
+import cProfile
+import json
+import os
+import pstats
+import re
+import sys
+import threading
+import tracemalloc
+
+import logging
+
+LOG = logging.getLogger(__name__)
+
+
+class Profiler:
+    """Profiles each unit of work of a report run with :mod:`cProfile`.
+
+    A unit is a single Datasource, View (per format) or output driver; all
+    calls to the same unit are merged into one profile. Units started while
+    another unit is running in the same thread, e.g., queries issued while a
+    View renders, are profiled on their own and excluded from the enclosing
+    unit's profile.
+
+    If ``memory`` is set, the peak memory allocated while rendering each View
+    is also tracked with :mod:`tracemalloc`. As this peak is tracked for the
+    whole process, Views should be rendered one at a time when tracking memory.
+
+    On Python 3.12 and later, only one profiler can be active at a time in
+    the whole process (see :attr:`concurrent`), so units should also be run
+    one at a time; units started while a unit of another thread is profiled
+    are not profiled, with a warning.
+
+    Args:
+        output_dir (str): the directory to save the profiles to. It is created
+            if it does not exist.
+        memory (bool): whether to track the peak memory of each View.
+
+    Attributes:
+        peak_memory (Dict[str, int]): the peak memory of each unit, in bytes,
+            if memory tracking is enabled.
+        concurrent (bool): whether units of several threads can be profiled
+            at the same time.
+    """
+
+    concurrent = sys.version_info < (3, 12)
+
+    def __init__(self, output_dir, memory=False):
+        self.output_dir = output_dir
+        self.memory = memory
+        self.peak_memory = {}
+        self._profiles = defaultdict(list)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+        if self.memory:
+            tracemalloc.start()
+
+    @contextmanager
+    def profile(self, kind: str, id: str, *parts, track_memory=False):
+        """Profile a unit of work.
+
+        Args:
+            kind (str): the kind of unit, e.g., ``"view"``.
+            id (str): the ID of the unit.
+            *parts: additional parts identifying the unit, e.g., the format.
+            track_memory (bool): whether to track the peak memory of the unit,
+                if memory tracking is enabled.
+        """
+        name = "-".join([kind, id, *parts])
+        stack = self._local.__dict__.setdefault("stack", [])
+        track_memory = track_memory and self.memory
+
+        if stack:
+            stack[-1].disable()
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError as exc:
+            # Another profiler may already be active, e.g., in another thread
+            # on interpreters where profiling is process-wide.
+            LOG.warning(f"Not profiling {name}, as another unit is profiled: {exc}")
+            profile = None
+        else:
+            stack.append(profile)
+        if track_memory:
+            _reset_peak()
+
+        try:
+            yield
+        finally:
+            if profile:
+                profile.disable()
+                stack.pop()
+                with self._lock:
+                    self._profiles[name].append(profile)
+            if stack:
+                stack[-1].enable()
+            if track_memory:
+                peak = tracemalloc.get_traced_memory()[1]
+                with self._lock:
+                    self.peak_memory[name] = max(peak, self.peak_memory.get(name, 0))
+
+    def save(self) -> "List[str]":
+        """Save a ``.pstats`` file for each unit, and a merged ``run.pstats``
+        file for the whole run, to the output directory. If memory tracking is
+        enabled, the peak memory of each unit is saved to ``memory.json``.
+
+        Returns:
+            List[str]: the paths of the saved files.
+        """
+        if self.memory:
+            tracemalloc.stop()
+
+        with self._lock:
+            profiles = dict(self._profiles)
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        paths = []
+        merged = None
+        for name, unit_profiles in profiles.items():
+            stats = pstats.Stats(*unit_profiles)
+            path = os.path.join(self.output_dir, f"{_safe_filename(name)}.pstats")
+            stats.dump_stats(path)
+            paths.append(path)
+            if merged:
+                merged.add(stats)
+            else:
+                merged = pstats.Stats(*unit_profiles)
+
+        if merged:
+            path = os.path.join(self.output_dir, "run.pstats")
+            merged.dump_stats(path)
+            paths.append(path)
+
+        if self.memory:
+            path = os.path.join(self.output_dir, "memory.json")
+            with open(path, "w") as f:
+                json.dump(self.peak_memory, f, indent=2)
+            paths.append(path)
+
+        return paths
+
+
+def _reset_peak():
+    if hasattr(tracemalloc, "reset_peak"):
+        tracemalloc.reset_peak()
+    else:
+        # On Python < 3.9, where reset_peak doesn't exist; restarting also
+        # forgets the blocks traced so far.
+        tracemalloc.stop()
+        tracemalloc.start()
+
+
+def _safe_filename(name):
+    return re.sub(r"[^\w.-]", "_", name)
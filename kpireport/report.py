@@ -1,16 +1,20 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from functools import partial
+from timeit import default_timer as timer
 
 from dateutil.parser import parse as parse_date
 from dateutil.tz import gettz, tzlocal
 from jinja2 import TemplateNotFound
 from slugify import slugify
 
+from .blob import BlobStore
 from .datasource import DatasourceManager
 from .license import License
-from .output import OutputDriverManager
+from .output import OutputDriverError, OutputDriverManager
+from .runtime import Runtime
+from .timing import Timings
 from .view import ViewManager
-from .utils import create_jinja_environment
 from .version import VERSION
 
 import logging
@@ -192,7 +196,7 @@ class Content:
         self.report = report
         self._formats = {}
 
-    def add_format(self, fmt: str, views: "list[View]"):
+    def add_format(self, fmt: str, views: "list[View]", **context):
         """Render the specified format and add to the output contents.
 
         If a layout file is found for this format, it will be used to render
@@ -210,6 +214,7 @@ class Content:
         Args:
             fmt (str): the output format, e.g., ``"md"`` or ``"html"``.
             views (List[View]): the list of Views to render
+            **context: additional variables to render the layout with.
         """
         try:
             template = self.j2.get_template(f"layout/default.{fmt}")
@@ -223,7 +228,7 @@ class Content:
             )
             content = None
         else:
-            content = template.render(views=views, report=self.report)
+            content = template.render(views=views, report=self.report, **context)
 
         # Also store a list of the raw views to allow the output
         # driver to render its own output structure
@@ -255,6 +260,55 @@ class Content:
         """
         return self._formats.get(fmt, {}).get("views", [])
 
+    def bind(
+        self, view_manager: "ViewManager", output_driver: "OutputDriver"
+    ) -> "Content":
+        """Bind the rendered content to a given output driver.
+
+        The rendered formats are shared by all output drivers; only the
+        references to blobs differ between them, as each driver can decide how
+        to render a blob inline (see
+        :meth:`~kpireport.output.OutputDriver.render_blob_inline`.)
+
+        Args:
+            view_manager (ViewManager): the manager that rendered the views.
+            output_driver (OutputDriver): the output driver to bind to.
+
+        Returns:
+            Content: a copy of the content with only the formats the driver
+                can render, and all blobs rendered inline for the driver.
+        """
+        resolve = partial(view_manager.resolve_blobs, output_driver=output_driver)
+        bound = Content(self.j2, self.report)
+        for fmt, rendered in self._formats.items():
+            if not output_driver.can_render(fmt):
+                continue
+            content = rendered["content"]
+            bound._formats[fmt] = dict(
+                content=(resolve(content) if content is not None else None),
+                views=[
+                    dict(view, output=resolve(view["output"]))
+                    for view in rendered["views"]
+                ],
+            )
+        return bound
+
+
+def _parse_date(value) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    return parse_date(value)
+
+
+def _referenced_datasources(view_conf) -> "List[str]":
+    ids = []
+    for conf in view_conf.values():
+        args = conf.get("args")
+        datasource = args.get("datasource") if isinstance(args, dict) else None
+        if isinstance(datasource, str) and datasource not in ids:
+            ids.append(datasource)
+    return ids
+
 
 class ReportFactory:
     """A factory class for building and executing an entire report.
@@ -266,15 +320,37 @@ class ReportFactory:
 
        ReportFactory(conf).create()
 
+    Views are rendered on a pool of ``workers`` threads, if configured; this
+    can greatly speed up reports where Views spend most of their time waiting
+    on their Datasources.
+
+    If a ``timeout`` is configured, Views still rendering that many seconds
+    after the report run started are rendered as errors, so that the report is
+    sent on time even if a Datasource hangs. Each View can also set its own
+    ``timeout``.
+
+    When generating several reports in the same process, pass them the same
+    :class:`~kpireport.runtime.Runtime` to share plugins and Datasources
+    between them.
+
+    The duration of each phase of the report run is collected in
+    :attr:`timings`; see :meth:`manifest` for a summary of the run. For more
+    detail, pass a :class:`~kpireport.profiling.Profiler` to profile each
+    query, View render and output driver delivery.
+
     Attributes:
         config (dict): the (parsed) configuration YAML file.
+        runtime (Runtime): the state shared with other reports, if any.
+        timings (Timings): the timings of each phase of the report run.
+        blob_store (BlobStore): holds the blobs generated by Views during the
+            report run.
         supported_formats (List[str]): the output formats that any report can
             target.
     """
 
     supported_formats = ["html", "md", "slack"]
 
-    def __init__(self, config):
+    def __init__(self, config, runtime=None, profiler=None):
         datasource_conf = config.get("datasources", {})
         view_conf = config.get("views", {})
         output_conf = config.get("outputs", {})
@@ -289,7 +365,7 @@ class ReportFactory:
 
         end_date = config.get("end_date")
         if end_date:
-            end_date = parse_date(end_date).replace(tzinfo=timezone)
+            end_date = _parse_date(end_date).replace(tzinfo=timezone)
         else:
             # Start of today
             end_date = datetime.now(tz=timezone).replace(
@@ -298,7 +374,7 @@ class ReportFactory:
 
         start_date = config.get("start_date")
         if start_date:
-            start_date = parse_date(start_date).replace(tzinfo=timezone)
+            start_date = _parse_date(start_date).replace(tzinfo=timezone)
         else:
             start_date = end_date - timedelta(days=interval_days)
 
@@ -313,13 +389,79 @@ class ReportFactory:
             timezone=timezone,
             theme=theme,
         )
-        self.dm = DatasourceManager(self.report, datasource_conf)
-        self.vm = ViewManager(self.dm, self.report, view_conf)
-        self.odm = OutputDriverManager(self.report, output_conf)
-        self.env = create_jinja_environment(theme)
+        self.runtime = runtime or Runtime()
+        self.timings = Timings()
+
+        workers = config.get("workers", 1)
+        if profiler and profiler.memory and workers > 1:
+            # The peak memory of each View can only be attributed to it if no
+            # other View is rendered at the same time.
+            LOG.warning("Rendering Views one at a time to track their memory")
+            workers = 1
+        elif profiler and not profiler.concurrent and workers > 1:
+            LOG.warning("Rendering Views one at a time to profile them")
+            workers = 1
+        self.profiler = profiler
+        self.dm = DatasourceManager(
+            self.report,
+            datasource_conf,
+            extension_manager=self._extension_manager(DatasourceManager.namespace),
+            cache_dir=config.get("cache_dir"),
+            pool=self.runtime.datasource_pool,
+            timings=self.timings,
+            profiler=profiler,
+        )
+        self.timeout = config.get("timeout")
+        self._prewarm = []
+        if config.get("prewarm_datasources"):
+            self._prewarm = _referenced_datasources(view_conf)
+        self.blob_store = BlobStore(
+            max_memory=config.get("blob_memory_limit_mb", 64) * 1024 * 1024
+        )
+        self.vm = ViewManager(
+            self.dm,
+            self.report,
+            view_conf,
+            extension_manager=self._extension_manager(ViewManager.namespace),
+            workers=workers,
+            timings=self.timings,
+            profiler=profiler,
+            blob_store=self.blob_store,
+        )
+        self.odm = OutputDriverManager(
+            self.report,
+            output_conf,
+            extension_manager=self._extension_manager(OutputDriverManager.namespace),
+            timings=self.timings,
+            profiler=profiler,
+        )
+        # The environment may be shared with other reports; it must not hold
+        # any state of this report.
+        self.env = self.runtime.jinja_environment(theme, config.get("cache_dir"))
 
         self.license = License(config.get("license_key"))
-        self.env.globals["print_license"] = self.license.render
+
+    def _extension_manager(self, namespace):
+        with self.timings.measure("discover", namespace):
+            return self.runtime.extension_manager(namespace)
+
+    def manifest(self) -> dict:
+        """Get a machine-readable summary of the report run.
+
+        Returns:
+            dict: the report ID, title and window, and the timings of each phase
+                of the report run (see :class:`~kpireport.timing.Timings`.)
+        """
+        return dict(
+            version=VERSION,
+            report=dict(
+                id=self.report.id,
+                title=self.report.title,
+                start_date=self.report.start_date.isoformat(),
+                end_date=self.report.end_date.isoformat(),
+            ),
+            timings=self.timings.entries,
+        )
 
     def create(self):
         """Render all Views in the report and output using the output driver.
@@ -329,14 +471,79 @@ class ReportFactory:
            This will send the report using all configured output drivers!
            Disable any output drivers you don't wish to send to during testing.
 
+        The output drivers send the report concurrently. An error in one
+        output driver does not prevent the others from sending the report.
+
+        Raises:
+            OutputDriverError: if any output driver failed to send the report.
         """
-        for id, output_driver in self.odm.instances:
+        try:
+            with self.timings.measure("report", self.report.id):
+                self._create()
+        finally:
+            self.blob_store.close()
+
+    def _create(self):
+        deadline = None
+        if self.timeout:
+            deadline = timer() + self.timeout
+
+        if self._prewarm:
+            self.dm.prewarm(self._prewarm, timeout=self.timeout)
+
+        output_drivers = list(self.odm.instances)
+
+        # Render each format once, regardless of how many output drivers
+        # target it; the output drivers only differ in how blobs are rendered.
+        content = Content(self.env, self.report)
+        for fmt in self.supported_formats:
+            if not any(driver.can_render(fmt) for _, driver in output_drivers):
+                continue
+            views = self.vm.render(self.env, fmt, deadline=deadline)
+            with self.timings.measure("layout", fmt):
+                content.add_format(
+                    fmt, views, print_license=partial(self.license.render, fmt)
+                )
+
+        for blob in self.vm.blobs:
+            self.timings.record(
+                "blob",
+                blob.id,
+                bytes=blob.size,
+                mime_type=blob.mime_type,
+                spilled=blob.path is not None,
+            )
+
+        # Only the HTML layout is required to print the license.
+        if "html" in content.formats and not self.license.rendered:
+            raise ValueError("Template is missing `{{ print_license() }}` call")
+
+        def send(id, output_driver):
             LOG.info(f"Sending report via output driver {id}")
-            content = Content(self.env, self.report)
-            for fmt in self.supported_formats:
-                self.env.globals["print_license"] = partial(self.license.render, fmt)
-                views = self.vm.render(self.env, fmt, output_driver)
-                content.add_format(fmt, views)
-            if not self.license.rendered:
-                raise ValueError("Template is missing `{{ print_license() }}` call")
-            output_driver.render_output(content, self.vm.blobs)
+            start = timer()
+            try:
+                with self.timings.measure("send", id), self.odm.profile(id):
+                    output_driver.render_output(
+                        content.bind(self.vm, output_driver), self.vm.blobs
+                    )
+            except Exception as exc:
+                LOG.error(
+                    f"Error sending report via output driver {id}: {exc}",
+                    exc_info=LOG.isEnabledFor(logging.DEBUG),
+                )
+                return exc
+            elapsed = (timer() - start) * 1000
+            LOG.info(f"Sent report via output driver {id} in {elapsed:.2f}ms")
+
+        max_workers = max(len(output_drivers), 1)
+        if self.profiler and not self.profiler.concurrent:
+            # Only one output driver can be profiled at a time.
+            max_workers = 1
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = executor.map(lambda d: (d[0], send(*d)), output_drivers)
+            errors = {id: exc for id, exc in results if exc}
+
+        if errors:
+            raise OutputDriverError(
+                f"Failed to send report via output drivers: {', '.join(errors)}"
+            ) from next(iter(errors.values()))
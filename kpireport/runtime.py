@@ -0,0 +1,76 @@
+from threading import Lock
+
+from kpireport.datasource import DatasourcePool
+from kpireport.plugin import load_extension_manager
+from kpireport.utils import create_jinja_environment
+
+
+class Runtime:
+    """State shared by all reports generated in the same process.
+
+    Generating many reports in one process (e.g., when backfilling report
+    windows) should not pay the setup cost of each report again. A Runtime
+    holds the parts of that setup that can be shared between reports:
+
+    * the installed plugins, which are only discovered once per namespace;
+    * the Jinja environments, so that templates are only compiled once per
+      theme;
+    * the Datasources, which are pooled and shared between all reports that
+      declare the same Datasource plugin and arguments (see
+      :class:`~kpireport.datasource.DatasourcePool`.)
+
+    A Runtime can be shared by reports generated concurrently.
+
+    .. code-block:: python
+
+       runtime = Runtime()
+       for conf in confs:
+           ReportFactory(conf, runtime=runtime).create()
+
+    Args:
+        extension_managers (Dict[str, LazyExtensionManager]): extension
+            managers to use instead of discovering the installed plugins, by
+            namespace. This is useful for testing.
+
+    Attributes:
+        datasource_pool (DatasourcePool): the pool of shared Datasources.
+    """
+
+    def __init__(self, extension_managers=None):
+        self.datasource_pool = DatasourcePool()
+        self._extension_managers = dict(extension_managers or {})
+        self._jinja_environments = {}
+        self._lock = Lock()
+
+    def extension_manager(self, namespace: str) -> "LazyExtensionManager":
+        """Get the extension manager for a plugin namespace.
+
+        Args:
+            namespace (str): the entry point namespace, e.g., ``kpireport.view``.
+
+        Returns:
+            LazyExtensionManager: the extension manager.
+        """
+        with self._lock:
+            if namespace not in self._extension_managers:
+                self._extension_managers[namespace] = load_extension_manager(namespace)
+            return self._extension_managers[namespace]
+
+    def jinja_environment(self, theme: "Theme", cache_dir=None) -> "Environment":
+        """Get the Jinja environment for a theme.
+
+        Args:
+            theme (Theme): the report theme.
+            cache_dir (str): a directory to store compiled templates in, so that
+                they are also re-used by later processes.
+
+        Returns:
+            jinja2.Environment: the environment.
+        """
+        key = (theme.theme_dir, cache_dir)
+        with self._lock:
+            if key not in self._jinja_environments:
+                self._jinja_environments[key] = create_jinja_environment(
+                    theme, cache_dir=cache_dir
+                )
+            return self._jinja_environments[key]
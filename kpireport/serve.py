@@ -0,0 +1,274 @@
+from concurrent.futures import ThreadPoolExecutor
+from copy import deepcopy
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import os
+import tempfile
+from threading import Event, Lock, Thread
+from timeit import default_timer as timer
+
+from .report import ReportFactory
+from .runtime import Runtime
+
+import logging
+
+try:
+    from croniter import croniter
+except ImportError:
+    croniter = None
+
+LOG = logging.getLogger(__name__)
+
+
+class ScheduledReport:
+    """A report generated on a cron-style schedule.
+
+    Attributes:
+        path (str): the configuration file of the report.
+        config (dict): the (parsed) configuration of the report.
+        schedule (str): the cron expression the report is generated on.
+        next_run (datetime): when the report is generated next.
+        mtime (float): the modification time of the configuration the report
+            was last loaded from.
+        running (bool): whether the report is being generated.
+        status (dict): the status of the report, see :meth:`Scheduler.status`.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.config = None
+        self.schedule = None
+        self.next_run = None
+        self.mtime = None
+        self.running = False
+        self.status = dict(last_run=None, load_error=None)
+
+
+class Scheduler:
+    """Generates reports on cron-style schedules in a long-running process.
+
+    All reports share one :class:`~kpireport.runtime.Runtime`, which is kept
+    for the lifetime of the scheduler, so plugins are only discovered once and
+    Datasource connections are re-used by every run. Configuration files are
+    reloaded when they change on disk; if a changed file cannot be loaded, the
+    previous configuration is kept.
+
+    Each report is generated on the cron expression declared as ``schedule`` in
+    its configuration, or on the ``default_schedule``. A report is skipped if
+    its previous run has not finished yet.
+
+    Args:
+        report_files (List[str]): the configuration file of each report.
+        load_config (Callable[[str], dict]): a function loading the
+            configuration of a report from its file.
+        watch_files (List[str]): additional files the configuration of every
+            report depends on, e.g., a shared base configuration.
+        default_schedule (str): the schedule of reports not declaring their own.
+        runtime (Runtime): the runtime to share. A new one is created if not
+            given.
+        jobs (int): the number of reports to generate concurrently.
+        status_file (str): a file to write the status of all reports to after
+            each run.
+    """
+
+    def __init__(
+        self,
+        report_files,
+        load_config,
+        watch_files=None,
+        default_schedule=None,
+        runtime=None,
+        jobs=1,
+        status_file=None,
+    ):
+        if not croniter:
+            raise ImportError(
+                (
+                    "Scheduling reports requires the croniter module; ensure the "
+                    "[serve] extras are installed."
+                )
+            )
+
+        self.reports = [ScheduledReport(path) for path in report_files]
+        self.load_config = load_config
+        self.watch_files = watch_files or []
+        self.default_schedule = default_schedule
+        self.runtime = runtime or Runtime()
+        self.status_file = status_file
+        self._executor = ThreadPoolExecutor(max_workers=max(jobs, 1))
+        self._lock = Lock()
+        self._stop = Event()
+
+    def reload(self, now: datetime = None):
+        """Load the configuration of every report that changed since last load.
+
+        Args:
+            now (datetime): the current time, used to schedule the next run of
+                reloaded reports.
+        """
+        now = now or datetime.now()
+        for report in self.reports:
+            try:
+                mtime = max(
+                    os.stat(path).st_mtime for path in [report.path] + self.watch_files
+                )
+            except OSError as exc:
+                report.status["load_error"] = str(exc)
+                continue
+
+            if mtime == report.mtime:
+                continue
+
+            try:
+                config = self.load_config(report.path)
+                schedule = config.get("schedule", self.default_schedule)
+                if not schedule:
+                    raise ValueError("No schedule declared; use the 'schedule' option")
+                next_run = croniter(schedule, now).get_next(datetime)
+            except Exception as exc:
+                LOG.error(f"Failed to load report {report.path}: {exc}")
+                report.status["load_error"] = str(exc)
+                report.mtime = mtime
+                continue
+
+            if report.config is not None:
+                LOG.info(f"Reloaded report {report.path}")
+            if schedule != report.schedule:
+                report.next_run = next_run
+            report.config = config
+            report.schedule = schedule
+            report.mtime = mtime
+            report.status["load_error"] = None
+
+    def run_pending(self, now: datetime = None) -> "List[Future]":
+        """Generate all reports that are due.
+
+        Args:
+            now (datetime): the current time.
+
+        Returns:
+            List[Future]: a future for each report run started.
+        """
+        now = now or datetime.now()
+        futures = []
+        for report in self.reports:
+            if report.next_run is None or report.next_run > now:
+                continue
+            report.next_run = croniter(report.schedule, now).get_next(datetime)
+            with self._lock:
+                if report.running:
+                    LOG.warning(
+                        f"Skipping report {report.path}; previous run not finished"
+                    )
+                    continue
+                report.running = True
+            futures.append(self._executor.submit(self._generate, report))
+        return futures
+
+    def _generate(self, report):
+        started = datetime.now()
+        start = timer()
+        error = None
+        try:
+            ReportFactory(deepcopy(report.config), runtime=self.runtime).create()
+        except Exception as exc:
+            LOG.error(
+                f"Failed to generate report {report.path}: {exc}",
+                exc_info=LOG.isEnabledFor(logging.DEBUG),
+            )
+            error = str(exc)
+        elapsed = (timer() - start) * 1000
+        if not error:
+            LOG.info(f"Generated report {report.path} in {elapsed:.2f}ms")
+
+        with self._lock:
+            report.running = False
+            report.status["last_run"] = dict(
+                started=started.isoformat(),
+                duration_ms=round(elapsed, 2),
+                success=error is None,
+                error=error,
+            )
+        self.write_status()
+
+    def status(self) -> dict:
+        """Get the status of all reports.
+
+        Returns:
+            dict: for each report (by configuration file), its schedule, the
+                time of its next run, whether it is running, the outcome of its
+                last run, and the error loading its configuration, if any.
+        """
+        with self._lock:
+            return {
+                report.path: dict(
+                    schedule=report.schedule,
+                    next_run=(report.next_run.isoformat() if report.next_run else None),
+                    running=report.running,
+                    **report.status,
+                )
+                for report in self.reports
+            }
+
+    def write_status(self):
+        """Write the status of all reports to the status file, if any."""
+        if not self.status_file:
+            return
+        status_dir = os.path.dirname(os.path.abspath(self.status_file))
+        fd, tmp_path = tempfile.mkstemp(dir=status_dir)
+        with os.fdopen(fd, "w") as f:
+            json.dump(self.status(), f, indent=2)
+        os.replace(tmp_path, self.status_file)
+
+    def serve_status(self, port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+        """Serve the status of all reports as JSON over HTTP, in the background.
+
+        Args:
+            port (int): the port to listen on.
+            host (str): the address to listen on. Defaults to ``127.0.0.1``, so
+                the status is only served locally.
+
+        Returns:
+            ThreadingHTTPServer: the server.
+        """
+        scheduler = self
+
+        class StatusHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = json.dumps(scheduler.status()).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                LOG.debug(format % args)
+
+        server = ThreadingHTTPServer((host, port), StatusHandler)
+        Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+    def run_forever(self, poll_interval=30):
+        """Generate reports on their schedules until :meth:`stop` is called.
+
+        Args:
+            poll_interval (int): how often to check configuration files for
+                changes, in seconds.
+        """
+        while not self._stop.is_set():
+            self.reload()
+            self.run_pending()
+            next_runs = [r.next_run for r in self.reports if r.next_run]
+            timeout = poll_interval
+            if next_runs:
+                until_next = (min(next_runs) - datetime.now()).total_seconds()
+                timeout = max(0, min(timeout, until_next))
+            self._stop.wait(timeout)
+
+        self._executor.shutdown(wait=True)
+
+    def stop(self):
+        """Stop generating reports. Runs already started are completed."""
+        self._stop.set()
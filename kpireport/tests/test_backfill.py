@@ -0,0 +1,126 @@
+from datetime import datetime, timedelta
+from threading import Lock
+import unittest
+
+import pandas as pd
+
+from kpireport.backfill import backfill, parse_interval, report_windows
+from kpireport.datasource import Datasource
+from kpireport.output import OutputDriver
+from kpireport.runtime import Runtime
+from kpireport.tests.utils import make_test_extension_manager
+from kpireport.view import View
+
+PLUGIN = "my_plugin"
+
+
+class TestDatasource(Datasource):
+    created = 0
+    lock = Lock()
+
+    def init(self, host=None):
+        with self.lock:
+            TestDatasource.created += 1
+
+    def query(self, input):
+        return pd.DataFrame({"start": [self.report.start_date]})
+
+
+class TestView(View):
+    def init(self):
+        pass
+
+    def render_html(self, env):
+        df = self.datasources.query("db", "input")
+        return f"{df['start'][0]:%Y-%m-%d}"
+
+
+class TestOutputDriver(OutputDriver):
+    sent = []
+
+    def init(self, fail_on=None):
+        self.fail_on = fail_on
+
+    def render_output(self, content, blobs):
+        if self.report.start_date.strftime("%Y-%m-%d") == self.fail_on:
+            raise ValueError("Failed to send")
+        self.sent.append(content.get_views("html")[0]["output"])
+
+
+def make_runtime():
+    return Runtime(
+        extension_managers={
+            namespace: make_test_extension_manager([(PLUGIN, plugin)])
+            for namespace, plugin in [
+                ("kpireport.datasource", TestDatasource),
+                ("kpireport.view", TestView),
+                ("kpireport.output", TestOutputDriver),
+            ]
+        }
+    )
+
+
+class BackfillTestCase(unittest.TestCase):
+    def setUp(self):
+        TestDatasource.created = 0
+        TestOutputDriver.sent = []
+
+    def _make_config(self, fail_on=None):
+        return {
+            "title": "Report",
+            "interval_days": 7,
+            "datasources": {"db": {"plugin": PLUGIN, "args": {"host": "db"}}},
+            "views": {"view": {"plugin": PLUGIN}},
+            "outputs": {"output": {"plugin": PLUGIN, "args": {"fail_on": fail_on}}},
+        }
+
+    def test_parse_interval(self):
+        self.assertEqual(parse_interval("7d"), timedelta(days=7))
+        self.assertEqual(parse_interval("2w"), timedelta(days=14))
+        for invalid in ["", "7", "0d", "1h", "d7"]:
+            with self.assertRaises(ValueError):
+                parse_interval(invalid)
+
+    def test_report_windows(self):
+        windows = report_windows(
+            datetime(2020, 1, 1), datetime(2020, 1, 22), timedelta(days=7), 7
+        )
+        self.assertEqual(
+            windows,
+            [
+                (datetime(2020, 1, 1), datetime(2020, 1, 8)),
+                (datetime(2020, 1, 8), datetime(2020, 1, 15)),
+                (datetime(2020, 1, 15), datetime(2020, 1, 22)),
+            ],
+        )
+
+    def test_report_windows_overlapping(self):
+        windows = report_windows(
+            datetime(2020, 1, 1), datetime(2020, 1, 10), timedelta(days=1), 7
+        )
+        self.assertEqual(len(windows), 3)
+        self.assertEqual(windows[-1], (datetime(2020, 1, 3), datetime(2020, 1, 10)))
+
+    def test_backfill_shares_datasources(self):
+        windows = report_windows(
+            datetime(2020, 1, 1), datetime(2020, 2, 26), timedelta(days=7), 7
+        )
+        errors = backfill(self._make_config(), windows, runtime=make_runtime(), jobs=4)
+
+        self.assertEqual(errors, {})
+        self.assertEqual(TestDatasource.created, 1)
+        self.assertEqual(
+            sorted(TestOutputDriver.sent),
+            [f"{start:%Y-%m-%d}" for start, _ in windows],
+        )
+
+    def test_backfill_errors_are_isolated(self):
+        windows = report_windows(
+            datetime(2020, 1, 1), datetime(2020, 1, 22), timedelta(days=7), 7
+        )
+        errors = backfill(
+            self._make_config(fail_on="2020-01-08"), windows, runtime=make_runtime()
+        )
+
+        self.assertEqual(list(errors), [windows[1]])
+        self.assertEqual(TestOutputDriver.sent, ["2020-01-01", "2020-01-15"])
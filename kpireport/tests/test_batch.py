@@ -0,0 +1,51 @@
+import unittest
+
+from kpireport.batch import generate_reports
+from kpireport.tests.test_backfill import (
+    PLUGIN,
+    TestDatasource,
+    TestOutputDriver,
+    make_runtime,
+)
+
+
+def make_config(start_date, host="db", fail_on=None):
+    return {
+        "title": f"Report {start_date}",
+        "start_date": start_date,
+        "end_date": "2020-02-01",
+        "datasources": {"db": {"plugin": PLUGIN, "args": {"host": host}}},
+        "views": {"view": {"plugin": PLUGIN}},
+        "outputs": {"output": {"plugin": PLUGIN, "args": {"fail_on": fail_on}}},
+    }
+
+
+class GenerateReportsTestCase(unittest.TestCase):
+    def setUp(self):
+        TestDatasource.created = 0
+        TestOutputDriver.sent = []
+
+    def test_datasources_are_pooled(self):
+        configs = {
+            "a": make_config("2020-01-01"),
+            "b": make_config("2020-01-02"),
+            "c": make_config("2020-01-03", host="other"),
+        }
+        errors = generate_reports(configs, runtime=make_runtime(), jobs=3)
+
+        self.assertEqual(errors, {})
+        # Reports a and b declare the same Datasource.
+        self.assertEqual(TestDatasource.created, 2)
+        self.assertEqual(
+            sorted(TestOutputDriver.sent), ["2020-01-01", "2020-01-02", "2020-01-03"]
+        )
+
+    def test_errors_are_isolated(self):
+        configs = {
+            "a": make_config("2020-01-01", fail_on="2020-01-01"),
+            "b": make_config("2020-01-02"),
+        }
+        errors = generate_reports(configs, runtime=make_runtime())
+
+        self.assertEqual(list(errors), ["a"])
+        self.assertEqual(TestOutputDriver.sent, ["2020-01-02"])
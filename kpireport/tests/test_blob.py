@@ -0,0 +1,83 @@
+import io
+import os
+import tempfile
+import unittest
+
+from kpireport.blob import Blob, BlobStore
+
+
+class BlobStoreTestCase(unittest.TestCase):
+    def setUp(self):
+        self.store = BlobStore(max_memory=10, spill_size=6)
+        self.addCleanup(self.store.close)
+
+    def test_small_blob_kept_in_memory(self):
+        blob = Blob("view/small", io.BytesIO(b"small"))
+        self.store.add(blob)
+
+        self.assertIsNone(blob.path)
+        self.assertEqual(self.store.memory, 5)
+        self.assertEqual(bytes(blob.getbuffer()), b"small")
+
+    def test_large_blob_spilled(self):
+        blob = Blob("view/large", io.BytesIO(b"large blob"))
+        self.store.add(blob)
+
+        self.assertTrue(os.path.isfile(blob.path))
+        self.assertEqual(self.store.memory, 0)
+        self.assertEqual(blob.size, 10)
+        self.assertEqual(bytes(blob.getbuffer()), b"large blob")
+        with blob.open() as f:
+            self.assertEqual(f.read(), b"large blob")
+        self.assertEqual(blob.content.getvalue(), b"large blob")
+
+    def test_blob_not_spilled_once_closed(self):
+        self.store.close()
+        blob = Blob("view/large", io.BytesIO(b"large blob"))
+        self.store.add(blob)
+
+        self.assertIsNone(blob.path)
+
+    def test_blobs_over_memory_limit_spilled(self):
+        blobs = [Blob(f"view/{i}", f"blob{i}".encode()) for i in range(3)]
+        for blob in blobs:
+            self.store.add(blob)
+        self.store.add(blobs[0])
+
+        self.assertEqual([blob.path is None for blob in blobs], [True, True, False])
+        self.assertEqual(self.store.memory, 10)
+
+    def test_identical_blobs_share_memory(self):
+        blobs = [Blob(f"view/{i}", io.BytesIO(b"blob")) for i in range(3)]
+        for blob in blobs:
+            self.store.add(blob)
+
+        self.assertEqual(self.store.memory, 4)
+        self.assertEqual(len({blob.digest for blob in blobs}), 1)
+        self.assertEqual([bytes(blob.getbuffer()) for blob in blobs], [b"blob"] * 3)
+
+    def test_identical_blobs_share_spilled_file(self):
+        blobs = [Blob(f"view/{i}", b"large blob") for i in range(2)]
+        for blob in blobs:
+            self.store.add(blob)
+
+        self.assertIsNotNone(blobs[0].path)
+        self.assertEqual(blobs[0].path, blobs[1].path)
+        self.assertEqual(len(os.listdir(os.path.dirname(blobs[0].path))), 1)
+
+    def test_save(self):
+        blobs = [Blob("view/small", b"small"), Blob("view/large", b"large blob")]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for i, blob in enumerate(blobs):
+                self.store.add(blob)
+                path = os.path.join(tmp_dir, str(i))
+                blob.save(path)
+                with open(path, "rb") as f:
+                    self.assertEqual(f.read(), bytes(blob.getbuffer()))
+
+    def test_close_removes_spilled_blobs(self):
+        blob = Blob("view/large", b"large blob")
+        self.store.add(blob)
+        self.store.close()
+
+        self.assertFalse(os.path.exists(blob.path))
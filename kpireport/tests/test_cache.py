@@ -0,0 +1,105 @@
+from datetime import datetime, timedelta, timezone
+import os
+import pandas as pd
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from kpireport.cache import DiskCache, IncrementalStore, make_key
+
+NAMESPACE = "my_datasource"
+
+
+class MakeKeyTestCase(unittest.TestCase):
+    def test_unhashable_arguments(self):
+        key = make_key("query", {"metrics": ["a", "b"], "filters": {"x": 1}})
+        self.assertEqual(
+            key, make_key("query", {"filters": {"x": 1}, "metrics": ["a", "b"]})
+        )
+        hash(key)
+
+
+class DiskCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache = DiskCache(self.tmp_dir.name)
+        self.df = pd.DataFrame({"value": [1.0, 2.0]})
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _age(self, key, seconds):
+        for fmt in self.cache.formats:
+            path = self.cache._path(NAMESPACE, key, fmt)
+            if os.path.exists(path):
+                stored_at = time.time() - seconds
+                os.utime(path, (stored_at, stored_at))
+
+    def test_missing(self):
+        self.assertIsNone(self.cache.get(NAMESPACE, make_key("missing"), ttl=60))
+
+    def test_get_within_ttl(self):
+        key = make_key("query")
+        self.cache.put(NAMESPACE, key, self.df)
+
+        pd.testing.assert_frame_equal(self.df, self.cache.get(NAMESPACE, key, ttl=60))
+
+    def test_expired(self):
+        key = make_key("query")
+        self.cache.put(NAMESPACE, key, self.df)
+        self._age(key, 120)
+
+        self.assertIsNone(self.cache.get(NAMESPACE, key, ttl=60))
+
+    def test_closed_window_never_expires(self):
+        key = make_key("query")
+        window_end = datetime.now(tz=timezone.utc) - timedelta(days=1)
+        self.cache.put(NAMESPACE, key, self.df)
+        self._age(key, 120)
+
+        pd.testing.assert_frame_equal(
+            self.df, self.cache.get(NAMESPACE, key, ttl=60, window_end=window_end)
+        )
+
+    def test_series(self):
+        key = make_key("query")
+        series = pd.Series([1, 2], name="value")
+        self.cache.put(NAMESPACE, key, series)
+
+        pd.testing.assert_series_equal(series, self.cache.get(NAMESPACE, key, ttl=60))
+
+    def test_metadata(self):
+        key = make_key("query")
+        self.cache.put(NAMESPACE, key, self.df)
+        self.cache.put_metadata(NAMESPACE, key, {"rows": 2})
+
+        self.assertEqual(self.cache.get_metadata(NAMESPACE, key), {"rows": 2})
+        self.assertIsNone(self.cache.get_metadata(NAMESPACE, make_key("missing")))
+        pd.testing.assert_frame_equal(self.df, self.cache.get(NAMESPACE, key))
+
+
+class IncrementalStoreTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache = DiskCache(self.tmp_dir.name)
+        self.store = IncrementalStore(self.cache)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_put_replaces_previous_window(self):
+        key = make_key("query")
+        first = pd.DataFrame({"value": [1.0]})
+        second = pd.DataFrame({"value": [1.0, 2.0]})
+        start = datetime(2020, 1, 1)
+        self.store.put(NAMESPACE, key, first, start, datetime(2020, 1, 2))
+
+        # Replacing a result doesn't read the previous one.
+        with patch.object(self.cache, "get", side_effect=AssertionError):
+            self.store.put(NAMESPACE, key, second, start, datetime(2020, 1, 3))
+
+        result, start_date, end_date = self.store.get(NAMESPACE, key)
+        pd.testing.assert_frame_equal(second, result)
+        self.assertEqual((start_date, end_date), (start, datetime(2020, 1, 3)))
+        self.assertEqual(len(os.listdir(os.path.join(self.tmp_dir.name, NAMESPACE))), 2)
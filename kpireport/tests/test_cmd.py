@@ -0,0 +1,59 @@
+import os
+import subprocess
+import sys
+import unittest
+
+import kpireport
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(kpireport.__file__)))
+
+# Modules that are slow to import, and that are not needed to parse arguments.
+DEFERRED_MODULES = [
+    "authlib",
+    "jinja2",
+    "matplotlib",
+    "numpy",
+    "pandas",
+    "pkg_resources",
+    "kpireport.report",
+]
+# Generous, as this is measured on shared CI runners; without the deferred
+# modules, importing the CLI typically takes well under 100ms.
+IMPORT_BUDGET_MS = 500
+
+
+def import_times(*args) -> dict:
+    """Run the CLI with ``-X importtime``, and get the cumulative import time
+    of each module, in microseconds."""
+    env = dict(os.environ, PYTHONPATH=ROOT_DIR)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "kpireport", *args],
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+class ImportTimeTestCase(unittest.TestCase):
+    def _assert_within_budget(self, *args):
+        times = import_times(*args)
+        self.assertIn("kpireport.cmd", times)
+        for module in DEFERRED_MODULES:
+            self.assertNotIn(module, times, f"{module} imported by {args}")
+        self.assertLess(times["kpireport.cmd"] / 1000, IMPORT_BUDGET_MS)
+
+    def test_help(self):
+        self._assert_within_budget("--help")
+
+    def test_subcommand_help(self):
+        for command in ["backfill", "batch", "serve"]:
+            with self.subTest(command=command):
+                self._assert_within_budget(command, "--help")
@@ -1,6 +1,12 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 import pandas as pd
+import tempfile
+from threading import Lock, Thread
+import time
 import unittest
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, Mock
 
 from kpireport.datasource import DatasourceError
 from kpireport.datasource import DatasourceManager
@@ -71,3 +77,290 @@ class DatasourceManagerTestCase(unittest.TestCase):
         )
 
         pd.testing.assert_frame_equal(df, mgr.query(NAME, "some input"))
+
+    def test_created_on_first_query(self):
+        created = []
+
+        class TestPlugin(BaseTestPlugin):
+            def __init__(self, report, id=None):
+                created.append(id)
+
+            def query(self, input):
+                return pd.DataFrame()
+
+        mgr = self._make_datasource_manager(
+            conf={NAME: {"plugin": PLUGIN}, "unused": {"plugin": PLUGIN}},
+            plugins=[(PLUGIN, TestPlugin)],
+        )
+        self.assertEqual(created, [])
+
+        mgr.query(NAME, "some input")
+        mgr.query(NAME, "other input")
+        self.assertEqual(created, [NAME])
+
+    def test_create_error_raised_on_query(self):
+        init = MagicMock(side_effect=ValueError("Cannot connect"))
+
+        class TestPlugin(BaseTestPlugin):
+            def __init__(self, report, id=None):
+                init()
+
+        mgr = self._make_datasource_manager(plugins=[(PLUGIN, TestPlugin)])
+
+        for _ in range(2):
+            with self.assertRaises(DatasourceError):
+                mgr.query(NAME, "some input")
+        self.assertEqual(init.call_count, 1)
+
+    def test_prewarm(self):
+        created = []
+
+        class TestPlugin(BaseTestPlugin):
+            def __init__(self, report, id=None):
+                time.sleep(0.01)
+                created.append(id)
+
+        mgr = self._make_datasource_manager(
+            conf={id: {"plugin": PLUGIN} for id in ["first", "second", "unused"]},
+            plugins=[(PLUGIN, TestPlugin)],
+        )
+        mgr.prewarm(["first", "second", "missing"])
+
+        self.assertEqual(sorted(created), ["first", "second"])
+
+    def test_concurrency_limit(self):
+        lock = Lock()
+        running = []
+
+        class TestPlugin(BaseTestPlugin):
+            max_concurrency = 2
+
+            def query(self, input):
+                with lock:
+                    running.append(input)
+                    peak = len(running)
+                time.sleep(0.01)
+                with lock:
+                    running.remove(input)
+                return pd.DataFrame([peak])
+
+        mgr = self._make_datasource_manager(plugins=[(PLUGIN, TestPlugin)])
+
+        with ThreadPoolExecutor(max_workers=6) as executor:
+            results = list(executor.map(lambda i: mgr.query(NAME, i), range(6)))
+
+        self.assertLessEqual(max(df[0][0] for df in results), 2)
+
+    def test_query_results_are_cached(self):
+        query = MagicMock(return_value=pd.DataFrame({"value": [1, 2]}))
+
+        class TestPlugin(BaseTestPlugin):
+            def query(self, input, **kwargs):
+                return query(input, **kwargs)
+
+        mgr = self._make_datasource_manager(plugins=[(PLUGIN, TestPlugin)])
+
+        first = mgr.query(NAME, "some input", columns=["value"])
+        first["value"] = 0
+        second = mgr.query(NAME, "some input", columns=["value"])
+        mgr.query(NAME, "other input")
+
+        self.assertEqual(query.call_count, 2)
+        self.assertEqual(list(second["value"]), [1, 2])
+
+    def test_query_hints(self):
+        query = MagicMock(return_value=pd.DataFrame({"value": [1, 2]}))
+
+        class HintedPlugin(BaseTestPlugin):
+            supported_hints = {"limit"}
+
+            def query(self, input, **kwargs):
+                return query(input, **kwargs)
+
+        class TestPlugin(BaseTestPlugin):
+            def query(self, input):
+                return query(input)
+
+        mgr = self._make_datasource_manager(
+            conf={NAME: {"plugin": "hinted"}, "other": {"plugin": PLUGIN}},
+            plugins=[("hinted", HintedPlugin), (PLUGIN, TestPlugin)],
+        )
+
+        hints = {"limit": 1, "time_bucket": 60}
+        mgr.query(NAME, "some input", hints=hints)
+        query.assert_called_with("some input", hints={"limit": 1})
+        # Unsupported hints are not passed on.
+        mgr.query("other", "some input", hints=hints)
+        query.assert_called_with("some input")
+        # Results are cached separately for each set of hints.
+        mgr.query(NAME, "some input")
+        query.assert_called_with("some input")
+        self.assertEqual(query.call_count, 3)
+        # Unsupported hints don't change the cache key.
+        mgr.query("other", "some input")
+        mgr.query(NAME, "some input", hints={"time_bucket": 60})
+        mgr.query_many([("other", ("some input",), {"hints": hints})])
+        self.assertEqual(query.call_count, 3)
+
+    def test_concurrent_queries_are_single_flight(self):
+        calls = []
+
+        class TestPlugin(BaseTestPlugin):
+            def query(self, input):
+                calls.append(input)
+                time.sleep(0.01)
+                return pd.DataFrame([1])
+
+        mgr = self._make_datasource_manager(plugins=[(PLUGIN, TestPlugin)])
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(lambda _: mgr.query(NAME, "some input"), range(4)))
+
+        self.assertEqual(calls, ["some input"])
+
+    def test_failed_queries_are_not_cached(self):
+        query = MagicMock(side_effect=[ValueError("Query failed"), pd.DataFrame()])
+
+        class TestPlugin(BaseTestPlugin):
+            def query(self, input):
+                return query(input)
+
+        mgr = self._make_datasource_manager(plugins=[(PLUGIN, TestPlugin)])
+
+        with self.assertRaises(ValueError):
+            mgr.query(NAME, "some input")
+        pd.testing.assert_frame_equal(pd.DataFrame(), mgr.query(NAME, "some input"))
+
+    def test_persistent_cache(self):
+        query = MagicMock(return_value=pd.DataFrame({"value": [1, 2]}))
+
+        class TestPlugin(BaseTestPlugin):
+            def query(self, input):
+                return query(input)
+
+        report = Mock(
+            start_date=datetime(2020, 1, 1, tzinfo=timezone.utc),
+            end_date=datetime(2020, 1, 8, tzinfo=timezone.utc),
+        )
+        conf = {NAME: {"plugin": PLUGIN, "cache_ttl": 60}}
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            for _ in range(2):
+                mgr = DatasourceManager(
+                    report,
+                    conf,
+                    extension_manager=make_test_extension_manager(
+                        [(PLUGIN, TestPlugin)]
+                    ),
+                    cache_dir=cache_dir,
+                )
+                mgr.query(NAME, "some input")
+
+        self.assertEqual(query.call_count, 1)
+
+    def test_incremental_fetch(self):
+        windows = []
+
+        class TestPlugin(BaseTestPlugin):
+            supports_incremental = True
+
+            def query(self, input):
+                raise AssertionError("Expected incremental fetch")
+
+            def query_window(self, start_date, end_date, input):
+                windows.append((start_date, end_date))
+                times = pd.date_range(start_date, end_date, freq="D")
+                return pd.DataFrame({"value": times.day}, index=times)
+
+            def time_index(self, df):
+                return df.index
+
+        conf = {NAME: {"plugin": PLUGIN, "incremental": True}}
+
+        def run(start_day, end_day):
+            report = Mock(
+                start_date=datetime(2020, 1, start_day, tzinfo=timezone.utc),
+                end_date=datetime(2020, 1, end_day, tzinfo=timezone.utc),
+                timezone=timezone.utc,
+            )
+            mgr = DatasourceManager(
+                report,
+                conf,
+                extension_manager=make_test_extension_manager([(PLUGIN, TestPlugin)]),
+                cache_dir=cache_dir,
+            )
+            return mgr.query(NAME, "some input")
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            run(1, 8)
+            df = run(2, 9)
+
+        self.assertEqual(windows[1], (windows[0][1], df.index[-1].to_pydatetime()))
+        self.assertEqual(list(df["value"]), list(range(2, 10)))
+
+    def test_query_many_async(self):
+        running = []
+        peak = []
+
+        class TestPlugin(BaseTestPlugin):
+            max_concurrency = 3
+
+            def query(self, input):
+                raise AssertionError("Should query asynchronously")
+
+            async def aquery(self, input, scale=1):
+                running.append(input)
+                peak.append(len(running))
+                await asyncio.sleep(0.01)
+                running.remove(input)
+                return pd.DataFrame([input * scale])
+
+        mgr = self._make_datasource_manager(plugins=[(PLUGIN, TestPlugin)])
+
+        results = mgr.query_many(
+            [(NAME, (i,)) for i in range(6)] + [(NAME, (1,), {"scale": 10})]
+        )
+
+        self.assertEqual([df[0][0] for df in results], [0, 1, 2, 3, 4, 5, 10])
+        self.assertEqual(max(peak), 3)
+
+    def test_query_many_more_queries_than_threads(self):
+        class TestPlugin(BaseTestPlugin):
+            max_concurrency = 2
+
+            async def aquery(self, input):
+                loop = asyncio.get_running_loop()
+                await loop.run_in_executor(None, time.sleep, 0.001)
+                return pd.DataFrame([input])
+
+        mgr = self._make_datasource_manager(plugins=[(PLUGIN, TestPlugin)])
+
+        results = []
+        # Run in a thread, so that a deadlock fails the test instead of hanging.
+        thread = Thread(
+            target=lambda: results.extend(
+                mgr.query_many([(NAME, (i,)) for i in range(100)])
+            ),
+            daemon=True,
+        )
+        thread.start()
+        thread.join(timeout=10)
+
+        self.assertFalse(thread.is_alive(), "query_many deadlocked")
+        self.assertEqual([df[0][0] for df in results], list(range(100)))
+
+    def test_query_many_sync_fallback(self):
+        calls = Mock()
+
+        class TestPlugin(BaseTestPlugin):
+            def query(self, input):
+                calls(input)
+                return pd.DataFrame([input])
+
+        mgr = self._make_datasource_manager(plugins=[(PLUGIN, TestPlugin)])
+
+        results = mgr.query_many([(NAME, ("a",)), (NAME, ("a",)), (NAME, ("b",))])
+        mgr.query(NAME, "b")
+
+        self.assertEqual([df[0][0] for df in results], ["a", "a", "b"])
+        self.assertEqual(calls.call_count, 2)
@@ -1,7 +1,8 @@
+from importlib.metadata import EntryPoint
 import unittest
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
-from kpireport.plugin import PluginManager
+from kpireport.plugin import LazyExtensionManager, PluginManager
 from kpireport.tests.utils import BaseTestPlugin, make_test_extension_manager
 
 NAME = "my_name"
@@ -16,6 +17,45 @@ class TestPluginManager(PluginManager):
     exc_class = TestException
 
 
+class TestPlugin(BaseTestPlugin):
+    pass
+
+
+class LazyExtensionManagerTestCase(unittest.TestCase):
+    def _make_extension_manager(self):
+        return LazyExtensionManager(
+            "kpireport.test",
+            entry_points=[
+                EntryPoint(PLUGIN, f"{__name__}:TestPlugin", "kpireport.test"),
+                EntryPoint("broken", "kpireport.missing:Plugin", "kpireport.test"),
+            ],
+        )
+
+    def test_load_on_first_use(self):
+        mgr = self._make_extension_manager()
+        with patch.object(EntryPoint, "load", return_value=TestPlugin) as load:
+            self.assertEqual(mgr.names(), [PLUGIN, "broken"])
+            load.assert_not_called()
+            self.assertIs(mgr[PLUGIN].plugin, TestPlugin)
+            self.assertIn(PLUGIN, mgr)
+            load.assert_called_once()
+
+    def test_load_failure(self):
+        mgr = self._make_extension_manager()
+        self.assertNotIn("broken", mgr)
+        self.assertNotIn("missing", mgr)
+        self.assertEqual([e.name for e in mgr.extensions], [PLUGIN])
+
+    def test_plugin_manager(self):
+        mgr = TestPluginManager(
+            MagicMock(),
+            {NAME: {"plugin": PLUGIN}, "other": {"plugin": "broken"}},
+            extension_manager=self._make_extension_manager(),
+        )
+        self.assertIsInstance(mgr.get_instance(NAME), TestPlugin)
+        self.assertIsInstance(mgr.errors("other")[0], TestException)
+
+
 class PluginManagerTestCase(unittest.TestCase):
     def _make_plugin_manager(
         self, conf={NAME: {"plugin": PLUGIN}}, plugins=[(PLUGIN, MagicMock())]
@@ -0,0 +1,110 @@
+import json
+import os
+import pstats
+import tempfile
+import tracemalloc
+from types import SimpleNamespace
+import unittest
+from unittest.mock import patch
+
+from kpireport.profiling import Profiler
+from kpireport.report import ReportFactory
+from kpireport.tests.test_backfill import PLUGIN, make_runtime
+
+
+def busy(n):
+    return sum(i * i for i in range(n))
+
+
+def also_busy(n):
+    return sum(i * i for i in range(n))
+
+
+class ProfilerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _functions(self, path):
+        return {func[2] for func in pstats.Stats(path).stats}
+
+    def test_nested_units_are_excluded(self):
+        profiler = Profiler(self.tmp_dir.name)
+
+        with profiler.profile("view", "outer"):
+            busy(1000)
+            with profiler.profile("datasource", "inner"):
+                also_busy(1000)
+        profiler.save()
+
+        outer = self._functions(os.path.join(self.tmp_dir.name, "view-outer.pstats"))
+        inner = self._functions(
+            os.path.join(self.tmp_dir.name, "datasource-inner.pstats")
+        )
+        merged = self._functions(os.path.join(self.tmp_dir.name, "run.pstats"))
+        self.assertIn("busy", outer)
+        self.assertNotIn("also_busy", outer)
+        self.assertIn("also_busy", inner)
+        self.assertTrue({"busy", "also_busy"} <= merged)
+
+    def test_memory_without_reset_peak(self):
+        # Python < 3.9 has no tracemalloc.reset_peak.
+        old_tracemalloc = SimpleNamespace(
+            start=tracemalloc.start,
+            stop=tracemalloc.stop,
+            get_traced_memory=tracemalloc.get_traced_memory,
+        )
+        with patch("kpireport.profiling.tracemalloc", old_tracemalloc):
+            profiler = Profiler(self.tmp_dir.name, memory=True)
+            with profiler.profile("view", "view", track_memory=True):
+                data = [0] * 10000
+            profiler.save()
+
+        self.assertGreater(profiler.peak_memory["view-view"], 0)
+        del data
+
+    def test_report_units(self):
+        conf = {
+            "title": "Report",
+            "end_date": "2020-01-08",
+            "workers": 2,
+            "datasources": {"db": {"plugin": PLUGIN}},
+            "views": {"view": {"plugin": PLUGIN}},
+            "outputs": {"output": {"plugin": PLUGIN}},
+        }
+        profiler = Profiler(self.tmp_dir.name, memory=True)
+        factory = ReportFactory(conf, runtime=make_runtime(), profiler=profiler)
+        factory.create()
+        profiler.save()
+
+        self.assertEqual(factory.vm.workers, 1)
+        self.assertEqual(
+            sorted(os.listdir(self.tmp_dir.name)),
+            [
+                "datasource-db.pstats",
+                "memory.json",
+                "output_driver-output.pstats",
+                "run.pstats",
+                "view-view-html.pstats",
+                "view-view-md.pstats",
+            ],
+        )
+        with open(os.path.join(self.tmp_dir.name, "memory.json")) as f:
+            self.assertGreater(json.load(f)["view-view-html"], 0)
+
+    def test_views_rendered_one_at_a_time_without_concurrent_profiling(self):
+        conf = {
+            "title": "Report",
+            "end_date": "2020-01-08",
+            "workers": 2,
+            "datasources": {"db": {"plugin": PLUGIN}},
+            "views": {"view": {"plugin": PLUGIN}},
+            "outputs": {"output": {"plugin": PLUGIN}},
+        }
+        profiler = Profiler(self.tmp_dir.name)
+        profiler.concurrent = False
+        factory = ReportFactory(conf, runtime=make_runtime(), profiler=profiler)
+
+        self.assertEqual(factory.vm.workers, 1)
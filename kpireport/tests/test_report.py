@@ -0,0 +1,72 @@
+import unittest
+from unittest.mock import MagicMock
+
+from kpireport.output import OutputDriver, OutputDriverError, OutputDriverManager
+from kpireport.report import ReportFactory
+from kpireport.tests.test_backfill import make_runtime
+from kpireport.tests.utils import make_test_extension_manager
+
+PLUGIN = "my_plugin"
+
+
+class TestOutputDriver(OutputDriver):
+    def init(self, fail=False):
+        self.fail = fail
+        self.sent = False
+
+    def render_output(self, content, blobs):
+        if self.fail:
+            raise ValueError("Failed to send")
+        self.sent = True
+
+
+class ReportFactoryTestCase(unittest.TestCase):
+    def _make_report_factory(self, outputs):
+        factory = ReportFactory(dict(title="Report", end_date="2020-01-08"))
+        factory.odm = OutputDriverManager(
+            factory.report,
+            outputs,
+            extension_manager=make_test_extension_manager([(PLUGIN, TestOutputDriver)]),
+        )
+        factory.license = MagicMock(rendered=True)
+        return factory
+
+    def test_output_driver_errors_are_isolated(self):
+        factory = self._make_report_factory(
+            {
+                "failing": {"plugin": PLUGIN, "args": {"fail": True}},
+                "working": {"plugin": PLUGIN},
+            }
+        )
+
+        with self.assertRaises(OutputDriverError):
+            factory.create()
+
+        self.assertTrue(factory.odm.get_instance("working").sent)
+
+    def test_manifest(self):
+        conf = {
+            "title": "Report",
+            "end_date": "2020-01-08",
+            "datasources": {"db": {"plugin": PLUGIN}},
+            "views": {"view": {"plugin": PLUGIN}},
+            "outputs": {"output": {"plugin": PLUGIN}},
+        }
+        factory = ReportFactory(conf, runtime=make_runtime())
+        factory.create()
+
+        manifest = factory.manifest()
+        self.assertEqual(manifest["report"]["id"], factory.report.id)
+        phases = {(e["phase"], e["id"]) for e in manifest["timings"]}
+        for phase in [
+            ("discover", "kpireport.view"),
+            ("init", "db"),
+            ("query", "db"),
+            ("render", "view"),
+            ("layout", "html"),
+            ("send", "output"),
+            ("report", factory.report.id),
+        ]:
+            self.assertIn(phase, phases)
+        (query,) = [e for e in manifest["timings"] if e["phase"] == "query"]
+        self.assertEqual(query["rows"], 1)
@@ -0,0 +1,87 @@
+from datetime import datetime
+import json
+import os
+import tempfile
+import unittest
+
+from kpireport.config import load
+from kpireport.serve import Scheduler, croniter
+from kpireport.tests.test_backfill import PLUGIN, TestOutputDriver, make_runtime
+
+REPORT = """
+title: Report
+schedule: "{schedule}"
+start_date: "2020-01-01"
+end_date: "2020-01-08"
+datasources:
+  db:
+    plugin: {plugin}
+views:
+  view:
+    plugin: {plugin}
+outputs:
+  output:
+    plugin: {plugin}
+"""
+
+
+@unittest.skipUnless(croniter, "croniter is not installed")
+class SchedulerTestCase(unittest.TestCase):
+    def setUp(self):
+        TestOutputDriver.sent = []
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "report.yaml")
+        self.status_file = os.path.join(self.tmp_dir.name, "status.json")
+        self._write_report("0 * * * *")
+        self.scheduler = Scheduler(
+            [self.path],
+            lambda path: load(open(path, "r")),
+            runtime=make_runtime(),
+            status_file=self.status_file,
+        )
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _write_report(self, schedule, mtime=None):
+        with open(self.path, "w") as f:
+            f.write(REPORT.format(schedule=schedule, plugin=PLUGIN))
+        if mtime:
+            os.utime(self.path, (mtime, mtime))
+
+    def test_run_pending(self):
+        self.scheduler.reload(now=datetime(2020, 1, 1, 0, 30))
+        self.assertEqual(
+            self.scheduler.run_pending(now=datetime(2020, 1, 1, 0, 59)), []
+        )
+
+        futures = self.scheduler.run_pending(now=datetime(2020, 1, 1, 1))
+        for future in futures:
+            future.result()
+
+        self.assertEqual(len(futures), 1)
+        self.assertEqual(TestOutputDriver.sent, ["2020-01-01"])
+        with open(self.status_file, "r") as f:
+            status = json.load(f)[self.path]
+        self.assertTrue(status["last_run"]["success"])
+        self.assertEqual(status["next_run"], "2020-01-01T02:00:00")
+
+    def test_reload_on_change(self):
+        self.scheduler.reload(now=datetime(2020, 1, 1, 0, 30))
+
+        self._write_report("0 0 * * *", mtime=os.stat(self.path).st_mtime + 10)
+        self.scheduler.reload(now=datetime(2020, 1, 1, 0, 30))
+
+        status = self.scheduler.status()[self.path]
+        self.assertEqual(status["schedule"], "0 0 * * *")
+        self.assertEqual(status["next_run"], "2020-01-02T00:00:00")
+
+    def test_invalid_reload_keeps_config(self):
+        self.scheduler.reload(now=datetime(2020, 1, 1, 0, 30))
+
+        self._write_report("invalid", mtime=os.stat(self.path).st_mtime + 10)
+        self.scheduler.reload(now=datetime(2020, 1, 1, 0, 30))
+
+        status = self.scheduler.status()[self.path]
+        self.assertEqual(status["schedule"], "0 * * * *")
+        self.assertIsNotNone(status["load_error"])
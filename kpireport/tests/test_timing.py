@@ -0,0 +1,39 @@
+import unittest
+
+from kpireport.timing import Timings
+
+
+class TimingsTestCase(unittest.TestCase):
+    def test_measure(self):
+        timings = Timings()
+
+        with timings.measure("query", "db", query="input") as entry:
+            entry.update(rows=10)
+
+        (entry,) = timings.entries
+        self.assertEqual(entry["phase"], "query")
+        self.assertEqual(entry["id"], "db")
+        self.assertEqual(entry["rows"], 10)
+        self.assertGreaterEqual(entry["duration_ms"], 0)
+
+    def test_measure_error(self):
+        timings = Timings()
+
+        with self.assertRaises(ValueError):
+            with timings.measure("render", "view"):
+                raise ValueError("Failed to render")
+
+        self.assertEqual(timings.entries[0]["error"], "Failed to render")
+
+    def test_format_table(self):
+        timings = Timings()
+        timings.record("render", "fast", duration_ms=1)
+        timings.record("blob", "view/figure", bytes=100)
+        timings.record("render", "slow", duration_ms=100, format="html")
+
+        lines = timings.format_table().splitlines()
+
+        self.assertEqual(len(lines), 4)
+        self.assertTrue(lines[1].startswith("render  slow"))
+        self.assertTrue(lines[1].endswith("format=html"))
+        self.assertTrue(lines[3].startswith("blob"))
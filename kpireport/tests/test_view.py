@@ -1,2 +1,211 @@
+from datetime import datetime
+import io
+import os
+import tempfile
+import time
+from timeit import default_timer as timer
+import unittest
+from unittest.mock import MagicMock, patch
+
+from jinja2 import PackageLoader
+
+from kpireport.output import OutputDriver
+from kpireport.report import Content, Report, Theme
+from kpireport.tests.utils import make_test_extension_manager
+from kpireport.utils import create_jinja_environment
+from kpireport.view import View, ViewManager
+
+NAME = "my_view"
+PLUGIN = "my_plugin"
+
+
 def test_view():
     pass
+
+
+class BlobView(View):
+    def init(self):
+        self.add_blob("figure.png", io.BytesIO(b"png"), mime_type="image/png")
+
+    def render_html(self, j2):
+        return j2.from_string("<p>{{ 'figure.png' | blob }}</p>").render()
+
+    def render_md(self, j2):
+        return j2.from_string("{{ 'figure.png' | blob }}").render()
+
+
+class SlowView(View):
+    def init(self, delay=0):
+        self.delay = delay
+
+    def render_html(self, j2):
+        time.sleep(self.delay)
+        return self.id
+
+
+class TestOutputDriver(OutputDriver):
+    def init(self, prefix=None):
+        self.prefix = prefix
+
+    def render_blob_inline(self, blob, fmt=None):
+        return f"{self.prefix}/{blob.id}.{fmt}"
+
+    def render_output(self, content, blobs):
+        pass
+
+
+class ViewManagerTestCase(unittest.TestCase):
+    def _make_view_manager(
+        self, conf={NAME: {"plugin": PLUGIN}}, plugin=BlobView, **kwargs
+    ):
+        mgr = make_test_extension_manager([(PLUGIN, plugin)])
+        return ViewManager(
+            MagicMock(), MagicMock(), conf, extension_manager=mgr, **kwargs
+        )
+
+    def test_concurrent_render_preserves_order(self):
+        conf = {
+            f"view_{i}": {"plugin": PLUGIN, "args": {"delay": (5 - i) * 0.01}}
+            for i in range(5)
+        }
+        vm = self._make_view_manager(conf=conf, plugin=SlowView, workers=5)
+        env = create_jinja_environment(Theme())
+
+        blocks = vm.render(env, "html")
+
+        self.assertEqual([b["output"] for b in blocks], list(conf.keys()))
+
+    def test_view_timeout(self):
+        conf = {
+            "slow": {"plugin": PLUGIN, "timeout": 0.05, "args": {"delay": 1}},
+            "fast": {"plugin": PLUGIN, "timeout": 0.5},
+        }
+        vm = self._make_view_manager(conf=conf, plugin=SlowView)
+        env = create_jinja_environment(Theme())
+
+        start = time.monotonic()
+        blocks = vm.render(env, "html")
+
+        self.assertLess(time.monotonic() - start, 0.5)
+        self.assertEqual([b["tags"] for b in blocks], [["error"], []])
+        self.assertEqual(blocks[1]["output"], "fast")
+
+    def test_abandoned_render_does_not_store_blobs(self):
+        class SlowBlobView(SlowView):
+            def render_html(self, j2):
+                time.sleep(self.delay)
+                self.add_blob("late.png", io.BytesIO(b"png"), mime_type="image/png")
+                return self.id
+
+        conf = {NAME: {"plugin": PLUGIN, "timeout": 0.05, "args": {"delay": 0.1}}}
+        blob_store = MagicMock()
+        vm = self._make_view_manager(
+            conf=conf, plugin=SlowBlobView, blob_store=blob_store
+        )
+        env = create_jinja_environment(Theme())
+
+        blocks = vm.render(env, "html")
+        time.sleep(0.2)
+
+        self.assertEqual(blocks[0]["tags"], ["error"])
+        blob_store.add.assert_not_called()
+
+    def test_report_deadline(self):
+        conf = {
+            "slow": {"plugin": PLUGIN, "args": {"delay": 1}},
+            "fast": {"plugin": PLUGIN},
+        }
+        vm = self._make_view_manager(conf=conf, plugin=SlowView, workers=2)
+        env = create_jinja_environment(Theme())
+
+        blocks = vm.render(env, "html", deadline=timer() + 0.05)
+
+        self.assertEqual([b["tags"] for b in blocks], [["error"], []])
+        # Once the deadline has passed, Views are not rendered at all.
+        blocks = vm.render(env, "html", deadline=timer())
+        self.assertEqual([b["tags"] for b in blocks], [["error"], ["error"]])
+
+    def test_render_leaves_blob_references(self):
+        vm = self._make_view_manager()
+        env = create_jinja_environment(Theme())
+
+        blocks = vm.render(env, "html")
+
+        self.assertEqual(len(blocks), 1)
+        self.assertNotIn(f"{NAME}/figure.png", blocks[0]["output"])
+        self.assertEqual(blocks[0]["tags"], [])
+
+    def test_blob_reference_followed_by_digits(self):
+        class DigitsView(BlobView):
+            def render_html(self, j2):
+                return j2.from_string("{{ 'figure.png' | blob }}0").render()
+
+        vm = self._make_view_manager(plugin=DigitsView)
+        env = create_jinja_environment(Theme())
+        driver = TestOutputDriver(MagicMock(), prefix="a")
+
+        blocks = vm.render(env, "html")
+
+        self.assertEqual(
+            vm.resolve_blobs(blocks[0]["output"], driver),
+            f"a/{NAME}/figure.png.html0",
+        )
+
+    def test_package_environment_is_reused(self):
+        vm = self._make_view_manager(
+            conf={"first": {"plugin": PLUGIN}, "second": {"plugin": PLUGIN}},
+            workers=2,
+        )
+        env = create_jinja_environment(Theme())
+
+        with patch("kpireport.view.PackageLoader", wraps=PackageLoader) as loader:
+            for fmt in ["html", "md"]:
+                blocks = vm.render(env, fmt)
+                self.assertEqual([b["tags"] for b in blocks], [[], []])
+
+        self.assertEqual(loader.call_count, 1)
+
+    def test_resolve_blobs_per_output_driver(self):
+        vm = self._make_view_manager()
+        env = create_jinja_environment(Theme())
+        output = vm.render(env, "html")[0]["output"]
+
+        first = TestOutputDriver(MagicMock(), prefix="first")
+        second = TestOutputDriver(MagicMock(), prefix="second")
+
+        self.assertEqual(
+            vm.resolve_blobs(output, first), f"<p>first/{NAME}/figure.png.html</p>"
+        )
+        self.assertEqual(
+            vm.resolve_blobs(output, second), f"<p>second/{NAME}/figure.png.html</p>"
+        )
+
+    def test_content_bind_skips_unsupported_formats(self):
+        vm = self._make_view_manager()
+        env = create_jinja_environment(Theme())
+        env.globals["print_license"] = lambda: ""
+        report = Report(
+            title="Report",
+            start_date=datetime(2020, 1, 1),
+            end_date=datetime(2020, 1, 8),
+        )
+        content = Content(env, report)
+        for fmt in ["html", "md"]:
+            content.add_format(fmt, vm.render(env, fmt))
+
+        driver = TestOutputDriver(MagicMock(), prefix="p")
+        driver.supported_formats = ["md"]
+        bound = content.bind(vm, driver)
+
+        self.assertEqual(list(bound.formats), ["md"])
+        self.assertEqual(bound.get_views("md")[0]["output"], f"p/{NAME}/figure.png.md")
+        self.assertIn(f"p/{NAME}/figure.png.md", bound.get_format("md"))
+
+
+class JinjaEnvironmentTestCase(unittest.TestCase):
+    def test_bytecode_cache(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            env = create_jinja_environment(Theme(), cache_dir=cache_dir)
+            env.get_template("layout/default.md")
+
+            self.assertEqual(len(os.listdir(os.path.join(cache_dir, "jinja"))), 1)
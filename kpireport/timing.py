@@ -0,0 +1,102 @@
+from contextlib import contextmanager
+from threading import Lock
+from timeit import default_timer as timer
+
+
+class Timings:
+    """Collects the timings of each phase of a report run.
+
+    Each entry is a dict with the ``phase`` (e.g., ``"query"`` or
+    ``"render"``), the ``id`` of whatever was timed (e.g., the View ID), the
+    ``duration_ms``, and any additional details of the phase, such as the number
+    of rows returned by a query. Entries can be added from multiple threads.
+
+    .. code-block:: python
+
+       with timings.measure("query", "my_datasource") as entry:
+           df = datasource.query(...)
+           entry.update(rows=len(df))
+    """
+
+    def __init__(self):
+        self._entries = []
+        self._lock = Lock()
+
+    @contextmanager
+    def measure(self, phase: str, id: str = None, **details):
+        """Time a phase of the report run.
+
+        The entry is yielded so that details only known at the end of the phase
+        can be added to it. If the phase raises an error, the entry is still
+        recorded, with ``error`` set.
+
+        Args:
+            phase (str): the phase.
+            id (str): the ID of whatever is timed, if any.
+            **details: additional details of the phase.
+        """
+        entry = dict(phase=phase, id=id, **details)
+        start = timer()
+        try:
+            yield entry
+        except Exception as exc:
+            entry.update(error=str(exc))
+            raise
+        finally:
+            self.record(duration_ms=(timer() - start) * 1000, **entry)
+
+    def record(self, phase: str, id: str = None, duration_ms: float = None, **details):
+        """Record a phase of the report run that was timed elsewhere.
+
+        Args:
+            phase (str): the phase.
+            id (str): the ID of whatever was timed, if any.
+            duration_ms (float): the duration of the phase, if it has one.
+            **details: additional details of the phase.
+        """
+        if duration_ms is not None:
+            duration_ms = round(duration_ms, 3)
+        entry = dict(phase=phase, id=id, duration_ms=duration_ms, **details)
+        with self._lock:
+            self._entries.append(entry)
+
+    @property
+    def entries(self) -> "List[dict]":
+        """All entries, in the order they were recorded."""
+        with self._lock:
+            return list(self._entries)
+
+    def format_table(self) -> str:
+        """Format all entries as a table, slowest first.
+
+        Returns:
+            str: the table.
+        """
+        entries = sorted(
+            self.entries,
+            key=lambda e: -1 if e["duration_ms"] is None else e["duration_ms"],
+            reverse=True,
+        )
+        rows = [("PHASE", "ID", "MS", "DETAILS")]
+        for entry in entries:
+            details = {
+                k: v
+                for k, v in entry.items()
+                if k not in ("phase", "id", "duration_ms")
+            }
+            duration = entry["duration_ms"]
+            rows.append(
+                (
+                    entry["phase"],
+                    entry["id"] or "",
+                    "" if duration is None else f"{duration:.2f}",
+                    " ".join(f"{k}={v}" for k, v in details.items()),
+                )
+            )
+
+        widths = [max(len(row[i]) for row in rows) for i in range(3)]
+        return "\n".join(
+            f"{row[0]:<{widths[0]}}  {row[1]:<{widths[1]}}  "
+            f"{row[2]:>{widths[2]}}  {row[3]}".rstrip()
+            for row in rows
+        )
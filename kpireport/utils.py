@@ -1,16 +1,29 @@
 from datetime import datetime
+import os
 from jinja2 import Environment, ChoiceLoader, FileSystemLoader, PackageLoader
+from jinja2 import FileSystemBytecodeCache
 
 
 def module_root(module_str):
     return module_str.split(".")[0]
 
 
-def create_jinja_environment(theme: "~kpireport.report.Theme"):
+def create_jinja_environment(theme: "~kpireport.report.Theme", cache_dir=None):
     def datetime_format(value):
         return datetime.strftime(value, "%b %d")
 
-    env = Environment(loader=create_jinja_loader(theme), autoescape=True)
+    bytecode_cache = None
+    if cache_dir:
+        # Compiled templates are re-used by later runs.
+        bytecode_dir = os.path.join(cache_dir, "jinja")
+        os.makedirs(bytecode_dir, exist_ok=True)
+        bytecode_cache = FileSystemBytecodeCache(bytecode_dir)
+
+    env = Environment(
+        loader=create_jinja_loader(theme),
+        autoescape=True,
+        bytecode_cache=bytecode_cache,
+    )
     env.filters["datetimeformat"] = datetime_format
 
     return env
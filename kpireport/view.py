@@ -1,9 +1,17 @@
 from abc import ABC, abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError
+from functools import partial
+import re
+from threading import Event, local, Lock, Thread
+from timeit import default_timer as timer
 import traceback
+from uuid import uuid4
+from weakref import WeakKeyDictionary
 
 from jinja2 import Environment, ChoiceLoader, PackageLoader
-from jinja2 import evalcontextfilter
+from jinja2 import escape, evalcontextfilter
 
+from kpireport.blob import Blob, BlobStore
 from kpireport.datasource import DatasourceManager
 from kpireport.output import OutputDriver
 from kpireport.plugin import PluginManager
@@ -14,12 +22,55 @@ class ViewException(Exception):
     pass
 
 
-class Blob:
-    def __init__(self, id, content, mime_type=None, title=None):
-        self.id = id
-        self.content = content
-        self.mime_type = mime_type
-        self.title = title
+# The View currently being rendered on each thread, so that template filters,
+# which are shared by all Views, can look up the View's blobs.
+_rendering = local()
+
+# The environment for each package providing Views, for each base environment.
+_package_envs = WeakKeyDictionary()
+_package_envs_lock = Lock()
+
+
+@evalcontextfilter
+def _render_blob(eval_ctx, blob_id):
+    manager, view_id, fmt = _rendering.view
+    return manager.render_blob(view_id, fmt, blob_id, eval_ctx.autoescape)
+
+
+def package_environment(env: Environment, package: str) -> Environment:
+    """Get the environment to render a package's Views with.
+
+    The environment can additionally load templates from the ``templates``
+    directory of the package. It is created once per package and base
+    environment, so that templates are only loaded and compiled once, no matter
+    how many Views, formats and output drivers they are rendered for.
+
+    Args:
+        env (Environment): the base environment.
+        package (str): the root package, e.g., ``kpireport_plot``.
+
+    Returns:
+        Environment: the environment.
+    """
+    with _package_envs_lock:
+        envs = _package_envs.setdefault(env, {})
+        if package not in envs:
+            # Allow any extending package to optionally define its own
+            # ./templates directory at the root module level.
+            view_pkg_loader = PackageLoader(package)
+            if isinstance(env.loader, ChoiceLoader):
+                # If we're already using a ChoiceLoader it's because there
+                # is a theme directory loader in place; ensure we always
+                # let the theme take priority.
+                loaders = env.loader.loaders.copy()
+                loaders.insert(1, view_pkg_loader)
+                new_loader = ChoiceLoader(loaders)
+            else:
+                new_loader = ChoiceLoader([view_pkg_loader, env.loader])
+            package_env = env.overlay(loader=new_loader)
+            package_env.filters["blob"] = _render_blob
+            envs[package] = package_env
+        return envs[package]
 
 
 class View(ABC):
@@ -82,9 +133,39 @@ class ViewManager(PluginManager):
     type_noun = "view"
     exc_class = ViewException
 
-    def __init__(self, datasource_manager, report, config, extension_manager=None):
+    def __init__(
+        self,
+        datasource_manager,
+        report,
+        config,
+        extension_manager=None,
+        workers=1,
+        timings=None,
+        profiler=None,
+        blob_store=None,
+    ):
         self.datasource_manager = datasource_manager
-        super(ViewManager, self).__init__(report, config, extension_manager)
+        self.workers = workers
+        # Blobs are handed to the store once each View is created and
+        # rendered, so that it can move them out of memory.
+        self.blob_store = blob_store or BlobStore()
+        # Blobs are referenced from rendered output via placeholders, which
+        # are bound to an output driver later via :meth:`resolve_blobs`. This
+        # allows the View rendering to be shared by all output drivers.
+        self._blob_refs = []
+        self._blob_refs_lock = Lock()
+        self._blob_ref_prefix = f"kpireport-blob-{uuid4().hex}-"
+        # The suffix ends the reference, so that it is not confused with any
+        # digits rendered right after it.
+        self._blob_ref_suffix = "-end"
+        self._blob_ref_pattern = re.compile(
+            re.escape(self._blob_ref_prefix)
+            + r"(\d+)"
+            + re.escape(self._blob_ref_suffix)
+        )
+        super(ViewManager, self).__init__(
+            report, config, extension_manager, timings=timings, profiler=profiler
+        )
 
     def plugin_factory(self, config, plugin_class, plugin_kwargs):
         for attr in ["title", "description", "cols"]:
@@ -92,74 +173,170 @@ class ViewManager(PluginManager):
             if value:
                 plugin_kwargs.setdefault(attr, value)
 
-        return plugin_class(self.report, self.datasource_manager, **plugin_kwargs)
-
-    def _blob_filter(self, output_driver):
-        @evalcontextfilter
-        def render_blob(eval_ctx, blob_id):
-            view_id = eval_ctx.environment.view_id
-            fmt = eval_ctx.environment.fmt
-
-            blob = self.call_instance(view_id, "get_blob", blob_id)
-            if not blob:
-                raise ViewException(
-                    (
-                        f"Missing content for blob '{blob_id}'. Make sure the "
-                        "blob was added before rendering the View template"
-                    )
+        view = plugin_class(self.report, self.datasource_manager, **plugin_kwargs)
+        self._store_blobs(view)
+        return view
+
+    def _store_blobs(self, view):
+        for blob in view.blobs:
+            self.blob_store.add(blob)
+
+    def render_blob(self, view_id, fmt, blob_id, autoescape) -> str:
+        """Render a reference to a View's blob; used by the ``blob`` filter."""
+        blob = self.call_instance(view_id, "get_blob", blob_id)
+        if not blob:
+            raise ViewException(
+                (
+                    f"Missing content for blob '{blob_id}'. Make sure the "
+                    "blob was added before rendering the View template"
                 )
+            )
 
-            return output_driver.render_blob_inline(blob, fmt)
+        with self._blob_refs_lock:
+            self._blob_refs.append((blob, fmt, autoescape))
+            ref = len(self._blob_refs) - 1
+        return f"{self._blob_ref_prefix}{ref}{self._blob_ref_suffix}"
 
-        return render_blob
+    def resolve_blobs(self, output: str, output_driver: OutputDriver) -> str:
+        """Bind the blob references in rendered output to an output driver.
 
-    def render(self, env: Environment, fmt: str, output_driver: OutputDriver) -> list:
-        if not output_driver.can_render(fmt):
-            return []
+        Each reference left by the ``blob`` template filter is replaced with
+        the result of :meth:`OutputDriver.render_blob_inline` for the driver.
 
-        blocks = []
-        for id, view in self.instances:
-            block = dict(
-                id=id,
-                title=view.title or "",
-                description=view.description,
-                cols=view.cols,
-                blobs=view.blobs,
-                tags=[],
-            )
+        Args:
+            output (str): the rendered output.
+            output_driver (OutputDriver): the driver the output is rendered for.
 
-            try:
-                # Allow any extending package to optionally define its own
-                # ./templates directory at the root module level.
-                view_pkg_loader = PackageLoader(module_root(view.__module__))
-                if isinstance(env.loader, ChoiceLoader):
-                    # If we're already using a ChoiceLoader it's because there
-                    # is a theme directory loader in place; ensure we always
-                    # let the theme take priority.
-                    loaders = env.loader.loaders.copy()
-                    loaders.insert(1, view_pkg_loader)
-                    new_loader = ChoiceLoader(loaders)
-                else:
-                    new_loader = ChoiceLoader([view_pkg_loader, env.loader])
-                view_env = env.overlay(loader=new_loader)
-                view_env.extend(view_id=id, fmt=fmt)
-                view_env.filters["blob"] = self._blob_filter(output_driver)
-
-                output = view.render(view_env, fmt=fmt)
-                if not isinstance(output, str):
-                    raise ViewException(("The view did not render a valid string"))
-
-                block.update(output=output)
-            except Exception as exc:
-                self.log.error(
-                    (f"Error rendering {self.type_noun} {id} ({fmt}): {exc}")
+        Returns:
+            str: the output with all blobs rendered inline.
+        """
+
+        def render_blob_inline(match):
+            blob, fmt, autoescape = self._blob_refs[int(match.group(1))]
+            rendered = output_driver.render_blob_inline(blob, fmt)
+            return str(escape(rendered) if autoescape else rendered)
+
+        return self._blob_ref_pattern.sub(render_blob_inline, output)
+
+    def render(self, env: Environment, fmt: str, deadline: float = None) -> list:
+        """Render all Views in the given format.
+
+        If more than one worker is configured, Views are rendered concurrently
+        on a thread pool. The rendered blocks are always returned in the order
+        the Views were declared in.
+
+        A View that takes longer than the ``timeout`` in its configuration, in
+        seconds, or does not finish by the ``deadline``, renders as an error.
+        It is left running in the background, but its output is discarded.
+
+        Blobs referenced in the output are left as placeholders; use
+        :meth:`resolve_blobs` to render them for a specific output driver.
+
+        Args:
+            env (Environment): the Jinja environment to render with.
+            fmt (str): the output format.
+            deadline (float): when all Views must be rendered by, as a
+                :func:`timeit.default_timer` value.
+
+        Returns:
+            List[dict]: the rendered blocks, one for each View.
+        """
+        render_view = partial(self._render_view, env, fmt, deadline)
+        instances = list(self.instances)
+
+        if self.workers > 1 and len(instances) > 1:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                return list(executor.map(lambda i: render_view(*i), instances))
+        else:
+            return [render_view(id, view) for id, view in instances]
+
+    def _render_view(
+        self, env: Environment, fmt: str, deadline: float, id: str, view: View
+    ) -> dict:
+        with self.timings.measure("render", id, format=fmt) as entry:
+            timeout = self._view_timeout(id, deadline)
+            if timeout is None:
+                block = self._render_block(env, fmt, id, view)
+            else:
+                block = self._render_block_with_timeout(env, fmt, id, view, timeout)
+            if "error" in block["tags"]:
+                entry.update(error=block["output"])
+        return block
+
+    def _view_timeout(self, id: str, deadline: float) -> "Optional[float]":
+        timeout = self._config.get(id, {}).get("timeout")
+        if deadline is not None:
+            remaining = deadline - timer()
+            timeout = remaining if timeout is None else min(timeout, remaining)
+        return timeout
+
+    def _render_block_with_timeout(
+        self, env: Environment, fmt: str, id: str, view: View, timeout: float
+    ) -> dict:
+        if timeout > 0:
+            result = Future()
+            abandoned = Event()
+
+            def render():
+                result.set_result(
+                    self._render_block(env, fmt, id, view, abandoned=abandoned)
                 )
-                self.log.debug(traceback.format_exc())
-                block.update(output=f"Error rendering {id}", tags=["error"])
 
-            blocks.append(block)
+            # The thread cannot be stopped if the View hangs, so it must not
+            # keep the process alive either.
+            Thread(target=render, name=f"render-{id}", daemon=True).start()
+            try:
+                return result.result(timeout=timeout)
+            except TimeoutError:
+                # The report may be sent, and its blobs removed, before the
+                # View is done; it must not store any more blobs then.
+                abandoned.set()
+
+        self.log.error(
+            f"Timed out rendering {self.type_noun} {id} ({fmt}) "
+            f"after {max(timeout, 0):.2f}s"
+        )
+        return self._error_block(self._block(id, view))
+
+    def _block(self, id: str, view: View) -> dict:
+        return dict(
+            id=id,
+            title=view.title or "",
+            description=view.description,
+            cols=view.cols,
+            blobs=view.blobs,
+            tags=[],
+        )
+
+    def _error_block(self, block: dict) -> dict:
+        block.update(output=f"Error rendering {block['id']}", tags=["error"])
+        return block
 
-        return blocks
+    def _render_block(
+        self, env: Environment, fmt: str, id: str, view: View, abandoned=None
+    ) -> dict:
+        block = self._block(id, view)
+
+        try:
+            view_env = package_environment(env, module_root(view.__module__))
+            _rendering.view = (self, id, fmt)
+            try:
+                with self.profile(id, fmt, track_memory=True):
+                    output = view.render(view_env, fmt=fmt)
+            finally:
+                _rendering.view = None
+                if not (abandoned and abandoned.is_set()):
+                    self._store_blobs(view)
+            if not isinstance(output, str):
+                raise ViewException(("The view did not render a valid string"))
+
+            block.update(output=output)
+        except Exception as exc:
+            self.log.error((f"Error rendering {self.type_noun} {id} ({fmt}): {exc}"))
+            self.log.debug(traceback.format_exc())
+            self._error_block(block)
+
+        return block
 
     @property
     def blobs(self):
@@ -47,6 +47,9 @@ class GoogleAnalyticsDatasource(Datasource):
 
     """
 
+    # The underlying HTTP client of the Google API client is not thread-safe.
+    max_concurrency = 1
+
     def init(self, key_file=None):
         if not key_file:
             key_file = f"{DEFAULT_CONF_DIR}/google_oauth2_key.json"
@@ -75,14 +75,17 @@ class JenkinsBuildSummary(View):
     @lru_cache(maxsize=1)
     def _template_vars(self):
         jobs = self.datasources.query(self.datasource, "get_all_jobs")
+        jobs = [row for _, row in jobs.iterrows() if self.filters.filter_job(row)]
+
+        # Fetch the builds of all jobs concurrently.
+        job_builds = self.datasources.query_many(
+            [(self.datasource, ("get_job_info", row["fullname"])) for row in jobs]
+        )
 
         summary = []
-        for _, row in jobs.iterrows():
-            if not self.filters.filter_job(row):
-                continue
+        for row, builds in zip(jobs, job_builds):
             job_name = row["fullname"]
             job_url = row["url"]
-            builds = self.datasources.query(self.datasource, "get_job_info", job_name)
             score = builds["score"].iloc[0]
             # Reverse order of builds, Jenkins returns most recent ones first
             build_list = builds.iloc[::-1].T.to_dict().values()
@@ -1,3 +1,8 @@
+import asyncio
+from functools import partial
+from urllib.parse import quote
+from weakref import WeakKeyDictionary
+
 import jenkins
 import pandas as pd
 
@@ -7,6 +12,11 @@ import logging
 
 LOG = logging.getLogger(__name__)
 
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
 
 class JenkinsDatasource(Datasource):
     """Provides accessors for listing all jobs and builds from a Jenkins host.
@@ -20,15 +30,32 @@ class JenkinsDatasource(Datasource):
         host (str): Jenkins host, e.g. https://jenkins.example.com.
         user (str): Jenkins user to authenticate as.
         api_token (str): Jenkins user API token to authenticate with.
+        timeout (float): the number of seconds to wait for the server to
+            respond to each request. (Default 60)
+
+    If the ``async`` extras are installed, job details queried asynchronously
+    (see :meth:`aquery`) are fetched concurrently on a single event loop, over
+    one HTTP session. At most 4 requests are made at once, unless set
+    otherwise with the ``concurrency`` option.
     """
 
-    def init(self, host=None, user=None, api_token=None):
+    # Don't flood the Jenkins server with a request for each job at once.
+    max_concurrency = 4
+
+    def init(self, host=None, user=None, api_token=None, timeout=60):
         if not host:
             raise ValueError("Missing required paramter: 'host'")
         if not host.startswith("http"):
             host = f"http://{host}"
 
-        self.client = jenkins.Jenkins(host, username=user, password=api_token)
+        self.client = jenkins.Jenkins(
+            host, username=user, password=api_token, timeout=timeout
+        )
+        self.host = host.rstrip("/")
+        self.user = user
+        self.api_token = api_token
+        self.timeout = timeout
+        self._sessions = WeakKeyDictionary()
 
     def query(self, fn_name, *args, **kwargs):
         """Query the Datsource for job or build data.
@@ -55,6 +82,21 @@ class JenkinsDatasource(Datasource):
 
         return fn(*args, **kwargs)
 
+    async def aquery(self, fn_name, *args, **kwargs):
+        """Query the Datasource for job or build data asynchronously.
+
+        See :meth:`query` for details. Job details (``get_job_info``) are
+        fetched directly via :mod:`aiohttp`, if installed; all other operations
+        are executed on a worker thread.
+        """
+        if fn_name == "get_job_info" and aiohttp:
+            return await self._aget_job_info(*args, **kwargs)
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, partial(self.query, fn_name, *args, **kwargs)
+        )
+
     def get_all_jobs(self):
         """List all jobs on the Jenkins server.
 
@@ -81,6 +123,45 @@ class JenkinsDatasource(Datasource):
             :status: the build status, e.g. "SUCCESS" or "FAILURE"
         """
         job_info = self.client.get_job_info(job_name, depth=1)
+        return self._job_info_dataframe(job_info)
+
+    async def _aget_job_info(self, job_name):
+        # Jobs in folders are addressed as /job/<folder>/job/<name>
+        path = "".join(f"job/{quote(part)}/" for part in job_name.split("/"))
+        session = await self._session()
+        async with session.get(
+            f"{self.host}/{path}api/json", params=dict(depth=1)
+        ) as res:
+            res.raise_for_status()
+            return self._job_info_dataframe(await res.json())
+
+    async def _session(self):
+        """Get the HTTP session shared by all queries on the running loop."""
+        loop = asyncio.get_running_loop()
+        if loop in self._sessions:
+            return self._sessions[loop][0]
+
+        auth = None
+        if self.user:
+            auth = aiohttp.BasicAuth(self.user, self.api_token or "")
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        session = aiohttp.ClientSession(auth=auth, timeout=timeout)
+
+        async def hold():
+            try:
+                yield
+            finally:
+                await session.close()
+
+        # The loop closes open async generators when it is shut down, e.g., at
+        # the end of DatasourceManager.query_many, which closes the session.
+        holder = hold()
+        # The generator is kept alive for as long as the loop.
+        self._sessions[loop] = (session, holder)
+        await holder.__anext__()
+        return session
+
+    def _job_info_dataframe(self, job_info):
         builds = job_info.get("builds", [])[:10]
         df = pd.json_normalize(builds)
         # Transpose the health report information into our result table--
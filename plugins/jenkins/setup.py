@@ -9,6 +9,7 @@ setup(
     license="Prosperity Public License",
     packages=["kpireport_jenkins"],
     install_requires=["kpireport", "python-jenkins"],
+    extras_require={"async": ["aiohttp"]},
     package_data={"kpireport_jenkins": ["templates/*"]},
     entry_points={
         "kpireport.datasource": ["jenkins = kpireport_jenkins:JenkinsDatasource"],
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+from pymysql.constants import FIELD_TYPE
+from pymysql.converters import conversions
+
+# Types left as the text sent by the server, to be decoded a column at a time
+# by :func:`to_frame` instead of into a Python object per value.
+DATE_TYPES = {
+    FIELD_TYPE.DATE,
+    FIELD_TYPE.NEWDATE,
+    FIELD_TYPE.DATETIME,
+    FIELD_TYPE.TIMESTAMP,
+}
+DECIMAL_TYPES = {FIELD_TYPE.DECIMAL, FIELD_TYPE.NEWDECIMAL}
+NUMERIC_TYPES = {
+    FIELD_TYPE.TINY,
+    FIELD_TYPE.SHORT,
+    FIELD_TYPE.LONG,
+    FIELD_TYPE.INT24,
+    FIELD_TYPE.LONGLONG,
+    FIELD_TYPE.YEAR,
+    FIELD_TYPE.FLOAT,
+    FIELD_TYPE.DOUBLE,
+}
+
+#: The conversions to connect with, see :meth:`pymysql.connect`.
+CONVERSIONS = {
+    type_code: converter
+    for type_code, converter in conversions.items()
+    if type_code not in DATE_TYPES | DECIMAL_TYPES
+}
+
+
+def to_frame(rows: "List[tuple]", description: "List[tuple]") -> pd.DataFrame:
+    """Build a DataFrame from rows read with :data:`CONVERSIONS`.
+
+    Each column is converted to a NumPy array in one pass: date and time
+    columns become ``datetime64`` columns, without creating a
+    :class:`datetime.datetime` for each value, and decimal columns become
+    floats, as with :meth:`pandas.read_sql`. Invalid dates, such as
+    ``0000-00-00``, become ``NaT``, and integer columns with ``NULL`` values
+    become floats, with ``NaN`` for ``NULL``.
+
+    Args:
+        rows (List[tuple]): the rows, as returned by the cursor.
+        description (List[tuple]): the cursor description of the columns.
+
+    Returns:
+        pandas.DataFrame: the rows, as a DataFrame.
+    """
+    names = [col[0] for col in description]
+    values = list(zip(*rows)) or [()] * len(names)
+    # Columns are built by position, as a query can select the same name twice.
+    columns = {}
+    for i, (col, data) in enumerate(zip(description, values)):
+        type_code = col[1]
+        data = np.array(data, dtype=object)
+        if type_code in DATE_TYPES:
+            columns[i] = pd.to_datetime(data, format="ISO8601", errors="coerce")
+        elif type_code in DECIMAL_TYPES:
+            columns[i] = pd.to_numeric(data, errors="coerce").astype(float)
+        elif type_code in NUMERIC_TYPES:
+            columns[i] = pd.to_numeric(data)
+        else:
+            columns[i] = pd.Series(data).infer_objects()
+    df = pd.DataFrame(columns)
+    df.columns = names
+    return df
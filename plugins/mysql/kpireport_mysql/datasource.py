@@ -1,24 +1,133 @@
+from contextlib import contextmanager
 import pymysql
+import pymysql.cursors
 import pandas as pd
 import re
+from threading import BoundedSemaphore, Lock
 
 from kpireport.datasource import Datasource
 
+from .columnar import CONVERSIONS as COLUMNAR_CONVERSIONS, to_frame
+from .reducers import make_reducer
+
 import logging
 
 LOG = logging.getLogger(__name__)
 
 
+class ConnectionPool:
+    """A bounded pool of connections to a MySQL database.
+
+    Connections are opened as they are needed, up to ``size`` at once, and are
+    kept open to be re-used by later queries. Each connection is checked with a
+    ping before it is re-used, and reconnects if it was dropped by the server.
+
+    Args:
+        size (int): the most connections to open at once.
+        **kwargs: keyword arguments passed to :meth:`pymysql.connect`.
+    """
+
+    def __init__(self, size=1, **kwargs):
+        if not (isinstance(size, int) and size > 0):
+            raise ValueError("The pool size must be a positive integer")
+        self.size = size
+        self._connect_kwargs = kwargs
+        self._idle = []
+        self._slots = BoundedSemaphore(size)
+        self._lock = Lock()
+
+    @contextmanager
+    def connection(self) -> "pymysql.connections.Connection":
+        """Check out a connection, waiting for one to be free if necessary.
+
+        The connection is returned to the pool afterwards, unless it failed.
+        """
+        with self._slots:
+            conn = self._checkout()
+            try:
+                yield conn
+            except (pymysql.err.OperationalError, pymysql.err.InterfaceError):
+                # The connection may be in an unknown state; don't re-use it.
+                self._discard(conn)
+                raise
+            except Exception:
+                self._checkin(conn)
+                raise
+            else:
+                self._checkin(conn)
+
+    def _checkout(self):
+        with self._lock:
+            conn = self._idle.pop() if self._idle else None
+        if not conn:
+            LOG.debug("Opening new MySQL connection")
+            return pymysql.connect(**self._connect_kwargs)
+        try:
+            conn.ping(reconnect=True)
+        except Exception:
+            self._discard(conn)
+            raise
+        return conn
+
+    def _checkin(self, conn):
+        with self._lock:
+            self._idle.append(conn)
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
 class MySQLDatasource(Datasource):
     """Provides an interface for running queries agains a MySQL database.
 
+    Queries run on a pool of connections, so that as many queries as there
+    are connections can run at the same time; connections dropped by the
+    server are re-opened. When several reports are generated in the same
+    process, the pool is shared by all of them.
+
+    The ``limit`` query hint (see
+    :attr:`~kpireport.datasource.Datasource.supported_hints`) can be applied
+    by wrapping the query, i.e., ``SELECT * FROM (<query>) LIMIT 10``, so that
+    only the rows used are sent by the server. This is opt-in, as not every
+    query can be wrapped, e.g., a join selecting two columns of the same name.
+
     Attributes:
-        kwargs: any keyword arguments are passed through to
-            :meth:`pymysql.connect`
+        pool_size (int): the most connections to open to the database at
+            once. (Default 1)
+        columnar (bool): whether to build query results a column at a time,
+            instead of a row at a time. This is much faster for large results,
+            in particular with date and time columns, which are parsed
+            directly into ``datetime64`` columns. Only ``parse_dates`` is
+            supported as a keyword argument to queries. (Default False)
+        kwargs: any other keyword arguments are passed through to
+            :meth:`pymysql.connect`. Unless set otherwise, reading a query
+            result times out after 300 seconds (``read_timeout``.)
+        wrap_queries (bool): whether to wrap queries to apply the ``limit``
+            query hint. (Default False)
     """
 
-    def init(self, **kwargs):
-        self.db = pymysql.connect(**kwargs)
+    # Each connection is not thread-safe, so only one query can run on each.
+    max_concurrency = 1
+    supports_incremental = True
+    # When streaming, reduced chunks are combined once this many were read.
+    combine_every = 16
+
+    def init(self, pool_size=1, columnar=False, wrap_queries=False, **kwargs):
+        # Don't wait forever on a hung server.
+        kwargs.setdefault("read_timeout", 300)
+        self.columnar = columnar
+        if wrap_queries:
+            self.supported_hints = frozenset(["limit"])
+        if columnar:
+            kwargs.setdefault("conv", COLUMNAR_CONVERSIONS)
+        self.pool = ConnectionPool(pool_size, **kwargs)
+        self.max_concurrency = pool_size
+        # Connect up front, so that bad connection arguments fail early.
+        with self.pool.connection():
+            pass
 
     def query(self, sql: str, **kwargs) -> pd.DataFrame:
         """Execute a query SQL string.
@@ -49,9 +158,25 @@ class MySQLDatasource(Datasource):
               self.datasources.query('my_db', 'select time, value from table',
                 parse_dates=['time'])
 
+        Large results can be streamed from the server in chunks of
+        ``chunksize`` rows, instead of being read into memory all at once.
+        Each chunk can be reduced as it is read with ``reduce``, so that the
+        memory used stays bounded no matter how many rows the query returns,
+        e.g., to sum the rows in hourly buckets:
+
+        .. code-block:: python
+
+           self.datasources.query('my_db', 'select time, value from table',
+             parse_dates=['time'], chunksize=10000, reduce={'resample': '1h'})
+
+        See :mod:`kpireport_mysql.reducers` for the supported reducers. When
+        streaming, ``parse_dates`` is the only other supported keyword
+        argument.
 
         Args:
             sql (str): the SQL query to execute
+            chunksize (int): stream the result in chunks of this many rows.
+            reduce (Union[str, dict]): how to reduce each streamed chunk.
             kwargs: keyword arguments passed to :meth:`pandas.read_sql`
 
         Returns:
@@ -60,19 +185,113 @@ class MySQLDatasource(Datasource):
                 Columns selected in the query will be columns in the output
                 table.
         """
-        sql, params = self._format_sql(sql)
-        kwargs.setdefault("params", params)
+        return self.query_window(
+            self.report.start_date, self.report.end_date, sql, **kwargs
+        )
+
+    def query_window(self, start_date, end_date, sql: str, **kwargs) -> pd.DataFrame:
+        """Execute a query SQL string over an explicit time window.
+
+        The ``{from}`` and ``{to}`` tokens are replaced with the start and end
+        of the given window instead of the Report window. This allows the
+        Datasource to be used with incremental fetching, if the query selects
+        rows by their time in the first column, e.g.,
+
+        .. code-block:: sql
+
+           SELECT time, value FROM metrics WHERE time BETWEEN {from} AND {to}
+
+        Args:
+            start_date (datetime): the start of the time window.
+            end_date (datetime): the end of the time window.
+            sql (str): the SQL query to execute
+            kwargs: keyword arguments passed to :meth:`pandas.read_sql`
+
+        Returns:
+            pandas.DataFrame: a table with any rows returned by the query.
+        """
+        sql, params = self._format_sql(sql, start_date, end_date)
+        sql = _apply_hints(sql, kwargs.pop("hints", None))
+        chunksize = kwargs.pop("chunksize", None)
+        reduce = kwargs.pop("reduce", None)
+        if reduce and not chunksize:
+            raise ValueError("'reduce' requires a 'chunksize'")
         LOG.debug(f"Query: {sql} {params}")
-        df = pd.read_sql(sql, self.db, **kwargs)
-        df = df.set_index(df.columns[0])
+        if chunksize:
+            df = self._stream(
+                sql, kwargs.pop("params", params), chunksize, reduce, **kwargs
+            )
+        elif self.columnar:
+            df = self._fetch(sql, kwargs.pop("params", params), **kwargs)
+        else:
+            kwargs.setdefault("params", params)
+            with self.pool.connection() as conn:
+                df = pd.read_sql(sql, conn, **kwargs)
+            df = df.set_index(df.columns[0])
         LOG.debug(f"Query result: {df}")
         return df
 
-    def _format_sql(self, sql: str) -> (str, list):
+    def _fetch(self, sql, params, parse_dates=None):
+        with self.pool.connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(sql, params)
+                return self._to_frame(
+                    cursor.fetchall(), cursor.description, parse_dates
+                )
+
+    def _stream(self, sql, params, chunksize, reduce=None, parse_dates=None):
+        reducer = make_reducer(reduce) if reduce else None
+
+        def read_chunk(rows, description):
+            chunk = self._to_frame(rows, description, parse_dates)
+            return reducer.reduce(chunk) if reducer else chunk
+
+        with self.pool.connection() as conn:
+            # An unbuffered cursor reads rows from the server as they are
+            # fetched, instead of all at once.
+            with conn.cursor(pymysql.cursors.SSCursor) as cursor:
+                cursor.execute(sql, params)
+                rows = cursor.fetchmany(chunksize)
+                # Always read one chunk, so that an empty result has columns.
+                chunks = [read_chunk(rows, cursor.description)]
+                rows = cursor.fetchmany(chunksize)
+                while rows:
+                    chunks.append(read_chunk(rows, cursor.description))
+                    if reducer and len(chunks) >= self.combine_every:
+                        chunks = [reducer.combine(chunks)]
+                    rows = cursor.fetchmany(chunksize)
+        if reducer:
+            return reducer.combine(chunks)
+        return pd.concat(chunks)
+
+    def _to_frame(self, rows, description, parse_dates=None):
+        if self.columnar:
+            df = to_frame(rows, description)
+        else:
+            df = pd.DataFrame.from_records(
+                rows, columns=[col[0] for col in description]
+            )
+        df = _parse_dates(df, parse_dates)
+        return df.set_index(df.columns[0])
+
+    def time_index(self, df: pd.DataFrame) -> pd.DatetimeIndex:
+        """Get the time of each row in a query result.
+
+        The first column selected by the query is expected to hold the time.
+        """
+        return pd.DatetimeIndex(df.index)
+
+    def _format_sql(self, sql: str, start_date=None, end_date=None) -> (str, list):
         """Replace special tokens in the SQL query.
 
         :type sql: str
         :param sql: the SQL query
+        :type start_date: datetime
+        :param start_date: the value of the ``{from}`` token (default: the
+                           Report start date)
+        :type end_date: datetime
+        :param end_date: the value of the ``{to}`` token (default: the
+                         Report end date)
         :rtype: Tuple[str, List[Any]]
         :returns: a tuple of the replaced SQL query and a list of parameters
                   to be passed to the MySQL client for secure substition.
@@ -82,9 +301,9 @@ class MySQLDatasource(Datasource):
         def collect_params(match):
             token = match.group(1)
             if token == "from":
-                params.append(self.report.start_date)
+                params.append(start_date or self.report.start_date)
             elif token == "to":
-                params.append(self.report.end_date)
+                params.append(end_date or self.report.end_date)
             elif token == "interval":
                 return f"interval {int(self.report.interval_days)} day"
             else:
@@ -94,3 +313,29 @@ class MySQLDatasource(Datasource):
         replaced = re.sub(r"\{(interval|from|to)\}", collect_params, sql)
 
         return replaced, params
+
+
+def _parse_dates(df, parse_dates):
+    """Parse date columns like :meth:`pandas.read_sql` does."""
+    if not parse_dates:
+        return df
+    if isinstance(parse_dates, str):
+        parse_dates = [parse_dates]
+    if not isinstance(parse_dates, dict):
+        parse_dates = {col: None for col in parse_dates}
+    for col, fmt in parse_dates.items():
+        if isinstance(fmt, dict):
+            df[col] = pd.to_datetime(df[col], **fmt)
+        else:
+            df[col] = pd.to_datetime(df[col], format=fmt)
+    return df
+
+
+def _apply_hints(sql, hints):
+    """Wrap a query to only select the rows hinted at."""
+    if not hints or hints.get("limit") is None:
+        return sql
+    sql = sql.strip().rstrip(";")
+    # The query is on lines of its own, so that a trailing comment can't
+    # comment out the rest of the wrapping query.
+    return f"SELECT * FROM (\n{sql}\n) AS kpireport_hinted LIMIT {int(hints['limit'])}"
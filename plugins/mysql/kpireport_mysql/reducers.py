@@ -0,0 +1,123 @@
+import pandas as pd
+
+
+class Reducer:
+    """Reduces a query result one chunk at a time, as it is streamed.
+
+    Each chunk is reduced as soon as it is read, and the reduced chunks are
+    combined by reducing them again, so a reducer must give the same result
+    no matter how the rows are split into chunks.
+    """
+
+    def reduce(self, df: pd.DataFrame) -> pd.DataFrame:
+        raise NotImplementedError()
+
+    def combine(self, dfs: "List[pd.DataFrame]") -> pd.DataFrame:
+        return self.reduce(pd.concat(dfs))
+
+
+class Resample(Reducer):
+    """Aggregate rows into time buckets.
+
+    Requires the first column selected by the query to be parsed as a date.
+
+    Args:
+        rule (str): the bucket size, as a :mod:`pandas` offset alias, e.g.,
+            ``1h`` or ``1D``.
+        agg (str): how to aggregate each bucket; one of ``sum``, ``min``,
+            ``max`` or ``count``. (Default ``sum``)
+    """
+
+    combined_aggs = dict(sum="sum", min="min", max="max", count="sum")
+
+    def __init__(self, rule, agg="sum"):
+        if agg not in self.combined_aggs:
+            raise ValueError(
+                f"Cannot resample with '{agg}' when streaming; "
+                f"use one of {', '.join(self.combined_aggs)}"
+            )
+        self.rule = rule
+        self.agg = agg
+
+    def reduce(self, df):
+        return df.resample(self.rule).agg(self.agg)
+
+    def combine(self, dfs):
+        # Resample again, rather than group by time, so that empty buckets
+        # between chunks are kept.
+        return pd.concat(dfs).resample(self.rule).agg(self.combined_aggs[self.agg])
+
+
+class Top(Reducer):
+    """Keep the rows with the largest values in a column.
+
+    Args:
+        n (int): how many rows to keep.
+        column (str): the column to compare rows by.
+    """
+
+    def __init__(self, n, column=None):
+        if not column:
+            raise ValueError("Missing required parameter: 'column'")
+        self.n = int(n)
+        self.column = column
+
+    def reduce(self, df):
+        return df.nlargest(self.n, self.column)
+
+
+class Sum(Reducer):
+    """Sum all numeric columns, either over all rows or for each group.
+
+    Args:
+        by (Union[str, List[str]]): the columns to group rows by, if any.
+    """
+
+    def __init__(self, by=None):
+        self.by = by
+
+    def reduce(self, df):
+        if self.by:
+            return df.groupby(self.by).sum(numeric_only=True)
+        return df.sum(numeric_only=True).to_frame().T
+
+    def combine(self, dfs):
+        df = pd.concat(dfs)
+        if self.by:
+            return df.groupby(level=list(range(df.index.nlevels))).sum()
+        return df.sum().to_frame().T
+
+
+REDUCERS = dict(resample=Resample, top=Top, sum=Sum)
+
+
+def make_reducer(spec) -> Reducer:
+    """Create a reducer from its description in the report configuration.
+
+    The description names the reducer and sets its first argument, and may
+    include any of its other arguments, e.g., ``{"resample": "1h", "agg":
+    "max"}``, ``{"top": 10, "column": "total"}`` or ``{"sum": ["country"]}``.
+    Reducers without required arguments can also be named on their own, e.g.,
+    ``"sum"``.
+
+    Args:
+        spec (Union[str, dict]): the reducer description.
+
+    Returns:
+        Reducer: the reducer.
+
+    Raises:
+        ValueError: if the description does not name exactly one reducer.
+    """
+    if isinstance(spec, str):
+        spec = {spec: None}
+    if not isinstance(spec, dict):
+        raise ValueError(f"Malformed reducer: expected str or dict, got {spec}")
+    names = [name for name in spec if name in REDUCERS]
+    if len(names) != 1:
+        raise ValueError(f"Reducer must name one of {', '.join(REDUCERS)}")
+    name = names[0]
+    kwargs = {k: v for k, v in spec.items() if k != name}
+    if spec[name] is None:
+        return REDUCERS[name](**kwargs)
+    return REDUCERS[name](spec[name], **kwargs)
@@ -0,0 +1,66 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+from pymysql.constants import FIELD_TYPE
+
+from kpireport_mysql.columnar import CONVERSIONS, to_frame
+
+
+class ToFrameTestCase(unittest.TestCase):
+    def test_column_types(self):
+        description = [
+            ("time", FIELD_TYPE.DATETIME),
+            ("day", FIELD_TYPE.DATE),
+            ("count", FIELD_TYPE.LONGLONG),
+            ("amount", FIELD_TYPE.NEWDECIMAL),
+            ("country", FIELD_TYPE.VAR_STRING),
+        ]
+        rows = [
+            ("2020-01-01 00:00:00", "2020-01-01", 1, "1.50", "DE"),
+            ("2020-01-01 01:30:00.250000", "0000-00-00", 2, "2.25", "FR"),
+        ]
+
+        df = to_frame(rows, description)
+
+        self.assertEqual(list(df.columns), [col[0] for col in description])
+        self.assertEqual(
+            list(df["time"]),
+            [pd.Timestamp("2020-01-01 00:00"), pd.Timestamp("2020-01-01 01:30:00.25")],
+        )
+        self.assertTrue(pd.isna(df["day"][1]))
+        self.assertTrue(pd.api.types.is_integer_dtype(df["count"]))
+        self.assertEqual(df["amount"].dtype, np.float64)
+        self.assertEqual(list(df["amount"]), [1.5, 2.25])
+        self.assertEqual(list(df["country"]), ["DE", "FR"])
+
+    def test_duplicate_column_names(self):
+        description = [("id", FIELD_TYPE.LONG), ("id", FIELD_TYPE.VAR_STRING)]
+
+        df = to_frame([(1, "a"), (2, "b")], description)
+
+        self.assertEqual(list(df.columns), ["id", "id"])
+        self.assertEqual(list(df.iloc[:, 0]), [1, 2])
+        self.assertEqual(list(df.iloc[:, 1]), ["a", "b"])
+
+    def test_nullable_int(self):
+        description = [("count", FIELD_TYPE.LONG)]
+
+        df = to_frame([(1,), (None,)], description)
+
+        self.assertEqual(df["count"].dtype, np.float64)
+        self.assertEqual(df["count"][0], 1.0)
+        self.assertTrue(np.isnan(df["count"][1]))
+
+    def test_empty(self):
+        description = [("time", FIELD_TYPE.DATETIME), ("count", FIELD_TYPE.LONG)]
+
+        df = to_frame([], description)
+
+        self.assertEqual(list(df.columns), ["time", "count"])
+        self.assertEqual(len(df), 0)
+
+    def test_conversions_leave_dates_and_decimals_as_text(self):
+        for type_code in [FIELD_TYPE.DATETIME, FIELD_TYPE.NEWDECIMAL]:
+            self.assertNotIn(type_code, CONVERSIONS)
+        self.assertIn(FIELD_TYPE.LONG, CONVERSIONS)
@@ -0,0 +1,76 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+import pymysql
+
+from kpireport_mysql.datasource import ConnectionPool
+
+
+class ConnectionPoolTestCase(unittest.TestCase):
+    def setUp(self):
+        patcher = patch("pymysql.connect", side_effect=lambda **kwargs: MagicMock())
+        self.connect = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_connections_are_reused(self):
+        pool = ConnectionPool(2, host="db")
+
+        with pool.connection() as first:
+            pass
+        with pool.connection() as second:
+            pass
+
+        self.assertIs(first, second)
+        self.connect.assert_called_once_with(host="db")
+        second.ping.assert_called_once_with(reconnect=True)
+
+    def test_connections_are_opened_up_to_size(self):
+        pool = ConnectionPool(2)
+
+        with pool.connection() as first, pool.connection() as second:
+            self.assertIsNot(first, second)
+
+        self.assertEqual(self.connect.call_count, 2)
+
+    def test_dropped_connection_is_reopened(self):
+        pool = ConnectionPool(1)
+
+        with self.assertRaises(pymysql.err.OperationalError):
+            with pool.connection() as dropped:
+                raise pymysql.err.OperationalError(2013, "Lost connection")
+        with pool.connection() as conn:
+            pass
+
+        dropped.close.assert_called_once()
+        self.assertIsNot(conn, dropped)
+        self.assertEqual(self.connect.call_count, 2)
+
+    def test_failed_ping_is_discarded(self):
+        pool = ConnectionPool(1)
+        with pool.connection() as conn:
+            conn.ping.side_effect = pymysql.err.OperationalError(2003, "Down")
+
+        with self.assertRaises(pymysql.err.OperationalError):
+            with pool.connection():
+                pass
+        with pool.connection() as reopened:
+            pass
+
+        conn.close.assert_called_once()
+        self.assertIsNot(reopened, conn)
+
+    def test_query_errors_keep_connection(self):
+        pool = ConnectionPool(1)
+
+        with self.assertRaises(pymysql.err.ProgrammingError):
+            with pool.connection() as conn:
+                raise pymysql.err.ProgrammingError(1064, "Syntax error")
+        with pool.connection() as reused:
+            pass
+
+        self.assertIs(reused, conn)
+        conn.close.assert_not_called()
+
+    def test_invalid_size(self):
+        with self.assertRaises(ValueError):
+            ConnectionPool(0)
@@ -0,0 +1,67 @@
+import unittest
+
+import pandas as pd
+
+from kpireport_mysql.reducers import Resample, Sum, Top, make_reducer
+
+
+def reduce_chunks(reducer, df, chunksize):
+    chunks = [df.iloc[i:][:chunksize] for i in range(0, len(df), chunksize)]
+    return reducer.combine([reducer.reduce(chunk) for chunk in chunks])
+
+
+class ReducerTestCase(unittest.TestCase):
+    def assertChunkInvariant(self, reducer, df):
+        expected = reducer.reduce(df)
+        for chunksize in [1, 2, 3, len(df)]:
+            with self.subTest(chunksize=chunksize):
+                pd.testing.assert_frame_equal(
+                    reduce_chunks(reducer, df, chunksize), expected
+                )
+
+    def test_resample(self):
+        index = pd.to_datetime(
+            [
+                "2020-01-01 00:10",
+                "2020-01-01 00:20",
+                "2020-01-01 05:10",
+                "2020-01-01 05:50",
+                "2020-01-01 06:00",
+            ]
+        )
+        df = pd.DataFrame({"value": [1, 2, 3, 4, 5]}, index=index)
+
+        for agg in ["sum", "min", "max", "count"]:
+            with self.subTest(agg=agg):
+                self.assertChunkInvariant(Resample("1h", agg=agg), df)
+
+    def test_resample_keeps_empty_buckets_between_chunks(self):
+        index = pd.to_datetime(["2020-01-01 00:10", "2020-01-01 05:10"])
+        df = pd.DataFrame({"value": [1, 2]}, index=index)
+
+        result = reduce_chunks(Resample("1h"), df, 1)
+
+        self.assertEqual(list(result["value"]), [1, 0, 0, 0, 0, 2])
+
+    def test_top(self):
+        df = pd.DataFrame({"total": [5, 1, 9, 3, 7, 2]}, index=list("abcdef"))
+
+        self.assertChunkInvariant(Top(3, column="total"), df)
+
+    def test_sum(self):
+        df = pd.DataFrame(
+            {"country": ["DE", "FR", "DE", "US", "FR"], "total": [1, 2, 3, 4, 5]}
+        )
+
+        self.assertChunkInvariant(Sum(), df)
+        self.assertChunkInvariant(Sum(by="country"), df)
+
+    def test_make_reducer(self):
+        reducer = make_reducer({"resample": "1h", "agg": "max"})
+        self.assertIsInstance(reducer, Resample)
+        self.assertEqual((reducer.rule, reducer.agg), ("1h", "max"))
+        self.assertIsInstance(make_reducer("sum"), Sum)
+        with self.assertRaises(ValueError):
+            make_reducer({"resample": "1h", "top": 1})
+        with self.assertRaises(ValueError):
+            make_reducer({"resample": "1h", "agg": "mean"})
@@ -8,7 +8,8 @@ setup(
     url="https://kpireporter.com",
     license="Prosperity Public License",
     packages=["kpireport_mysql"],
-    install_requires=["kpireport", "PyMySQL"],
+    # The columnar fetch parses dates with format="ISO8601".
+    install_requires=["kpireport", "pandas>=2", "PyMySQL"],
     entry_points={
         "kpireport.datasource": ["mysql = kpireport_mysql:MySQLDatasource"],
     },
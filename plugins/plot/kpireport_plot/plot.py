@@ -1,9 +1,8 @@
 from cycler import cycler
 from functools import lru_cache
 import io
-import matplotlib.dates as mdates
-import matplotlib.pyplot as plt
 import pandas as pd
+from threading import Lock
 
 from kpireport.view import View
 
@@ -15,6 +14,11 @@ DATE_FORMAT = "%b %-d\n(%a)"
 FIGURE_PPI = 72  # Default PPI in matplotlib, not customizable
 DEFAULT_FONT_SIZE = 10
 
+# The pyplot state machine (and the rcParams modified via rc_context) is
+# global; only allow one figure to be drawn at a time when Views are rendered
+# concurrently.
+PYPLOT_LOCK = Lock()
+
 
 class Plot(View):
     """Render a line or bar graph as a PNG file inline.
@@ -186,6 +190,8 @@ class Plot(View):
                 )
 
         if isinstance(index_data, pd.DatetimeIndex):
+            import matplotlib.dates as mdates
+
             ax.xaxis.set_major_formatter(mdates.DateFormatter(DATE_FORMAT))
 
         if self.kind == "line":
@@ -220,9 +226,21 @@ class Plot(View):
             )
         return df
 
+    def _time_bucket(self) -> "Optional[int]":
+        """The resolution that a line plot can show, in seconds."""
+        if self.kind != "line":
+            # Aggregating the values would change the bars.
+            return None
+        width = self.cols * self.report.theme.column_width
+        return int(self.report.timedelta.total_seconds() / width) or None
+
     @lru_cache
     def render_figure(self):
-        df = self.datasources.query(self.datasource, self.query, **self.query_args)
+        # Datasources that support it only fetch as many points as can be drawn.
+        hints = dict(time_bucket=self._time_bucket())
+        df = self.datasources.query(
+            self.datasource, self.query, hints=hints, **self.query_args
+        )
         if self.time_column in df:
             df = df.set_index(self.time_column)
 
@@ -232,7 +250,8 @@ class Plot(View):
 
         if self.groupby:
             index_data = df.index.unique()
-            df = df.groupby(self.groupby)
+            # Only plot groups with data, if the column is categorical.
+            df = df.groupby(self.groupby, observed=True)
             series_labels = df.groups
 
             def _flatten_group(group_df):
@@ -262,7 +281,11 @@ class Plot(View):
         if not series_data:
             raise ValueError("The query returned no plottable results.")
 
-        with plt.rc_context(self.matplotlib_rc):
+        # pyplot is slow to import, and may build the font cache on first use;
+        # only import it once there is something to plot.
+        import matplotlib.pyplot as plt
+
+        with PYPLOT_LOCK, plt.rc_context(self.matplotlib_rc):
             figsize = [((self.cols * self.report.theme.column_width) / FIGURE_PPI), 2]
             fig, ax = plt.subplots(figsize=figsize, constrained_layout=True)
 
@@ -151,7 +151,7 @@ class PrometheusAlertSummary(View):
 
             # Find common label sets and which times those alerts fired
             labels = list(df_a.columns[2:])
-            df_ag = df_a.groupby(labels)["time"]
+            df_ag = df_a.groupby(labels, observed=True)["time"]
             firings = [
                 dict(
                     labels=dict(zip(labels, labelvalues)),
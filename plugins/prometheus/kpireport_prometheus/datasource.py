@@ -1,8 +1,18 @@
+import asyncio
+from functools import partial
+import re
+
+import numpy as np
 import pandas as pd
 import requests
 
 from kpireport.datasource import Datasource
 
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
 
 class PrometheusDatasource(Datasource):
     """Datasource that executes PromQL queries against a Prometheus server.
@@ -14,17 +24,26 @@ class PrometheusDatasource(Datasource):
         basic_auth (dict): HTTP Basic Auth credentials to use when
             authenticating to the server. Must be a dictionary with ``username``
             and ``password`` keys.
+        timeout (float): the number of seconds to wait for the server to
+            respond to each query. (Default 60)
+
+    If the ``async`` extras are installed, queries issued asynchronously (see
+    :meth:`aquery`) share a single event loop instead of a thread each.
     """
 
-    def init(self, host=None, basic_auth=None):
+    supports_incremental = True
+    supported_hints = frozenset(["time_bucket"])
+
+    def init(self, host=None, basic_auth=None, timeout=60):
         if not host:
             raise ValueError("Missing required parameter: 'host'")
         if not host.startswith("http"):
             host = f"http://{host}"
         self.basic_auth = self._validate_basic_auth(basic_auth)
         self.host = host
+        self.timeout = timeout
 
-    def query(self, query: str, step="1h") -> pd.DataFrame:
+    def query(self, query: str, step="1h", hints=None) -> pd.DataFrame:
         """Execute a PromQL query against the Prometheus server.
 
         Args:
@@ -38,6 +57,9 @@ class PrometheusDatasource(Datasource):
                 but at the cost of a more expensive query and more data
                 points to analyze. If your report window is significantly
                 short, it may make sense to reduce this.
+            hints (dict): query hints. If the result is only used at a lower
+                resolution (the ``time_bucket`` hint), the step size is
+                increased to match, so that fewer points are fetched.
 
         Returns:
             pandas.DataFrame: a table of time series results.
@@ -45,6 +67,54 @@ class PrometheusDatasource(Datasource):
                 The timeseries value will be in a ``time`` column; any labels
                 associated with the metric will be added as additional columns.
         """
+        return self.query_window(
+            self.report.start_date, self.report.end_date, query, step, hints
+        )
+
+    async def aquery(self, query: str, step="1h", hints=None) -> pd.DataFrame:
+        """Execute a PromQL query against the Prometheus server asynchronously.
+
+        See :meth:`query` for details. If :mod:`aiohttp` is not installed, the
+        query is executed on a worker thread instead.
+        """
+        start_date, end_date = self.report.start_date, self.report.end_date
+        if not aiohttp:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                None,
+                partial(self.query_window, start_date, end_date, query, step, hints),
+            )
+        step = _hinted_step(step, hints)
+
+        auth = None
+        if self.basic_auth:
+            auth = aiohttp.BasicAuth(
+                self.basic_auth["username"], self.basic_auth["password"]
+            )
+
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        async with aiohttp.ClientSession(auth=auth, timeout=timeout) as session:
+            async with session.get(
+                f"{self.host}/api/v1/query_range",
+                params=self._query_params(start_date, end_date, query, step),
+            ) as res:
+                res.raise_for_status()
+                return self._to_dataframe(await res.json())
+
+    def query_window(self, start_date, end_date, query: str, step="1h", hints=None):
+        """Execute a PromQL range query over an explicit time window.
+
+        Args:
+            start_date (datetime): the start of the time window.
+            end_date (datetime): the end of the time window.
+            query (str): the PromQL query
+            step (str): the step size for the range query.
+            hints (dict): query hints; see :meth:`query`.
+
+        Returns:
+            pandas.DataFrame: a table of time series results.
+        """
+        step = _hinted_step(step, hints)
         if self.basic_auth:
             auth = requests.auth.HTTPBasicAuth(
                 self.basic_auth["username"], self.basic_auth["password"]
@@ -54,32 +124,65 @@ class PrometheusDatasource(Datasource):
 
         res = requests.get(
             f"{self.host}/api/v1/query_range",
-            params=dict(
-                start=self.report.start_date.timestamp(),
-                end=self.report.end_date.timestamp(),
-                step=step,
-                query=query.strip(),
-            ),
+            params=self._query_params(start_date, end_date, query, step),
             auth=auth,
+            timeout=self.timeout,
         )
         res.raise_for_status()
-        json = res.json()
+        return self._to_dataframe(res.json())
+
+    def _query_params(self, start_date, end_date, query, step):
+        return dict(
+            start=start_date.timestamp(),
+            end=end_date.timestamp(),
+            step=step,
+            query=query.strip(),
+        )
 
+    def _to_dataframe(self, json):
         if json.get("status") != "success":
             raise ValueError("Got error response from Prometheus server")
 
         result = json.get("data", {}).get("result", [])
+        if not result:
+            return pd.DataFrame()
 
-        df = pd.DataFrame()
+        # Decode all series in one pass into a single long-format table, with
+        # a row for each point of each series.
+        lengths = np.fromiter(
+            (len(metric["values"]) for metric in result), dtype=np.int64
+        )
+        points = [point for metric in result for point in metric["values"]]
+        times = np.fromiter((point[0] for point in points), dtype=np.float64)
+        # Values are sent as strings, e.g., "1.5" or "NaN".
+        values = np.array([point[1] for point in points], dtype=str)
+
+        columns = dict(
+            time=pd.to_datetime(times, unit="s"),
+            value=values.astype(np.float64),
+        )
 
-        for metric in result:
-            mdf = pd.DataFrame(metric["values"], columns=["time", "value"])
-            mdf["time"] = pd.to_datetime(mdf["time"], unit="s")
-            mdf = mdf.assign(**metric["metric"])
-            mdf = mdf.astype({"value": "float"})
-            df = df.append(mdf)
+        # Labels repeat for each point of a series; store them as categoricals,
+        # with one code per series. Series without a label get NaN.
+        label_values = {}
+        for i, metric in enumerate(result):
+            for label, value in metric["metric"].items():
+                label_values.setdefault(label, [None] * len(result))[i] = value
+        for label, series_values in label_values.items():
+            codes, categories = pd.factorize(
+                pd.Series(series_values, dtype=object), use_na_sentinel=True
+            )
+            columns[label] = pd.Categorical.from_codes(
+                np.repeat(codes, lengths), categories=categories
+            )
+
+        return pd.DataFrame(columns)
 
-        return df
+    def time_index(self, df: pd.DataFrame) -> pd.DatetimeIndex:
+        """Get the time of each row in a query result, in UTC."""
+        if "time" not in df:
+            return pd.DatetimeIndex([], tz="UTC")
+        return pd.DatetimeIndex(df["time"]).tz_localize("UTC")
 
     def _validate_basic_auth(self, basic_auth):
         if not basic_auth:
@@ -92,3 +195,29 @@ class PrometheusDatasource(Datasource):
                 "Basic auth must be dict with 'username' and 'password' keys"
             )
         return basic_auth
+
+
+def _hinted_step(step, hints):
+    """Increase the step size to the hinted time bucket, if it is larger."""
+    time_bucket = (hints or {}).get("time_bucket")
+    if not time_bucket:
+        return step
+    step_seconds = _duration_seconds(step)
+    if step_seconds is None or time_bucket <= step_seconds:
+        return step
+    return f"{int(time_bucket)}s"
+
+
+DURATION_UNITS = dict(ms=0.001, s=1, m=60, h=3600, d=86400, w=7 * 86400, y=365 * 86400)
+
+
+def _duration_seconds(duration) -> "Optional[float]":
+    """Parse a Prometheus duration, e.g., "1h30m", or a number of seconds."""
+    try:
+        return float(duration)
+    except (TypeError, ValueError):
+        pass
+    parts = re.findall(r"(\d+)(ms|[smhdwy])", str(duration))
+    if not parts or "".join(n + unit for n, unit in parts) != duration:
+        return None
+    return sum(int(n) * DURATION_UNITS[unit] for n, unit in parts)
@@ -0,0 +1,62 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from kpireport_prometheus.datasource import PrometheusDatasource
+
+
+def make_response(result, status="success"):
+    return dict(status=status, data=dict(resultType="matrix", result=result))
+
+
+class ToDataFrameTestCase(unittest.TestCase):
+    def setUp(self):
+        self.datasource = PrometheusDatasource(None, host="localhost")
+
+    def test_series(self):
+        response = make_response(
+            [
+                dict(
+                    metric=dict(__name__="up", instance="a"),
+                    values=[[1577836800, "1"], [1577836860, "0"]],
+                ),
+                dict(
+                    metric=dict(__name__="up", instance="b", job="api"),
+                    values=[[1577836800, "NaN"]],
+                ),
+            ]
+        )
+
+        df = self.datasource._to_dataframe(response)
+
+        pd.testing.assert_index_equal(df.index, pd.RangeIndex(3))
+        self.assertEqual(
+            list(df.columns), ["time", "value", "__name__", "instance", "job"]
+        )
+        self.assertEqual(
+            list(df["time"]),
+            [
+                pd.Timestamp("2020-01-01 00:00"),
+                pd.Timestamp("2020-01-01 00:01"),
+                pd.Timestamp("2020-01-01 00:00"),
+            ],
+        )
+        self.assertEqual(df["value"].dtype, np.float64)
+        self.assertEqual(list(df["value"][:2]), [1.0, 0.0])
+        self.assertTrue(np.isnan(df["value"][2]))
+        for label in ["__name__", "instance", "job"]:
+            self.assertIsInstance(df[label].dtype, pd.CategoricalDtype)
+        self.assertEqual(list(df["instance"]), ["a", "a", "b"])
+        # Series without a label have no value for it.
+        self.assertTrue(df["job"][:2].isna().all())
+        self.assertEqual(df["job"][2], "api")
+
+    def test_empty_result(self):
+        df = self.datasource._to_dataframe(make_response([]))
+
+        self.assertTrue(df.empty)
+
+    def test_error_response(self):
+        with self.assertRaises(ValueError):
+            self.datasource._to_dataframe(make_response([], status="error"))
@@ -9,6 +9,7 @@ setup(
     license="Prosperity Public License",
     packages=["kpireport_prometheus"],
     install_requires=["kpireport", "Pillow", "requests"],
+    extras_require={"async": ["aiohttp"]},
     package_data={"kpireport_prometheus": ["templates/*"]},
     entry_points={
         "kpireport.datasource": [
@@ -1,4 +1,6 @@
 import boto3
+from botocore.exceptions import ClientError
+from hashlib import sha256
 import tempfile
 import os
 
@@ -11,6 +13,11 @@ LOG = logging.getLogger(__name__)
 
 class S3OutputDriver(StaticOutputDriver):
     """
+    Each object is uploaded with the SHA-256 digest of its content as the
+    ``sha256`` metadata field. Files whose content is already stored under
+    their key, such as images that did not change since the last report,
+    are not uploaded again.
+
     Attributes:
         bucket (str): the S3 bucket to upload to.
         prefix (str): the key prefix.
@@ -40,4 +47,29 @@ class S3OutputDriver(StaticOutputDriver):
                 prefix = self.prefix or ""
                 for f in files:
                     key = f"{prefix}{path}/{f}"
-                    self.s3.upload_file(f"{root}/{f}", self.bucket, key)
+                    filename = f"{root}/{f}"
+                    digest = _file_digest(filename)
+                    if self._remote_digest(key) == digest:
+                        LOG.debug(f"Skipping upload of unchanged {key}")
+                        continue
+                    self.s3.upload_file(
+                        filename,
+                        self.bucket,
+                        key,
+                        ExtraArgs={"Metadata": {"sha256": digest}},
+                    )
+
+    def _remote_digest(self, key):
+        try:
+            head = self.s3.head_object(Bucket=self.bucket, Key=key)
+        except ClientError:
+            return None
+        return head.get("Metadata", {}).get("sha256")
+
+
+def _file_digest(filename):
+    digest = sha256()
+    with open(filename, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
@@ -1,7 +1,9 @@
 import fabric
+import os
 import shlex
 import tarfile
 import tempfile
+from uuid import uuid4
 
 from kpireport_static import StaticOutputDriver
 
@@ -42,21 +44,26 @@ class SCPOutputDriver(StaticOutputDriver):
         else:
             run = getattr(c, "run")
 
-        with self.tmp_dir as tmp_dir:
-            tarball = f"{self.report.id}.tar.gz"
+        with self.tmp_dir as tmp_dir, tempfile.TemporaryDirectory() as tar_dir:
+            # Use unique paths for the tarball, as other output drivers may be
+            # sending the report at the same time.
+            tarball = os.path.join(tar_dir, f"{self.report.id}.tar.gz")
             with tarfile.open(tarball, "w:gz") as tar:
                 tar.add(tmp_dir, arcname="static")
             try:
-                remote_tarball = "/tmp/kpireport.tar.gz"
+                # The IDs come from the configuration, so they are not used in
+                # the remote path, which is passed to shell commands.
+                remote_tarball = f"/tmp/kpireport-{uuid4().hex}.tar.gz"
                 c.put(tarball, remote=remote_tarball)
 
                 safe_path = shlex.quote(self.remote_path)
+                safe_tarball = shlex.quote(remote_tarball)
 
                 run(f"mkdir -p {safe_path}")
                 run(
-                    (f"tar -xf {remote_tarball} -C {safe_path} " "--strip-components=1")
+                    (f"tar -xf {safe_tarball} -C {safe_path} " "--strip-components=1")
                 )
-                run(f"rm -rf {remote_tarball}")
+                run(f"rm -f {safe_tarball}")
 
                 if self.remote_path_owner:
                     safe_owner = shlex.quote(self.remote_path_owner)
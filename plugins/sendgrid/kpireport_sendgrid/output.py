@@ -62,7 +62,8 @@ class SendGridOutputDriver(OutputDriver):
         return flag in ["1", "y", "yes", "true"]
 
     def render_blob_inline(self, blob, fmt=None):
-        return Markup(f"""<img src="cid:{blob.id}" />""")
+        # Identical blobs are attached once, by their digest.
+        return Markup(f"""<img src="cid:{blob.digest}" />""")
 
     def render_output(self, content, blobs):
         msg = Mail(
@@ -83,14 +84,18 @@ class SendGridOutputDriver(OutputDriver):
             msg.mail_settings.sandbox_mode = SandBoxMode(True)
 
         attachment = []
+        attached = set()
         for blob in blobs:
-            encoded_content = b64encode(blob.content.getvalue()).decode()
+            if blob.digest in attached:
+                continue
+            attached.add(blob.digest)
+            encoded_content = b64encode(blob.getbuffer()).decode()
             attachment.append(
                 Attachment(
                     file_content=encoded_content,
                     file_name=blob.id,
                     file_type=blob.mime_type,
-                    content_id=blob.id,
+                    content_id=blob.digest,
                     disposition="inline",
                 )
             )
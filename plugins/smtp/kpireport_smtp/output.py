@@ -77,7 +77,8 @@ class SMTPOutputDriver(OutputDriver):
 
     def render_blob_inline(self, blob, fmt=None):
         if self.image_strategy == "embed":
-            return Markup(f"""<img src="cid:{blob.id}" />""")
+            # Identical blobs are attached once, by their digest.
+            return Markup(f"""<img src="cid:{blob.digest}" />""")
         elif self.image_strategy == "remote":
             path = "/".join([self.image_remote_base_url, blob.id])
             return Markup(f"""<img src="{path}{self.cache_buster}" />""")
@@ -96,13 +97,17 @@ class SMTPOutputDriver(OutputDriver):
 
         if self.image_strategy == "embed":
             payload = msg.get_payload()[1]
+            attached = set()
             for blob in blobs:
+                if blob.digest in attached:
+                    continue
+                attached.add(blob.digest)
                 mime_type = blob.mime_type
                 if not mime_type:
                     raise ValueError(f"No mime type specified for blob {blob.id}")
                 maintype, subtype = mime_type.split("/")
                 payload.add_related(
-                    blob.content.getvalue(), maintype, subtype, cid=blob.id
+                    blob.getbuffer(), maintype, subtype, cid=blob.digest
                 )
 
         # Send the message via local SMTP server.
@@ -5,6 +5,7 @@ import os
 import imgkit
 from jinja2 import Markup
 
+from kpireport.blob import link_or_copy
 from kpireport.output import OutputDriver
 
 import logging
@@ -61,11 +62,16 @@ class StaticOutputDriver(OutputDriver):
         with open(report_file, "w") as f:
             f.write(content)
 
+        # Identical blobs are only written once; the others are hard links.
+        written = {}
         for blob in blobs:
             blob_path = os.path.join(self._render_dir, blob.id)
             os.makedirs(os.path.dirname(blob_path), exist_ok=True)
-            with open(blob_path, "wb") as f:
-                f.write(blob.content.getvalue())
+            if blob.digest in written:
+                link_or_copy(written[blob.digest], blob_path)
+            else:
+                blob.save(blob_path)
+                written[blob.digest] = blob_path
 
         if self.output_format == "html":
             output_paths = [
@@ -20,13 +20,23 @@ class Table(View):
             query operation.
         max_rows (int): maximum number of rows to display. If the output table
             has more rows, they are ignored. (Default 10)
+        columns (List[str]): the columns to display, in order. Each must be a
+            column of the query result. The index of the result, e.g., the
+            first column selected from a database, is always displayed.
+            (Default all columns)
+
+    Datasources that support it are only asked for the rows that are
+    displayed (see :attr:`kpireport.datasource.Datasource.supported_hints`.)
     """
 
-    def init(self, datasource=None, query=None, query_args=None, max_rows=None):
+    def init(
+        self, datasource=None, query=None, query_args=None, max_rows=None, columns=None
+    ):
         self.datasource = datasource
         self.query = query
         self.query_args = query_args or {}
         self.max_rows = max_rows or DEFAULT_MAX_ROWS
+        self.columns = columns
 
         if not (self.datasource and self.query):
             raise ValueError(("Both a 'datasource' and 'query' parameter are required"))
@@ -34,10 +44,25 @@ class Table(View):
             raise ValueError("Invalid format for 'query_args', expected dict")
         if self.max_rows and not isinstance(self.max_rows, int):
             raise ValueError("Invalid format for 'max_rows', expected int")
+        if self.columns and not isinstance(self.columns, list):
+            raise ValueError("Invalid format for 'columns', expected list")
 
     @lru_cache(maxsize=1)
     def _query(self):
-        df = self.datasources.query(self.datasource, self.query, **self.query_args)
+        hints = dict(limit=self.max_rows)
+        df = self.datasources.query(
+            self.datasource, self.query, hints=hints, **self.query_args
+        )
+        if self.columns:
+            index = df.index.names
+            missing = [
+                col
+                for col in self.columns
+                if col not in df.columns and col not in index
+            ]
+            if missing:
+                raise ValueError(f"No such column(s): {', '.join(map(str, missing))}")
+            df = df[[col for col in self.columns if col in df.columns]]
         if self.max_rows:
             return df.head(self.max_rows)
         else: